@@ -0,0 +1,35 @@
+"""
+Lithops example comparing single-request and multipart transfers of a large
+object with the 'Storage' interface. Run it against the localhost or MinIO
+storage backends:
+
+    python storage_transfer.py localhost 256
+"""
+import os
+import sys
+import time
+from lithops import Storage
+
+KEY = 'lithops-transfer-benchmark.bin'
+
+
+def timed(label, size, function, *args, **kwargs):
+    t0 = time.time()
+    function(*args, **kwargs)
+    elapsed = time.time() - t0
+    print(f'{label:<24} {elapsed:7.2f}s  {size / elapsed / 1024 ** 2:8.1f} MiB/s')
+
+
+if __name__ == '__main__':
+    backend = sys.argv[1] if len(sys.argv) > 1 else 'localhost'
+    size = int(sys.argv[2] if len(sys.argv) > 2 else 256) * 1024 ** 2
+
+    storage = Storage(backend=backend)
+    data = os.urandom(size)
+
+    timed('put_object', size, storage.put_object, storage.bucket, KEY, data)
+    timed('multipart_upload', size, storage.multipart_upload, storage.bucket, KEY, data)
+    timed('get_object', size, storage.get_object, storage.bucket, KEY)
+    timed('multipart_download', size, storage.multipart_download, storage.bucket, KEY)
+
+    storage.delete_object(storage.bucket, KEY)
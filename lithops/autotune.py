@@ -0,0 +1,183 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import json
+import math
+import time
+import hashlib
+import logging
+import statistics
+
+from lithops.constants import HISTORY_DIR
+
+logger = logging.getLogger(__name__)
+
+HISTORY_MAX_RUNS = 20
+PROCESSES_CHOICES = [1, 2, 4, 8]
+MEMORY_HEADROOM = 1.25
+MEMORY_STEP = 64  # MiB
+CPU_BOUND_USAGE = 80  # Percent of a core
+
+
+def get_function_key(func):
+    """
+    Identifies a function across runs by its module, name and bytecode,
+    without serializing it
+    """
+    code = getattr(func, '__code__', None) or getattr(getattr(func, '__call__', None), '__code__', None)
+    name = getattr(func, '__qualname__', None) or type(func).__qualname__
+    func_hash = hashlib.md5()
+    func_hash.update(f'{getattr(func, "__module__", "")}.{name}'.encode())
+    if code is not None:
+        func_hash.update(code.co_code)
+        func_hash.update(repr(code.co_consts).encode())
+    return func_hash.hexdigest()
+
+
+class PerformanceHistory:
+    """
+    Local store of the performance of the past runs of each function,
+    in one JSON file per function and compute backend
+    """
+
+    def __init__(self, backend):
+        self.history_dir = os.path.join(HISTORY_DIR, backend)
+
+    def _path(self, function_key):
+        return os.path.join(self.history_dir, f'{function_key}.json')
+
+    def load(self, function_key):
+        """
+        Returns the stored runs of a function, the most recent last
+        """
+        try:
+            with open(self._path(function_key), 'r') as history_file:
+                return json.load(history_file)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def add(self, function_key, run):
+        """
+        Stores a new run of a function, keeping the last HISTORY_MAX_RUNS
+        """
+        runs = (self.load(function_key) + [run])[-HISTORY_MAX_RUNS:]
+        os.makedirs(self.history_dir, exist_ok=True)
+        tmp_path = self._path(function_key) + '.tmp'
+        with open(tmp_path, 'w') as history_file:
+            json.dump(runs, history_file)
+        os.replace(tmp_path, self._path(function_key))
+
+
+def summarize_run(futures, chunksize, worker_processes, runtime_memory):
+    """
+    Summarizes the stats of the calls of a job, or returns None if
+    they lack the worker stats
+    """
+    stats = [f.stats for f in futures
+             if 'worker_func_exec_time' in f.stats and not f.stats.get('host_cache_hit')]
+    if not stats:
+        return None
+
+    exec_times = [s['worker_func_exec_time'] for s in stats]
+    # The kernel peak of the function process, not the sampled RSS of the process tree
+    peak_memory = [s['worker_peak_memory_end'] for s in stats if s.get('worker_peak_memory_end')]
+    timed_stats = [s for s in stats if 'worker_start_tstamp' in s and 'host_submit_tstamp' in s]
+    if not timed_stats:
+        return None
+    startup_times = [s['worker_start_tstamp'] - s['host_submit_tstamp'] for s in timed_stats
+                     if s.get('worker_cold_start')]
+    if not startup_times:
+        startup_times = [min(s['worker_start_tstamp'] - s['host_submit_tstamp'] for s in timed_stats)]
+    cpu_usage = [max(s['worker_func_cpu_usage']) for s in stats if s.get('worker_func_cpu_usage')]
+    cores = [len(s['worker_func_cpu_usage']) for s in stats if s.get('worker_func_cpu_usage')]
+
+    return {
+        'tstamp': time.time(),
+        'calls': len(futures),
+        'chunksize': chunksize,
+        'worker_processes': worker_processes,
+        'runtime_memory': runtime_memory,
+        'exec_time': statistics.median(exec_times),
+        'peak_memory': max(peak_memory) if peak_memory else None,
+        'startup_time': max(statistics.median(startup_times), 0),
+        'cpu_usage': statistics.median(cpu_usage) if cpu_usage else None,
+        'cores': min(cores) if cores else None
+    }
+
+
+def estimate_makespan(total_calls, max_workers, chunksize, processes, exec_time, startup_time):
+    """
+    Makespan of a job where each activation runs chunksize calls with
+    processes in parallel, and at most max_workers activations run at a time
+    """
+    activations = math.ceil(total_calls / chunksize)
+    waves = math.ceil(activations / max_workers)
+    return waves * (startup_time + math.ceil(chunksize / processes) * exec_time)
+
+
+def tune_job(runs, total_calls, max_workers, chunksize, worker_processes, runtime_memory=None):
+    """
+    Finds the chunksize and worker processes that minimize the estimated
+    makespan of a job, and the memory that fits the processes. The memory
+    can be lower than the current one
+
+    :param runs: past runs of the function, as returned by summarize_run()
+    :param total_calls: number of calls of the job
+    :param max_workers: max number of concurrent activations
+    :param chunksize: current chunksize
+    :param worker_processes: current worker processes
+    :param runtime_memory: current memory of the activations (MiB), or None if not applicable
+
+    :return: dictionary with the chunksize, worker_processes, runtime_memory
+        and estimated makespan of the best configuration, and the estimated
+        makespan of the current configuration
+    """
+    last = runs[-1]
+    startup_time = statistics.median(run['startup_time'] for run in runs)
+    cores = last['cores'] or 1
+    cpu_bound = (last['cpu_usage'] or 0) >= CPU_BOUND_USAGE
+
+    def contention(processes):
+        # CPU-bound calls share the cores when there are more processes
+        return processes / min(processes, cores) if cpu_bound else 1
+
+    # Execution time of a call without contention, from the past runs
+    exec_time = statistics.median(run['exec_time'] / contention(run['worker_processes'] or 1) for run in runs)
+
+    candidates = []
+    for processes in PROCESSES_CHOICES:
+        one_wave = processes * math.ceil(math.ceil(total_calls / max_workers) / processes)
+        chunksizes = {processes * 2 ** i for i in range(8) if processes * 2 ** i <= one_wave} | {one_wave}
+        for chunksize in chunksizes:
+            makespan = estimate_makespan(total_calls, max_workers, chunksize, processes,
+                                         exec_time * contention(processes), startup_time)
+            candidates.append((round(makespan, 3), processes, chunksize))
+
+    current_makespan = estimate_makespan(total_calls, max_workers, chunksize, worker_processes,
+                                         exec_time * contention(worker_processes), startup_time)
+    makespan, best_processes, best_chunksize = min(candidates)
+
+    memory = runtime_memory
+    if runtime_memory and last['peak_memory']:
+        required = best_processes * last['peak_memory'] / 1024 ** 2 * MEMORY_HEADROOM
+        memory = MEMORY_STEP * math.ceil(required / MEMORY_STEP)
+
+    return {
+        'chunksize': best_chunksize,
+        'worker_processes': best_processes,
+        'runtime_memory': memory,
+        'makespan': makespan,
+        'current_makespan': round(current_makespan, 3)
+    }
@@ -209,9 +209,9 @@ def default_config(config_file=None, config_data=None, config_overwrite={}, load
 
     if load_storage_config:
         config_data = default_storage_config(config_data=config_data)
-        if config_data['lithops']['storage'] == c.LOCALHOST \
-           and backend != c.LOCALHOST:
-            raise Exception(f'Localhost storage backend cannot be used with {backend}')
+        storage = config_data['lithops']['storage']
+        if storage in (c.LOCALHOST, 'memory') and backend != c.LOCALHOST:
+            raise Exception(f'{storage.capitalize()} storage backend cannot be used with {backend}')
 
     return config_data
 
@@ -244,6 +244,12 @@ def extract_storage_config(config):
     s_config['backend'] = backend
     s_config[backend] = config[backend] if backend in config and config[backend] else {}
     s_config[backend]['user_agent'] = f'lithops/{__version__}'
+    if config['lithops'].get('storage_cache', False):
+        s_config['cache'] = {
+            'max_memory': config['lithops'].get('storage_cache_memory', c.STORAGE_CACHE_MEMORY_DEFAULT),
+            'max_disk': config['lithops'].get('storage_cache_disk', c.STORAGE_CACHE_DISK_DEFAULT),
+            'validate': config['lithops'].get('storage_cache_validate', True)
+        }
 
     return s_config
 
@@ -38,6 +38,17 @@ MODE_DEFAULT = SERVERLESS
 MONITORING_DEFAULT = 'storage'
 MONITORING_INTERVAL = 2
 
+SPECULATION_QUANTILE_DEFAULT = 0.75
+SPECULATION_MULTIPLIER_DEFAULT = 1.5
+
+EXECUTION_LOGS_DEFAULT = 'status'
+EXECUTION_LOGS_CHOICES = ['storage', 'on_error', 'status', 'none']
+
+DISPATCH_DEFAULT = 'static'
+DISPATCH_CHOICES = ['static', 'pull']
+
+AUTOTUNE_CHOICES = ['recommend', 'auto']
+
 SERVERLESS_BACKEND_DEFAULT = 'aws_lambda'
 STANDALONE_BACKEND_DEFAULT = 'aws_ec2'
 STORAGE_BACKEND_DEFAULT = 'aws_s3'
@@ -46,6 +57,7 @@ JOBS_PREFIX = "lithops.jobs"
 TEMP_PREFIX = "lithops.jobs/tmp"
 LOGS_PREFIX = "lithops.logs"
 RUNTIMES_PREFIX = "lithops.runtimes"
+RESULTS_CACHE_PREFIX = "lithops.cache"
 
 EXECUTION_TIMEOUT_DEFAULT = 1800
 EXECUTION_TIMEOUT_LOCALHOST_DEFAULT = 3600
@@ -56,7 +68,16 @@ LOCALHOST_SERVICE_CHECK_INTERVAL = 2
 
 MAX_AGG_DATA_SIZE = 4  # 4MiB
 
+STORAGE_MAX_CONCURRENCY_DEFAULT = 64
+STORAGE_PART_SIZE_DEFAULT = 8  # MiB
+STORAGE_DELETE_RATE_DEFAULT = 3500  # Keys per second
+STORAGE_CACHE_MEMORY_DEFAULT = 256  # MiB
+STORAGE_CACHE_DISK_DEFAULT = 1024  # MiB
+
 WORKER_PROCESSES_DEFAULT = 1
+WORKER_CACHE_SIZE_DEFAULT = 1024  # 1GiB
+DATA_READ_AHEAD_CONCURRENCY_DEFAULT = 4
+DATA_READ_AHEAD_BUFFER_DEFAULT = 32  # MiB
 
 TEMP_DIR = os.path.realpath(tempfile.gettempdir())
 USER_TEMP_DIR = 'lithops-' + os.getenv("USER", "root")
@@ -64,6 +85,8 @@ LITHOPS_TEMP_DIR = os.path.join(TEMP_DIR, USER_TEMP_DIR)
 JOBS_DIR = os.path.join(LITHOPS_TEMP_DIR, 'jobs')
 LOGS_DIR = os.path.join(LITHOPS_TEMP_DIR, 'logs')
 MODULES_DIR = os.path.join(LITHOPS_TEMP_DIR, 'modules')
+WORKER_CACHE_DIR = os.path.join(LITHOPS_TEMP_DIR, 'worker-cache')
+WORKER_DATA_DIR = os.path.join(LITHOPS_TEMP_DIR, 'worker-data')
 CUSTOM_RUNTIME_DIR = os.path.join(LITHOPS_TEMP_DIR, 'custom-runtime')
 
 RN_LOG_FILE = os.path.join(LITHOPS_TEMP_DIR, 'localhost-runner.log')
@@ -77,6 +100,7 @@ CLEANER_LOG_FILE = os.path.join(CLEANER_DIR, 'cleaner.log')
 HOME_DIR = os.path.expanduser('~')
 CONFIG_DIR = os.path.join(HOME_DIR, '.lithops')
 CACHE_DIR = os.path.join(CONFIG_DIR, 'cache')
+HISTORY_DIR = os.path.join(CACHE_DIR, 'history')
 CONFIG_FILE = os.path.join(CONFIG_DIR, 'config')
 CONFIG_FILE_GLOBAL = os.path.join("/etc", "lithops", "config")
 
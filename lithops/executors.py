@@ -17,6 +17,7 @@
 
 import os
 import sys
+import math
 import logging
 import atexit
 import pickle
@@ -27,23 +28,29 @@ from collections.abc import Callable
 from datetime import datetime
 
 from lithops import constants
-from lithops.future import ResponseFuture
+from lithops.version import __version__
+from lithops.future import ResponseFuture, logs_writer
 from lithops.invokers import create_invoker
 from lithops.storage import InternalStorage
 from lithops.wait import wait, ALL_COMPLETED, THREADPOOL_SIZE, WAIT_DUR_SEC, ALWAYS
-from lithops.job import create_map_job, create_reduce_job
+from lithops.job import create_map_job, create_reduce_job, create_reduce_groups, load_job_manifest
+from lithops.shuffle import create_shuffle_mapper, create_shuffle_reducer, \
+    hash_partitioner, SHUFFLE_MAX_CONCURRENCY, SHUFFLE_MAX_BUFFER_SIZE
 from lithops.config import default_config, \
     extract_localhost_config, extract_standalone_config, \
     extract_serverless_config, get_log_info, extract_storage_config
 from lithops.constants import LOCALHOST, CLEANER_DIR, \
-    SERVERLESS, STANDALONE
+    SERVERLESS, STANDALONE, AUTOTUNE_CHOICES
 from lithops.utils import setup_lithops_logger, \
-    is_lithops_worker, create_executor_id, create_futures_list
+    is_lithops_worker, create_executor_id, create_futures_list, \
+    is_object_processing_function
 from lithops.localhost import LocalhostHandler, LocalhostHandlerV2
 from lithops.standalone import StandaloneHandler
 from lithops.serverless import ServerlessHandler
-from lithops.storage.utils import create_job_key, CloudObject
+from lithops.storage.utils import create_job_key, clean_prefixes, get_clean_targets, CloudObject
+from lithops.storage.metrics import merge_ops, summarize_ops
 from lithops.monitor import JobMonitor
+from lithops.autotune import PerformanceHistory, get_function_key, summarize_run, tune_job
 from lithops.utils import FuturesList
 
 
@@ -62,6 +69,7 @@ class FunctionExecutor:
     :param storage: Storage backend to store Lithops data
     :param monitoring: Monitoring system implementation. One of: storage, rabbitmq
     :param log_level: Log level printing (INFO, DEBUG, ...). Set it to None to hide all logs. If this is param is set, all logging params in config are disabled
+    :param executor_id: ID of the executor. Set it to the ID of another executor to reattach to its jobs with reattach(). By default a new ID is created
     :param kwargs: Any parameter that can be set in the compute backend section of the config file, can be set here
     """
 
@@ -74,10 +82,11 @@ class FunctionExecutor:
         storage: Optional[str] = None,
         monitoring: Optional[str] = None,
         log_level: Optional[str] = False,
+        executor_id: Optional[str] = None,
         **kwargs: Optional[Dict[str, Any]]
     ):
         self.is_lithops_worker = is_lithops_worker()
-        self.executor_id = create_executor_id()
+        self.executor_id = executor_id or create_executor_id()
         self.futures = []
         self.cleaned_jobs = set()
         self.total_jobs = 0
@@ -116,6 +125,13 @@ class FunctionExecutor:
         self.backend = self.config['lithops']['backend']
         self.mode = self.config['lithops']['mode']
 
+        self.autotune = self.config['lithops'].get('autotune') if not self.is_lithops_worker else None
+        if self.autotune and self.autotune not in AUTOTUNE_CHOICES:
+            raise Exception(f'Unknown autotune mode "{self.autotune}". Valid modes: {AUTOTUNE_CHOICES}')
+        self.performance_history = PerformanceHistory(self.backend)
+        self._autotune_jobs = {}
+        self._deployed_memories = None
+
         if self.mode == LOCALHOST:
             localhost_config = extract_localhost_config(self.config)
             if localhost_config.get('version', 1) == 1:
@@ -164,6 +180,15 @@ class FunctionExecutor:
         self.total_jobs += 1
         return f'{call_type}{job_id}'
 
+    def _get_upstream_futures(self, iterdata):
+        """
+        Returns the futures a chained job depends on when their completion
+        can be tracked by this executor, so that the job is pipelined
+        """
+        if isinstance(iterdata, FuturesList) and \
+           all(f.executor_id == self.executor_id for f in iterdata):
+            return list(iterdata)
+
     def call_async(
         self,
         func: Callable,
@@ -171,6 +196,7 @@ class FunctionExecutor:
         extra_env: Optional[Dict] = None,
         runtime_memory: Optional[int] = None,
         timeout: Optional[int] = None,
+        cache: Optional[bool] = False,
         include_modules: Optional[List] = [],
         exclude_modules: Optional[List] = []
     ) -> ResponseFuture:
@@ -182,6 +208,7 @@ class FunctionExecutor:
         :param extra_env: Additional env variables for function environment.
         :param runtime_memory: Memory to use to run the function.
         :param timeout: Time that the function has to complete its execution before raising a timeout.
+        :param cache: Reuse the stored result if the same function was already run with the same input, and store the result otherwise.
         :param include_modules: Explicitly pickle these dependencies.
         :param exclude_modules: Explicitly keep these modules from pickled dependencies.
 
@@ -203,7 +230,8 @@ class FunctionExecutor:
                              extra_env=extra_env,
                              include_modules=include_modules,
                              exclude_modules=exclude_modules,
-                             execution_timeout=timeout)
+                             execution_timeout=timeout,
+                             cache=cache)
 
         futures = self.invoker.run_job(job)
         self.futures.extend(futures)
@@ -222,6 +250,7 @@ class FunctionExecutor:
         obj_chunk_number: Optional[int] = None,
         obj_newline: Optional[str] = '\n',
         timeout: Optional[int] = None,
+        cache: Optional[bool] = False,
         include_modules: Optional[List[str]] = [],
         exclude_modules: Optional[List[str]] = []
     ) -> FuturesList:
@@ -241,6 +270,7 @@ class FunctionExecutor:
         :param obj_newline: new line character for keeping line integrity of partitions.
                 'None' for disabling line integrity logic and get partitions of the exact same size in the functions
         :param timeout: Max time per function activation (seconds)
+        :param cache: Reuse the stored results of the calls whose function and input were already run, and only invoke the rest. Not supported with object processing functions
         :param include_modules: Explicitly pickle these dependencies. All required dependencies are pickled if default empty list.
                 No one dependency is pickled if it is explicitly set to None
         :param exclude_modules: Explicitly keep these modules from pickled dependencies. It is not taken into account if you set include_modules.
@@ -251,6 +281,12 @@ class FunctionExecutor:
         job_id = self._create_job_id('M')
         self.last_call = 'map'
 
+        worker_processes = None
+        if self.autotune:
+            chunksize, worker_processes, runtime_memory = self._tune_map_job(
+                job_id, map_function, map_iterdata, chunksize, runtime_memory
+            )
+
         runtime_meta = self.invoker.select_runtime(job_id, runtime_memory)
 
         job = create_map_job(
@@ -261,6 +297,7 @@ class FunctionExecutor:
             map_function=map_function,
             iterdata=map_iterdata,
             chunksize=chunksize,
+            worker_processes=worker_processes,
             runtime_meta=runtime_meta,
             runtime_memory=runtime_memory,
             extra_env=extra_env,
@@ -270,18 +307,106 @@ class FunctionExecutor:
             extra_args=extra_args,
             obj_chunk_size=obj_chunk_size,
             obj_chunk_number=obj_chunk_number,
-            obj_newline=obj_newline
+            obj_newline=obj_newline,
+            cache=cache
         )
 
-        futures = self.invoker.run_job(job)
+        futures = self.invoker.run_job(job, self._get_upstream_futures(map_iterdata))
         self.futures.extend(futures)
 
+        if self.autotune:
+            self._autotune_jobs[job.job_key] = (
+                get_function_key(map_function), job.chunksize,
+                job.worker_processes, job.runtime_memory
+            )
+
         if isinstance(map_iterdata, FuturesList):
             for fut in map_iterdata:
                 fut._produce_output = False
 
         return create_futures_list(futures, self)
 
+    def _tune_map_job(self, job_id, map_function, map_iterdata, chunksize, runtime_memory):
+        """
+        Tunes the chunksize, worker processes and memory of a map job from
+        the performance history of the function. In 'recommend' mode it only
+        logs the tuned values, and in 'auto' mode it applies them, except the
+        ones explicitly set by the user
+
+        :return: the chunksize, worker processes and memory of the job
+        """
+        worker_processes = None
+        if self.mode != SERVERLESS:
+            return chunksize, worker_processes, runtime_memory
+
+        runs = self.performance_history.load(get_function_key(map_function))
+        if not runs:
+            logger.debug(f'ExecutorID {self.executor_id} | JobID {job_id} - No performance '
+                         'history of the function, using the configured values')
+            return chunksize, worker_processes, runtime_memory
+
+        if isinstance(map_iterdata, (list, tuple, range)) \
+           and not is_object_processing_function(map_function):
+            total_calls = len(map_iterdata)
+        else:
+            total_calls = runs[-1]['calls']
+
+        backend_config = self.config[self.backend]
+        tuned = tune_job(
+            runs, total_calls, self.invoker.max_workers,
+            chunksize or self.config['lithops']['chunksize'],
+            backend_config['worker_processes'],
+            runtime_memory or backend_config.get('runtime_memory')
+        )
+
+        logger.info(
+            f'ExecutorID {self.executor_id} | JobID {job_id} - Autotuning from {len(runs)} past runs: '
+            f'chunksize={tuned["chunksize"]}, worker_processes={tuned["worker_processes"]}, '
+            f'runtime_memory={tuned["runtime_memory"]}MB - Estimated makespan {tuned["makespan"]}s '
+            f'(currently {tuned["current_makespan"]}s)'
+        )
+
+        if self.autotune == 'auto':
+            chunksize = chunksize or tuned['chunksize']
+            worker_processes = tuned['worker_processes']
+            if not runtime_memory and tuned['runtime_memory']:
+                runtime_memory = self._select_deployed_memory(tuned['runtime_memory'])
+                if not runtime_memory:
+                    logger.debug(f'ExecutorID {self.executor_id} | JobID {job_id} - No deployed runtime '
+                                 f'has {tuned["runtime_memory"]}MB or more, using the configured memory')
+
+        return chunksize, worker_processes, runtime_memory
+
+    def _select_deployed_memory(self, memory):
+        """
+        Returns the smallest memory of the deployed runtimes that is at least
+        the given one, so that autotuning never deploys runtimes with
+        arbitrary memory sizes. None if no deployed runtime is large enough
+        """
+        if self._deployed_memories is None:
+            try:
+                runtimes = self.compute_handler.list_runtimes(self.invoker.runtime_name)
+                self._deployed_memories = sorted({int(rt[1]) for rt in runtimes
+                                                  if str(rt[2]).replace('-', '.') == __version__})
+            except Exception as e:
+                logger.debug(f'ExecutorID {self.executor_id} - Unable to list the deployed runtimes: {e}')
+                self._deployed_memories = []
+
+        return next((m for m in self._deployed_memories if m >= memory), None)
+
+    def _record_performance(self, futures):
+        """
+        Adds to the performance history the autotuned jobs whose calls are all done
+        """
+        for job_key in {f.job_key for f in futures} & self._autotune_jobs.keys():
+            job_futures = [f for f in self.futures if f.job_key == job_key]
+            if not all(f.success or f.done for f in job_futures):
+                continue
+            function_key, chunksize, worker_processes, runtime_memory = self._autotune_jobs.pop(job_key)
+            run = summarize_run(job_futures, chunksize, worker_processes, runtime_memory)
+            if run:
+                self.performance_history.add(function_key, run)
+
     def map_reduce(
         self,
         map_function: Callable,
@@ -299,6 +424,8 @@ class FunctionExecutor:
         obj_newline: Optional[str] = '\n',
         obj_reduce_by_key: Optional[bool] = False,
         spawn_reducer: Optional[int] = 20,
+        reduce_streaming: Optional[bool] = False,
+        reduce_fanin: Optional[int] = None,
         include_modules: Optional[List[str]] = [],
         exclude_modules: Optional[List[str]] = []
     ) -> FuturesList:
@@ -320,7 +447,10 @@ class FunctionExecutor:
         :param obj_newline: New line character for keeping line integrity of partitions.
                 'None' for disabling line integrity logic and get partitions of the exact same size in the functions
         :param obj_reduce_by_key: Set one reducer per object after running the partitioner. By default there is one reducer for all the objects
-        :param spawn_reducer: Percentage of done map functions before spawning the reduce function
+        :param spawn_reducer: Percentage of done map functions before spawning the reduce function. Not used with reduce_fanin
+        :param reduce_streaming: Pass the map results to the reduce function as an iterator that yields them in completion order, instead of as a list
+        :param reduce_fanin: Build a reduction tree where each reducer processes at most this number of futures, and is invoked once they are done.
+                The reduce function must accept its own results as input
         :param include_modules: Explicitly pickle these dependencies.
         :param exclude_modules: Explicitly keep these modules from pickled dependencies.
 
@@ -351,14 +481,14 @@ class FunctionExecutor:
             execution_timeout=timeout
         )
 
-        map_futures = self.invoker.run_job(map_job)
+        map_futures = self.invoker.run_job(map_job, self._get_upstream_futures(map_iterdata))
         self.futures.extend(map_futures)
 
         if isinstance(map_iterdata, FuturesList):
             for fut in map_iterdata:
                 fut._produce_output = False
 
-        if spawn_reducer != ALWAYS:
+        if spawn_reducer != ALWAYS and not reduce_fanin:
             self.wait(map_futures, return_when=spawn_reducer)
             logger.debug(f'ExecutorID {self.executor_id} | JobID {map_job_id} - '
                          f'{spawn_reducer}% of map activations done. Spawning reduce stage')
@@ -367,30 +497,230 @@ class FunctionExecutor:
 
         runtime_meta = self.invoker.select_runtime(reduce_job_id, reduce_runtime_memory)
 
-        reduce_job = create_reduce_job(
+        def run_reduce_job(job_id, reduce_groups, pipelined=False):
+            reduce_job = create_reduce_job(
+                config=self.config,
+                internal_storage=self.internal_storage,
+                executor_id=self.executor_id,
+                reduce_job_id=job_id,
+                reduce_function=reduce_function,
+                map_job=map_job,
+                map_futures=map_futures,
+                runtime_meta=runtime_meta,
+                runtime_memory=reduce_runtime_memory,
+                extra_args=extra_args_reduce,
+                obj_reduce_by_key=obj_reduce_by_key,
+                reduce_streaming=reduce_streaming,
+                reduce_groups=reduce_groups,
+                extra_env=extra_env,
+                include_modules=include_modules,
+                exclude_modules=exclude_modules
+            )
+            futures = self.invoker.run_job(reduce_job, reduce_groups if pipelined else None)
+            self.futures.extend(futures)
+            return futures
+
+        reduce_groups = create_reduce_groups(map_job, map_futures, obj_reduce_by_key)
+        intermediate_futures = []
+
+        if reduce_fanin:
+            if reduce_fanin < 2:
+                raise ValueError('reduce_fanin must be greater than 1')
+            # Build a reduction tree: each level reduces the groups larger than
+            # reduce_fanin in chunks of reduce_fanin futures. Each reducer is
+            # invoked once the futures of its group are done, so no reducer
+            # holds a worker while waiting for its inputs
+            while any(len(group) > reduce_fanin for group in reduce_groups):
+                level_groups = []
+                for group in reduce_groups:
+                    if len(group) > reduce_fanin:
+                        level_groups.extend(group[i:i + reduce_fanin] for i in range(0, len(group), reduce_fanin))
+                level_job_id = self._create_job_id('R')
+                level_futures = run_reduce_job(level_job_id, level_groups, pipelined=True)
+                intermediate_futures.extend(level_futures)
+                logger.debug(f'ExecutorID {self.executor_id} | JobID {level_job_id} - '
+                             f'Spawned a reduce tree level with {len(level_futures)} reducers')
+                level_futures = iter(level_futures)
+                reduce_groups = [
+                    [next(level_futures) for _ in range(math.ceil(len(group) / reduce_fanin))]
+                    if len(group) > reduce_fanin else group
+                    for group in reduce_groups
+                ]
+
+        reduce_futures = run_reduce_job(reduce_job_id, reduce_groups, pipelined=bool(reduce_fanin))
+
+        [f._set_mapreduce() for f in map_futures + intermediate_futures]
+
+        return create_futures_list(map_futures + intermediate_futures + reduce_futures, self)
+
+    def shuffle(
+        self,
+        map_function: Callable,
+        map_iterdata: List[Union[List[Any], Tuple[Any, ...], Dict[str, Any]]],
+        num_partitions: int,
+        partitioner: Optional[Callable] = None,
+        reduce_function: Optional[Callable] = None,
+        combiner: Optional[Callable] = None,
+        sort: Optional[bool] = False,
+        chunksize: Optional[int] = None,
+        extra_args: Optional[Union[List[Any], Tuple[Any, ...], Dict[str, Any]]] = None,
+        extra_env: Optional[Dict[str, str]] = None,
+        map_runtime_memory: Optional[int] = None,
+        reduce_runtime_memory: Optional[int] = None,
+        timeout: Optional[int] = None,
+        obj_chunk_size: Optional[int] = None,
+        obj_chunk_number: Optional[int] = None,
+        obj_newline: Optional[str] = '\n',
+        max_concurrency: Optional[int] = SHUFFLE_MAX_CONCURRENCY,
+        max_buffer_size: Optional[int] = SHUFFLE_MAX_BUFFER_SIZE,
+        include_modules: Optional[List[str]] = [],
+        exclude_modules: Optional[List[str]] = []
+    ) -> FuturesList:
+        """
+        Map the map_function over the data and repartition its output by key through
+        the storage backend. The map_function must return an iterable of (key, value)
+        records. Each reducer receives all the records of one partition.
+
+        :param map_function: The function to map over the data. It must return (key, value) records
+        :param map_iterdata: An iterable of input data
+        :param num_partitions: Number of partitions, i.e. number of reducers
+        :param partitioner: Function (key, num_partitions) -> partition number. Default hash partitioner
+        :param reduce_function: Function applied to the records of each partition. By default the records are returned
+        :param combiner: Function (value, value) -> value to combine the records of the same key, both in the mappers and the reducers
+        :param sort: Sort the records of each partition by key
+        :param chunksize: Split map_iteradata in chunks of this size. Lithops spawns 1 worker per resulting chunk. Default 1
+        :param extra_args: Additional arguments to pass to function activation. Default None
+        :param extra_env: Additional environment variables for action environment. Default None
+        :param map_runtime_memory: Memory to use to run the map function. Default None (loaded from config)
+        :param reduce_runtime_memory: Memory to use to run the reducers. Default None (loaded from config)
+        :param timeout: Time that the functions have to complete their execution before raising a timeout
+        :param obj_chunk_size: the size of the data chunks to split each object. 'None' for processing the whole file in one function activation
+        :param obj_chunk_number: Number of chunks to split each object. 'None' for processing the whole file in one function activation
+        :param obj_newline: New line character for keeping line integrity of partitions.
+        :param max_concurrency: Max number of concurrent range GETs in each reducer
+        :param max_buffer_size: Max size in MiB of the in-flight downloads in each reducer, and of the downloaded records it keeps in memory before spilling them to disk
+        :param include_modules: Explicitly pickle these dependencies.
+        :param exclude_modules: Explicitly keep these modules from pickled dependencies.
+
+        :return: A list with the futures of the mappers and the reducers.
+        """
+        self.last_call = 'shuffle'
+        map_job_id = self._create_job_id('M')
+
+        runtime_meta = self.invoker.select_runtime(map_job_id, map_runtime_memory)
+
+        shuffle_map = create_shuffle_mapper(
+            map_function=map_function,
+            executor_id=self.executor_id,
+            job_id=map_job_id,
+            num_partitions=num_partitions,
+            partitioner=partitioner or hash_partitioner,
+            combiner=combiner,
+            sort=sort
+        )
+
+        map_job = create_map_job(
             config=self.config,
             internal_storage=self.internal_storage,
             executor_id=self.executor_id,
-            reduce_job_id=reduce_job_id,
+            job_id=map_job_id,
+            map_function=shuffle_map,
+            iterdata=map_iterdata,
+            chunksize=chunksize,
+            runtime_meta=runtime_meta,
+            runtime_memory=map_runtime_memory,
+            extra_args=extra_args,
+            extra_env=extra_env,
+            obj_chunk_size=obj_chunk_size,
+            obj_chunk_number=obj_chunk_number,
+            obj_newline=obj_newline,
+            include_modules=include_modules,
+            exclude_modules=exclude_modules,
+            execution_timeout=timeout
+        )
+
+        map_futures = self.invoker.run_job(map_job)
+        self.futures.extend(map_futures)
+
+        [f._set_mapreduce() for f in map_futures]
+
+        reduce_job_id = map_job_id.replace('M', 'R')
+
+        runtime_meta = self.invoker.select_runtime(reduce_job_id, reduce_runtime_memory)
+
+        shuffle_reduce = create_shuffle_reducer(
+            executor_id=self.executor_id,
+            job_id=map_job_id,
+            num_mappers=map_job.total_calls,
             reduce_function=reduce_function,
-            map_job=map_job,
-            map_futures=map_futures,
+            combiner=combiner,
+            sort=sort,
+            max_concurrency=max_concurrency,
+            max_buffer_size=max_buffer_size
+        )
+
+        reduce_job = create_map_job(
+            config=self.config,
+            internal_storage=self.internal_storage,
+            executor_id=self.executor_id,
+            job_id=reduce_job_id,
+            map_function=shuffle_reduce,
+            iterdata=[(partition, ) for partition in range(num_partitions)],
             runtime_meta=runtime_meta,
             runtime_memory=reduce_runtime_memory,
-            extra_args=extra_args_reduce,
-            obj_reduce_by_key=obj_reduce_by_key,
             extra_env=extra_env,
             include_modules=include_modules,
-            exclude_modules=exclude_modules
+            exclude_modules=exclude_modules,
+            execution_timeout=timeout
         )
 
-        reduce_futures = self.invoker.run_job(reduce_job)
+        # The reducers read the map outputs from the storage backend, so
+        # they are invoked as soon as all the mappers are done
+        reduce_futures = self.invoker.run_job(reduce_job, [map_futures] * num_partitions)
         self.futures.extend(reduce_futures)
 
-        [f._set_mapreduce() for f in map_futures]
+        logger.debug(f'ExecutorID {self.executor_id} | JobID {reduce_job_id} - '
+                     f'{num_partitions} reducers pipelined after the map stage')
 
         return create_futures_list(map_futures + reduce_futures, self)
 
+    def reattach(
+        self,
+        resubmit: Optional[bool] = False
+    ) -> FuturesList:
+        """
+        Rebuild the futures of the jobs submitted by another executor from their manifests,
+        for example after the host process that was waiting for them crashed. The calls that
+        already finished are set as ready. The executor must be created with the ID of the
+        other executor, and must not have submitted any job.
+
+        :param resubmit: Invoke again the calls that did not finish. Calls that are still running are executed again
+
+        :return: A list with the futures of all the calls of the reattached jobs
+        """
+        if self.futures:
+            raise Exception('Cannot reattach an executor that already submitted jobs')
+
+        executor_id = self.executor_id
+        manifests = self.internal_storage.get_job_manifests(executor_id)
+        if not manifests:
+            raise Exception(f'No job manifests found for the executor {executor_id}')
+        manifests.sort(key=lambda manifest: int(manifest['job_id'][1:]))
+
+        logger.info(f'ExecutorID {executor_id} - Reattaching to {len(manifests)} jobs')
+        self.total_jobs = int(manifests[-1]['job_id'][1:]) + 1
+        self.last_call = 'map'
+
+        _, callids_done = self.internal_storage.get_job_status(executor_id)
+
+        futures = []
+        for manifest in manifests:
+            job = load_job_manifest(manifest)
+            futures.extend(self.invoker.reattach_job(job, callids_done, resubmit))
+        self.futures.extend(futures)
+
+        return create_futures_list(futures, self)
+
     def wait(
         self,
         fs: Optional[Union[ResponseFuture, FuturesList, List[ResponseFuture]]] = None,
@@ -440,6 +770,9 @@ class FunctionExecutor:
                  show_progressbar=show_progressbar,
                  futures_from_executor_wait=False if fs else True)
 
+            if self._autotune_jobs:
+                self._record_performance(futures)
+
             if self.data_cleaner and return_when == ALL_COMPLETED:
                 present_jobs = {f.job_key for f in futures}
                 self.compute_handler.clear(present_jobs)
@@ -515,7 +848,7 @@ class FunctionExecutor:
 
         logger.debug(f'ExecutorID {self.executor_id} - Finished getting results')
 
-        if len(result) == 1 and self.last_call != 'map':
+        if len(result) == 1 and self.last_call not in ('map', 'shuffle'):
             return result[0]
 
         return result
@@ -544,12 +877,43 @@ class FunctionExecutor:
             return
 
         logging.getLogger('matplotlib').setLevel(logging.WARNING)
-        from lithops.plots import create_timeline, create_histogram
+        from lithops.plots import create_timeline, create_histogram, create_resources_plot
 
         logger.info(f'ExecutorID {self.executor_id} - Creating execution plots')
 
         create_timeline(ftrs_to_plot, dst, figsize)
         create_histogram(ftrs_to_plot, dst, figsize)
+        create_resources_plot(ftrs_to_plot, dst, figsize)
+
+    def storage_stats(
+        self,
+        fs: Optional[Union[ResponseFuture, List[ResponseFuture], FuturesList]] = None
+    ) -> Dict[str, Any]:
+        """
+        Returns the storage requests, bytes, time, errors and retries, in total
+        and per operation, of the executor process (job submission, status
+        polling, results download) and of the calls of the finished futures.
+
+        :param fs: list of futures. If None, the futures of the executor.
+
+        :return: dictionary with the 'host' and 'workers' totals, and the
+            totals of the calls of each job under 'jobs'
+        """
+        ftrs = self.futures if not fs else fs
+
+        if isinstance(ftrs, ResponseFuture):
+            ftrs = [ftrs]
+
+        jobs = {}
+        for f in ftrs:
+            if f.stats.get('worker_storage_ops'):
+                jobs.setdefault(f.job_key, []).append(f.stats['worker_storage_ops'])
+
+        return {
+            'host': summarize_ops(self.internal_storage.storage.metrics.snapshot()),
+            'workers': summarize_ops(merge_ops(ops for job_ops in jobs.values() for ops in job_ops)),
+            'jobs': {job_key: summarize_ops(merge_ops(job_ops)) for job_key, job_ops in jobs.items()}
+        }
 
     def clean(
         self,
@@ -575,6 +939,11 @@ class FunctionExecutor:
         global CLEANER_PROCESS
 
         def save_data_to_clean(data):
+            if in_memory_storage:
+                # The memory storage does not outlive this process, so its
+                # data is deleted now instead of by the cleaner process
+                self._clean_data(data)
+                return
             with tempfile.NamedTemporaryFile(dir=CLEANER_DIR, delete=False) as temp:
                 pickle.dump(data, temp)
 
@@ -583,6 +952,8 @@ class FunctionExecutor:
         except AttributeError:
             return
 
+        in_memory_storage = self.internal_storage.backend == 'memory'
+
         if cs:
             data = {
                 'cos_to_clean': list(cs),
@@ -608,6 +979,12 @@ class FunctionExecutor:
         if jobs_to_clean:
             if not on_exit:
                 logger.info(f'ExecutorID {self.executor_id} - Cleaning temporary data')
+            # Logs stored as separate objects are deleted with their job,
+            # so they are mirrored to the local log files first
+            for f in futures:
+                if f.job_key in jobs_to_clean and f._call_status and 'logs_key' in f._call_status:
+                    logs_writer.submit(f, self.internal_storage)
+            logs_writer.flush()
             data = {
                 'jobs_to_clean': jobs_to_clean,
                 'clean_cloudobjects': clean_cloudobjects,
@@ -616,11 +993,25 @@ class FunctionExecutor:
             save_data_to_clean(data)
             self.cleaned_jobs.update(jobs_to_clean)
 
-        spawn_cleaner = not (CLEANER_PROCESS and CLEANER_PROCESS.poll() is None)
+        spawn_cleaner = not in_memory_storage and not (CLEANER_PROCESS and CLEANER_PROCESS.poll() is None)
         if (jobs_to_clean or cs) and spawn_cleaner:
             cmd = [sys.executable, '-m', 'lithops.scripts.cleaner']
             CLEANER_PROCESS = sp.Popen(cmd, start_new_session=True)
 
+    def _clean_data(self, data):
+        """
+        Deletes the temp data described by a clean() request from storage,
+        the same way the cleaner process does
+        """
+        storage = self.internal_storage.storage
+        prefixes, cloudobjects = get_clean_targets(data)
+        # Sequential requests, since it also runs at exit, and no delay between
+        # rounds, since the listings of the in-memory storage are consistent
+        clean_prefixes(storage, storage.bucket, prefixes, max_concurrency=1, round_delay=0)
+        for co in cloudobjects:
+            if co.backend == storage.backend:
+                storage.delete_object(co.bucket, co.key)
+
     def job_summary(self, cloud_objects_n: Optional[int] = 0):
         """
         Logs information of a job executed by the calling function executor.
@@ -632,7 +1023,9 @@ class FunctionExecutor:
         import numpy as np
 
         def init():
-            headers = ['Job_ID', 'Function', 'Invocations', 'Memory(MB)', 'AvgRuntime', 'Cost', 'CloudObjects']
+            headers = ['Job_ID', 'Function', 'Invocations', 'Memory(MB)', 'AvgRuntime', 'Cost',
+                       'CacheHits', 'CacheMisses', 'StorageRequests', 'StorageMB', 'StorageTime',
+                       'CloudObjects']
             pd.DataFrame([], columns=headers).to_csv(self.log_path, index=False)
 
         def append(content):
@@ -643,10 +1036,22 @@ class FunctionExecutor:
             """ add a summary row to the log file"""
             df = pd.read_csv(self.log_path)
             total_average = sum(df.AvgRuntime * df.Invocations) / df.Invocations.sum()
+            # The storage totals of the executor include the requests of the host
+            host = storage_stats['host']
             total_row = pd.DataFrame([['Summary', ' ', df.Invocations.sum(), df['Memory(MB)'].sum(),
-                                       round(total_average, 10), df.Cost.sum(), cloud_objects_n]])
+                                       round(total_average, 10), df.Cost.sum(), df.CacheHits.sum(),
+                                       df.CacheMisses.sum(), df.StorageRequests.sum() + host['requests'],
+                                       round(df.StorageMB.sum() + (host['read_bytes'] + host['write_bytes']) / 1024 ** 2, 3),
+                                       round(df.StorageTime.sum() + host['time'], 6), cloud_objects_n]])
             total_row.to_csv(self.log_path, mode='a', header=False, index=False)
 
+        def job_storage(job_key):
+            """ returns the storage requests, MiB and time of the calls of a job"""
+            job = storage_stats['jobs'].get(job_key)
+            if not job:
+                return [0, 0, 0]
+            return [job['requests'], round((job['read_bytes'] + job['write_bytes']) / 1024 ** 2, 3), job['time']]
+
         def get_object_num():
             """returns cloud objects used up to this point, using this function executor. """
             df = pd.read_csv(self.log_path)
@@ -665,23 +1070,38 @@ class FunctionExecutor:
             futures = self.futures
             if type(futures) is not list:
                 futures = [futures]
+            storage_stats = self.storage_stats(futures)
 
             memory = []
             runtimes = []
+            cache_hits = 0
+            cache_misses = 0
             curr_job_id = futures[0].job_id
+            curr_job_key = futures[0].job_key
             job_func = futures[0].function_name  # each job is conducted on a single function
 
             for future in futures:
                 if curr_job_id != future.job_id:
                     cost = self.compute_handler.backend.calc_cost(runtimes, memory)
                     append([[curr_job_id, job_func, len(runtimes), sum(memory),
-                             np.round(np.average(runtimes), 10), cost, ' ']])
+                             np.round(np.average(runtimes) if runtimes else 0, 10), cost, cache_hits, cache_misses,
+                             *job_storage(curr_job_key), ' ']])
 
                     # updating next iteration's variables:
                     curr_job_id = future.job_id
+                    curr_job_key = future.job_key
                     job_func = future.function_name
                     memory.clear()
                     runtimes.clear()
+                    cache_hits = 0
+                    cache_misses = 0
+
+                if future.stats.get('host_cache_hit'):
+                    # The call was not invoked, so it has no cost
+                    cache_hits += 1
+                    continue
+                if 'host_cache_lookup_time' in future.stats:
+                    cache_misses += 1
 
                 memory.append(future.runtime_memory)
                 runtimes.append(future.stats['worker_exec_time'])
@@ -689,7 +1109,8 @@ class FunctionExecutor:
             # appends last Job-ID
             cost = self.compute_handler.backend.calc_cost(runtimes, memory)
             append([[curr_job_id, job_func, len(runtimes), sum(memory),
-                     np.round(np.average(runtimes), 10), cost, ' ']])
+                     np.round(np.average(runtimes) if runtimes else 0, 10), cost, cache_hits, cache_misses,
+                     *job_storage(curr_job_key), ' ']])
             # append summary row to end of the dataframe
             append_summary()
 
@@ -20,10 +20,13 @@ import os
 import sys
 import time
 import zlib
+import json
 import base64
 import pickle
 import logging
 import traceback
+import threading
+import queue
 from six import reraise
 
 from lithops.storage import InternalStorage
@@ -37,6 +40,67 @@ from lithops.constants import FN_LOG_FILE, LOGS_DIR
 logger = logging.getLogger(__name__)
 
 
+class LogsWriter:
+    """
+    Background writer that appends the execution logs of the finished
+    calls to the local log files, out of the critical path of wait().
+    Logs embedded in the status are written when the status arrives, and
+    logs stored as separate objects right before their job is cleaned
+    """
+    NUM_THREADS = 4
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._file_lock = threading.Lock()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for _ in range(self.NUM_THREADS):
+                t = threading.Thread(target=self._run, daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _run(self):
+        while True:
+            future, internal_storage = self._queue.get()
+            try:
+                self._write(future, internal_storage)
+            except Exception as e:
+                logger.debug(f'Unable to write the logs of call {future.call_id}: {e}')
+            finally:
+                self._queue.task_done()
+
+    def _write(self, future, internal_storage):
+        logs = future.get_logs(internal_storage)
+        if not logs:
+            return
+        job_key = create_job_key(future.executor_id, future.job_id)
+        log_file = os.path.join(LOGS_DIR, job_key + '.log')
+        header = "Activation: '{}' ({})\n[\n".format(future.runtime_name, future.activation_id)
+        tail = ']\n\n'
+        output = logs.replace('\r', '').replace('\n', '\n    ', logs.count('\n') - 1)
+        with self._file_lock:
+            with open(log_file, 'a') as lf:
+                lf.write(header + '    ' + output + tail)
+            with open(FN_LOG_FILE, 'a') as lf:
+                lf.write(header + '    ' + output + tail)
+
+    def submit(self, future, internal_storage=None):
+        self._start()
+        self._queue.put((future, internal_storage))
+
+    def flush(self):
+        """ Blocks until all the pending logs are written """
+        self._queue.join()
+
+
+logs_writer = LogsWriter()
+
+
 class ResponseFuture:
     """
     Object representing the result of a Lithops invocation. Returns the status of the
@@ -66,7 +130,7 @@ class ResponseFuture:
         self.runtime_memory = job.runtime_memory
         self.activation_id = None
         self.stats = {}
-        self.logs = None
+        self._logs = None
 
         self._storage_config = storage_config
         self._produce_output = True
@@ -169,6 +233,33 @@ class ResponseFuture:
         if self.success:
             self._state = ResponseFuture.State.Done
 
+    @property
+    def logs(self):
+        """
+        Execution logs of the call. Logs stored as separate objects are
+        fetched lazily from storage.
+        """
+        return self.get_logs()
+
+    def get_logs(self, internal_storage=None):
+        """
+        Return the execution logs of the call, or None if not available.
+
+        :param internal_storage: Storage handler to fetch the logs. Default None.
+        :return: Execution logs of the call.
+        """
+        if self._logs is not None or self._call_status is None:
+            return self._logs
+
+        if 'logs' in self._call_status:
+            self._logs = zlib.decompress(base64.b64decode(self._call_status['logs'].encode())).decode()
+        elif 'logs_key' in self._call_status:
+            if internal_storage is None:
+                internal_storage = InternalStorage(self._storage_config)
+            self._logs = internal_storage.get_call_logs(self.executor_id, self.job_id, self.call_id)
+
+        return self._logs
+
     def status(self, throw_except=True, internal_storage=None, check_only=False):
         """
         Return the status returned by the call.
@@ -209,21 +300,20 @@ class ResponseFuture:
         self.activation_id = self._call_status['activation_id']
 
         if 'logs' in self._call_status:
-            self.logs = zlib.decompress(base64.b64decode(self._call_status['logs'].encode())).decode()
-            job_key = create_job_key(self.executor_id, self.job_id)
-            log_file = os.path.join(LOGS_DIR, job_key + '.log')
-            header = "Activation: '{}' ({})\n[\n".format(self.runtime_name, self.activation_id)
-            tail = ']\n\n'
-            output = self.logs.replace('\r', '').replace('\n', '\n    ', self.logs.count('\n') - 1)
-            with open(log_file, 'a') as lf:
-                lf.write(header + '    ' + output + tail)
-            with open(FN_LOG_FILE, 'a') as lf:
-                lf.write(header + '    ' + output + tail)
+            logs_writer.submit(self)
 
         for key in self._call_status:
             if any(key.startswith(ss) for ss in ['func', 'host', 'worker']):
                 self.stats[key] = self._call_status[key]
 
+        if 'worker_func_resource_samples' in self._call_status:
+            samples = self._call_status['worker_func_resource_samples']
+            self.stats['worker_func_resource_samples'] = json.loads(
+                zlib.decompress(base64.b64decode(samples.encode())).decode())
+
+        if isinstance(self._call_status.get('worker_storage_ops'), str):
+            self.stats['worker_storage_ops'] = json.loads(self._call_status['worker_storage_ops'])
+
         self.stats['worker_exec_time'] = round(self.stats['worker_end_tstamp'] - self.stats['worker_start_tstamp'], 8)
         total_time = format(round(self.stats['worker_exec_time'], 2), '.2f')
 
@@ -324,12 +414,18 @@ class ResponseFuture:
             return self._call_output
 
         if self._call_output is None:
-            call_output = internal_storage.get_call_output(self.executor_id, self.job_id, self.call_id)
+            def get_call_output():
+                if 'cache_key' in self._call_status:
+                    # The result was found in the results cache and the call was not invoked
+                    return internal_storage.get_cached_output(self._call_status['cache_key'])
+                return internal_storage.get_call_output(self.executor_id, self.job_id, self.call_id)
+
+            call_output = get_call_output()
             self._output_query_count += 1
 
             while call_output is None and self._output_query_count < self.GET_RESULT_MAX_RETRIES:
                 time.sleep(self.GET_RESULT_SLEEP_SECS)
-                call_output = internal_storage.get_call_output(self.executor_id, self.job_id, self.call_id)
+                call_output = get_call_output()
                 self._output_query_count += 1
 
             if call_output is None:
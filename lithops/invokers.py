@@ -22,13 +22,18 @@ import queue
 import shutil
 import logging
 import threading
+from abc import ABC, abstractmethod
+from itertools import chain
+from functools import partial
 from concurrent.futures import ThreadPoolExecutor
 
 from lithops.future import ResponseFuture
+from lithops.job import create_job_manifest
 from lithops.config import extract_storage_config
 from lithops.version import __version__
 from lithops.utils import verify_runtime_name, version_str, is_lithops_worker, iterchunks
-from lithops.constants import LOGGER_LEVEL, LOGS_DIR, SERVERLESS, SA_INSTALL_DIR, STANDALONE_BACKENDS
+from lithops.constants import LOGGER_LEVEL, LOGS_DIR, SERVERLESS, SA_INSTALL_DIR, STANDALONE_BACKENDS, \
+    DISPATCH_DEFAULT, DISPATCH_CHOICES
 from lithops.util.metrics import PrometheusExporter
 
 logger = logging.getLogger(__name__)
@@ -58,10 +63,11 @@ def create_invoker(config, executor_id, internal_storage,
         )
 
 
-class Invoker:
+class Invoker(ABC):
     """
     Abstract invoker class
     """
+    PIPELINE_POLL_INTERVAL = 0.5
 
     def __init__(self, config, executor_id, internal_storage, compute_handler, job_monitor):
         log_level = logger.getEffectiveLevel()
@@ -90,6 +96,8 @@ class Invoker:
 
         verify_runtime_name(self.runtime_name)
 
+        self.pipelines = []
+
         logger.debug(f'ExecutorID {self.executor_id} - Invoker initialized.'
                      f' Max workers: {self.max_workers}')
 
@@ -155,16 +163,131 @@ class Invoker:
             'lithops_version': __version__,
             'runtime_name': job.runtime_name,
             'runtime_memory': job.runtime_memory,
-            'worker_processes': job.worker_processes
+            'worker_processes': job.worker_processes,
+            'cache_hash': job.cache_hash
         }
 
         return payload
 
-    def _run_job(self, job):
+    def _add_call_ids(self, payload, job, call_ids):
         """
-        Run a job
+        Sets in the payload the call ids to run and their data
+        """
+        payload['call_ids'] = call_ids
+
+        if job.data_key:
+            payload['data_byte_ranges'] = [job.data_byte_ranges[int(call_id)] for call_id in call_ids]
+        else:
+            del payload['data_byte_ranges']
+            payload['data_byte_strs'] = [job.data_byte_strs[int(call_id)] for call_id in call_ids]
+
+    def _start_pipeline(self, job, futures, upstream_futures):
+        """
+        Invokes each chunk of calls of the job as soon as the upstream
+        futures it depends on are complete, instead of invoking the whole
+        job at once. The call i of the job depends on upstream_futures[i],
+        which is either a future or a list of futures
+        """
+        stop_event = threading.Event()
+        self.pipelines.append(stop_event)
+
+        def upstream_done(call_id):
+            fs = upstream_futures[call_id]
+            fs = fs if isinstance(fs, list) else [fs]
+            return all(f.ready or f.success or f.done for f in fs)
+
+        def pipeline():
+            pending = [list(chunk) for chunk in iterchunks(range(job.total_calls), job.chunksize)
+                       if chunk[0] not in job.cached_calls]
+            while pending and not stop_event.is_set():
+                ready = [chunk for chunk in pending if all(upstream_done(i) for i in chunk)]
+                if ready:
+                    pending = [chunk for chunk in pending if chunk not in ready]
+                    call_ids = list(chain(*ready))
+                    logger.debug(
+                        f'ExecutorID {job.executor_id} | JobID {job.job_id} - Upstream futures '
+                        f'done, invoking {len(call_ids)} pipelined activations - Pending: '
+                        f'{sum(len(chunk) for chunk in pending)}'
+                    )
+                    try:
+                        self._invoke_calls(job, call_ids)
+                    except Exception as e:
+                        logger.error(
+                            f'ExecutorID {job.executor_id} | JobID {job.job_id} - '
+                            f'Pipelined invocation failed: {e}'
+                        )
+                        [f._set_exception() for f in futures if f.new]
+                        break
+                    for i in call_ids:
+                        futures[i]._set_invoked()
+                stop_event.wait(self.PIPELINE_POLL_INTERVAL)
+
+            if stop_event in self.pipelines:
+                self.pipelines.remove(stop_event)
+
+        thread = threading.Thread(target=pipeline, daemon=True)
+        thread.start()
+
+    @abstractmethod
+    def _invoke_job(self, job):
+        """
+        Invokes all the calls of a job
+        """
+        pass
+
+    @abstractmethod
+    def _invoke_calls(self, job, call_ids):
+        """
+        Invokes a subset of the calls of a job. call_ids is a sorted list
+        of call indexes made of whole chunks of the job
+        """
+        pass
+
+    def _invoke_backup(self, job, call_id):
+        """
+        Invokes a backup activation of a straggler call. It is invoked
+        directly, without waiting for a free worker
+        """
+        payload = self._create_payload(job)
+        self._add_call_ids(payload, job, [call_id])
+        activation_id = self.compute_handler.invoke(payload)
+        logger.debug(
+            f'ExecutorID {job.executor_id} | JobID {job.job_id} - Backup activation of call '
+            f'{call_id} invoked - Activation ID: {activation_id or job.job_key}'
+        )
+
+    def _get_uncached_calls(self, job):
+        """
+        Returns the indexes of the calls without a result in the results cache
+        """
+        return [i for i in range(job.total_calls) if i not in job.cached_calls]
+
+    def _set_cached(self, future, cache_key, result_size):
+        """
+        Sets a future as ready, with a call status that points to its
+        result in the results cache
+        """
+        now = time.time()
+        future._set_ready({
+            'type': '__end__',
+            'exception': False,
+            'activation_id': 'cache',
+            'executor_id': future.executor_id,
+            'job_id': future.job_id,
+            'call_id': future.call_id,
+            'worker_start_tstamp': now,
+            'worker_end_tstamp': now,
+            'func_result_size': result_size,
+            'host_cache_hit': True,
+            'cache_key': cache_key
+        })
+
+    def _run_job(self, job, upstream_futures=None):
         """
-        if self.include_function:
+        Run a job. If upstream_futures is set, the calls are invoked
+        as the upstream futures they depend on complete
+        """
+        if self.include_function and len(job.cached_calls) < job.total_calls:
             logger.debug('ExecutorID {} | JobID {} - Runtime include function feature '
                          ' is activated' .format(job.executor_id, job.job_id))
             job.runtime_name = self.runtime_name
@@ -204,7 +327,9 @@ class Invoker:
 
         try:
             job.runtime_name = self.runtime_name
-            self._invoke_job(job)
+            self.internal_storage.put_job_manifest(job.executor_id, job.job_id, create_job_manifest(job))
+            if upstream_futures is None:
+                self._invoke_job(job)
         except (KeyboardInterrupt, Exception) as e:
             self.stop()
             raise e
@@ -221,18 +346,73 @@ class Invoker:
             fut = ResponseFuture(call_id, job,
                                  job.metadata.copy(),
                                  self.storage_config)
-            fut._set_state(ResponseFuture.State.Invoked)
+            if i in job.cached_calls:
+                self._set_cached(fut, *job.cached_calls[i])
+            elif upstream_futures is None:
+                fut._set_state(ResponseFuture.State.Invoked)
+            futures.append(fut)
+
+        job.futures = futures
+
+        if upstream_futures is not None:
+            self._start_pipeline(job, futures, upstream_futures)
+
+        return futures
+
+    def _reattach_job(self, job, callids_done, resubmit):
+        """
+        Recreates the futures of a job restored from its manifest. The calls
+        that have a status are set as ready, and the chunks with calls that
+        did not finish are invoked again if resubmit is set
+        """
+        futures = []
+        for i in range(job.total_calls):
+            call_id = "{:05d}".format(i)
+            fut = ResponseFuture(call_id, job,
+                                 job.metadata.copy(),
+                                 self.storage_config)
+            if i in job.cached_calls:
+                self._set_cached(fut, *job.cached_calls[i])
+            else:
+                fut._set_state(ResponseFuture.State.Invoked)
             futures.append(fut)
 
         job.futures = futures
 
+        def get_status(f):
+            return self.internal_storage.get_call_status(f.executor_id, f.job_id, f.call_id)
+
+        fs_done = [f for f in futures if (f.executor_id, f.job_id, f.call_id) in callids_done]
+        with ThreadPoolExecutor(max_workers=32) as ex:
+            for f, call_status in zip(fs_done, ex.map(get_status, fs_done)):
+                if call_status:
+                    f._set_ready(call_status)
+
+        logger.info(
+            f'ExecutorID {job.executor_id} | JobID {job.job_id} - Reattached to {job.function_name}() '
+            f'- Total: {job.total_calls} activations - Done: {len(fs_done)}'
+        )
+
+        if resubmit:
+            chunks = [chunk for chunk in iterchunks(range(job.total_calls), job.chunksize)
+                      if any(futures[i].invoked for i in chunk)]
+            if chunks:
+                call_ids = list(chain(*chunks))
+                logger.info(
+                    f'ExecutorID {job.executor_id} | JobID {job.job_id} - '
+                    f'Resubmitting {len(call_ids)} activations'
+                )
+                self._invoke_calls(job, call_ids)
+
         return futures
 
     def stop(self):
         """
         Stop invoker-related processes
         """
-        pass
+        for stop_event in self.pipelines:
+            stop_event.set()
+        self.pipelines = []
 
 
 class BatchInvoker(Invoker):
@@ -248,6 +428,9 @@ class BatchInvoker(Invoker):
         """
         Run a job
         """
+        if job.cached_calls:
+            return self._invoke_calls(job, self._get_uncached_calls(job))
+
         payload = self._create_payload(job)
         payload['call_ids'] = ["{:05d}".format(i) for i in range(job.total_calls)]
 
@@ -261,12 +444,42 @@ class BatchInvoker(Invoker):
             f'({resp_time}s) - Activation ID: {activation_id or job.job_key}'
         )
 
-    def run_job(self, job):
+    def _invoke_calls(self, job, call_ids):
+        """
+        Invokes a subset of the calls of a job, one invocation
+        per run of consecutive calls
+        """
+        runs = []
+        for i in call_ids:
+            if runs and runs[-1][-1] == i - 1:
+                runs[-1].append(i)
+            else:
+                runs.append([i])
+
+        for run in runs:
+            payload = self._create_payload(job)
+            self._add_call_ids(payload, job, ["{:05d}".format(i) for i in run])
+            activation_id = self.compute_handler.invoke(payload)
+            logger.debug(
+                f'ExecutorID {job.executor_id} | JobID {job.job_id} - Calls {payload["call_ids"][0]}-'
+                f'{payload["call_ids"][-1]} invoked - Activation ID: {activation_id or job.job_key}'
+            )
+
+    def run_job(self, job, upstream_futures=None):
         """
         Run a job
         """
-        futures = self._run_job(job)
-        self.job_monitor.start(futures)
+        futures = self._run_job(job, upstream_futures)
+        self.job_monitor.start(futures, backup_invoker=partial(self._invoke_backup, job))
+
+        return futures
+
+    def reattach_job(self, job, callids_done, resubmit=False):
+        """
+        Reattach to a job restored from its manifest
+        """
+        futures = self._reattach_job(job, callids_done, resubmit)
+        self.job_monitor.start(futures, backup_invoker=partial(self._invoke_backup, job))
 
         return futures
 
@@ -287,11 +500,21 @@ class FaaSInvoker(Invoker):
         self.ongoing_activations = 0
         self.pending_calls_q = queue.Queue()
         self.should_run = False
+        self.running_workers = 0
+        self.workers_lock = threading.Lock()
         self.sync = is_lithops_worker()
 
         invoke_pool_threads = self.config[self.backend]['invoke_pool_threads']
         self.executor = ThreadPoolExecutor(invoke_pool_threads)
 
+        self.dispatch = self.config['lithops'].get('dispatch', DISPATCH_DEFAULT)
+        if self.dispatch not in DISPATCH_CHOICES:
+            raise Exception(f'Unknown dispatch mode "{self.dispatch}". Valid modes: {DISPATCH_CHOICES}')
+        if self.dispatch == 'pull' and not self.internal_storage.storage.supports_conditional_writes():
+            logger.warning(f'The {self.internal_storage.backend} storage backend does not support '
+                           'conditional writes. Using static dispatch')
+            self.dispatch = 'static'
+
         logger.debug(f'ExecutorID {self.executor_id} - Serverless invoker created')
 
     def _start_async_invokers(self):
@@ -327,6 +550,8 @@ class FaaSInvoker(Invoker):
         """
         Stop async invokers
         """
+        super().stop()
+
         if self.invokers:
             logger.debug(f'ExecutorID {self.executor_id} - Stopping async invokers')
             self.should_run = False
@@ -343,6 +568,25 @@ class FaaSInvoker(Invoker):
 
             self.invokers = []
 
+    def _reserve_workers(self, workers):
+        """
+        Reserves up to the given number of free workers. The pipeline threads
+        invoke calls concurrently with run_job(), so the count of running
+        workers is only updated under the workers lock. Returns the number
+        of free workers and the number of reserved workers
+        """
+        with self.workers_lock:
+            if self.should_run is False:
+                self.running_workers = 0
+                self.should_run = True
+                self._start_async_invokers()
+
+            free_workers = max(self.max_workers - self.running_workers, 0)
+            reserved = min(free_workers, workers)
+            self.running_workers += reserved
+
+        return free_workers, reserved
+
     def _invoke_task(self, job, call_ids_range):
         """Method used to perform the actual invocation against the
         compute backend.
@@ -351,14 +595,7 @@ class FaaSInvoker(Invoker):
         payload = self._create_payload(job)
 
         call_ids = ["{:05d}".format(i) for i in call_ids_range]
-        payload['call_ids'] = call_ids
-
-        if job.data_key:
-            data_byte_ranges = [job.data_byte_ranges[int(call_id)] for call_id in call_ids]
-            payload['data_byte_ranges'] = data_byte_ranges
-        else:
-            del payload['data_byte_ranges']
-            payload['data_byte_strs'] = [job.data_byte_strs[int(call_id)] for call_id in call_ids]
+        self._add_call_ids(payload, job, call_ids)
 
         # do the invocation
         start = time.time()
@@ -408,27 +645,80 @@ class FaaSInvoker(Invoker):
         Normal Invocation
         Use local threads to perform all the function invocations
         """
+        if job.total_calls and len(job.cached_calls) == job.total_calls:
+            return
+
         self.compute_handler.pre_invoke(job)
 
         if self.remote_invoker:
             return self._invoke_job_remote(job)
 
-        if self.should_run is False:
-            self.running_workers = 0
-            self.should_run = True
-            self._start_async_invokers()
+        if self.dispatch == 'pull':
+            return self._invoke_job_pull(job)
+
+        self._invoke_calls(job, self._get_uncached_calls(job))
+
+    def _invoke_job_pull(self, job):
+        """
+        Pull-based dispatch. Invokes up to the free workers, and each
+        worker claims ranges of calls of the job until none is left, so
+        the faster workers run more calls. The ranges are claimed with
+        conditional writes in the storage backend
+        """
+        call_ids = self._get_uncached_calls(job)
+        if not call_ids:
+            return
+
+        free_workers, workers = self._reserve_workers(
+            len(call_ids) // job.chunksize + (len(call_ids) % job.chunksize > 0)
+        )
+        if workers < 1:
+            return self._invoke_calls(job, call_ids)
+
+        job.dispatch_workers = workers
+
+        logger.debug(
+            f'ExecutorID {job.executor_id} | JobID {job.job_id} - Free workers: {free_workers} '
+            f'- Going to run {len(call_ids)} activations in {workers} pull-based workers'
+        )
+
+        payload = self._create_payload(job)
+        payload['dispatch'] = 'pull'
+        payload['dispatch_workers'] = workers
+        payload['data_byte_ranges'] = None
+
+        def invoke_worker(index):
+            worker_payload = payload.copy()
+            worker_payload['dispatch_index'] = index
+            activation_id = self.compute_handler.invoke(worker_payload)
+            while not activation_id:
+                # reached quota limit
+                time.sleep(random.randint(0, 5))
+                activation_id = self.compute_handler.invoke(worker_payload)
+            logger.debug(
+                f'ExecutorID {job.executor_id} | JobID {job.job_id} - Pull-based '
+                f'worker {index} invoked - Activation ID: {activation_id}'
+            )
+
+        invoke_futures = [self.executor.submit(invoke_worker, index) for index in range(workers)]
+        if self.sync:
+            [f.result() for f in invoke_futures]
+
+    def _invoke_calls(self, job, call_ids):
+        """
+        Invokes the calls directly while there are free workers, and puts
+        the rest into the pending queue
+        """
+        if not call_ids:
+            return
 
-        if self.running_workers < self.max_workers:
-            free_workers = self.max_workers - self.running_workers
-            total_direct = free_workers * job.chunksize
-            callids = range(job.total_calls)
-            callids_to_invoke_direct = callids[:total_direct]
-            callids_to_invoke_nondirect = callids[total_direct:]
+        cz = job.chunksize
+        free_workers, consumed_workers = self._reserve_workers(len(call_ids) // cz + (len(call_ids) % cz > 0))
 
-            ci = len(callids_to_invoke_direct)
-            cz = job.chunksize
-            consumed_workers = ci // cz + (ci % cz > 0)
-            self.running_workers += consumed_workers
+        if consumed_workers > 0:
+            total_direct = consumed_workers * cz
+            callids_to_invoke_direct = call_ids[:total_direct]
+            callids_to_invoke_nondirect = call_ids[total_direct:]
 
             logger.debug(
                 f'ExecutorID {job.executor_id} | JobID {job.job_id} - Free workers: '
@@ -459,21 +749,47 @@ class FaaSInvoker(Invoker):
         else:
             logger.debug(
                 f'ExecutorID {job.executor_id} | JobID {job.job_id} - Reached maximum {self.max_workers} '
-                f'workers, queuing {job.total_calls} function activations'
+                f'workers, queuing {len(call_ids)} function activations'
             )
-            for call_ids_range in iterchunks(range(job.total_calls), job.chunksize):
+            for call_ids_range in iterchunks(call_ids, job.chunksize):
                 self.pending_calls_q.put((job, call_ids_range))
 
-    def run_job(self, job):
+    def run_job(self, job, upstream_futures=None):
         """
         Run a job
         """
-        futures = self._run_job(job)
+        if upstream_futures is not None:
+            if self.remote_invoker:
+                upstream_futures = None
+            else:
+                self.compute_handler.pre_invoke(job)
+
+        futures = self._run_job(job, upstream_futures)
+        self.job_monitor.start(
+            fs=futures,
+            job_id=job.job_id,
+            chunksize=job.chunksize,
+            generate_tokens=True,
+            backup_invoker=partial(self._invoke_backup, job),
+            pull_workers=getattr(job, 'dispatch_workers', None)
+        )
+
+        return futures
+
+    def reattach_job(self, job, callids_done, resubmit=False):
+        """
+        Reattach to a job restored from its manifest
+        """
+        if resubmit:
+            self.compute_handler.pre_invoke(job)
+
+        futures = self._reattach_job(job, callids_done, resubmit)
         self.job_monitor.start(
             fs=futures,
             job_id=job.job_id,
             chunksize=job.chunksize,
-            generate_tokens=True
+            generate_tokens=True,
+            backup_invoker=partial(self._invoke_backup, job)
         )
 
         return futures
@@ -1,7 +1,13 @@
 from .job import create_map_job
 from .job import create_reduce_job
+from .job import create_reduce_groups
+from .job import create_job_manifest
+from .job import load_job_manifest
 
 __all__ = [
     'create_map_job',
-    'create_reduce_job'
+    'create_reduce_job',
+    'create_reduce_groups',
+    'create_job_manifest',
+    'load_job_manifest'
 ]
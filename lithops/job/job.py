@@ -18,16 +18,18 @@
 
 import os
 import time
+import base64
 import hashlib
 import inspect
 import pickle
 import logging
+import concurrent.futures as cf
 from types import SimpleNamespace
 
 from lithops import utils
 from lithops.job.partitioner import create_partitions
 from lithops.storage.utils import create_func_key, create_data_key, \
-    create_job_key, func_key_suffix
+    create_job_key, create_cache_key, func_key_suffix
 from lithops.job.serialize import SerializeIndependent, create_module_data
 from lithops.constants import MAX_AGG_DATA_SIZE, LOCALHOST, \
     SERVERLESS, STANDALONE, CUSTOM_RUNTIME_DIR, FAAS_BACKENDS
@@ -37,6 +39,14 @@ logger = logging.getLogger(__name__)
 
 FUNCTION_CACHE = set()
 MAX_DATA_IN_PAYLOAD = 8 * 1024  # Per invocation. 8KB
+CACHE_LOOKUP_THREADS = 32
+
+MANIFEST_KEYS = [
+    'executor_id', 'job_id', 'job_key', 'function_name', 'func_key', 'data_key',
+    'data_byte_ranges', 'total_calls', 'chunksize', 'worker_processes',
+    'execution_timeout', 'runtime_name', 'runtime_memory', 'runtime_timeout',
+    'extra_env', 'cache_hash', 'metadata'
+]
 
 
 def create_map_job(
@@ -53,10 +63,12 @@ def create_map_job(
     exclude_modules,
     execution_timeout,
     chunksize=None,
+    worker_processes=None,
     extra_args=None,
     obj_chunk_size=None,
     obj_newline='\n',
-    obj_chunk_number=None
+    obj_chunk_number=None,
+    cache=False
 ):
     """
     Wrapper to create a map job. It integrates COS logic to process objects.
@@ -67,6 +79,9 @@ def create_map_job(
     # Object processing functionality
     ppo = None
     if utils.is_object_processing_function(map_function):
+        if cache:
+            raise ValueError('The results cache can not be used with object processing functions, '
+                             'since the cache keys do not track changes in the input objects')
         create_partitions_start = time.time()
         # Create partitions according chunk_size or chunk_number
         logger.debug('ExecutorID {} | JobID {} - Calling map on partitions '
@@ -86,13 +101,15 @@ def create_map_job(
         func=map_function,
         iterdata=map_iterdata,
         chunksize=chunksize,
+        worker_processes=worker_processes,
         runtime_meta=runtime_meta,
         runtime_memory=runtime_memory,
         extra_env=extra_env,
         include_modules=include_modules,
         exclude_modules=exclude_modules,
         execution_timeout=execution_timeout,
-        host_job_meta=host_job_meta
+        host_job_meta=host_job_meta,
+        cache=cache
     )
 
     if ppo:
@@ -101,6 +118,21 @@ def create_map_job(
     return job
 
 
+def create_reduce_groups(map_job, map_futures, obj_reduce_by_key):
+    """
+    Returns the lists of map futures that each reducer has to process
+    """
+    if hasattr(map_job, 'parts_per_object') and obj_reduce_by_key:
+        prev_total_partitons = 0
+        reduce_groups = []
+        for total_partitions in map_job.parts_per_object:
+            reduce_groups.append(map_futures[prev_total_partitons:prev_total_partitons + total_partitions])
+            prev_total_partitons += total_partitions
+        return reduce_groups
+
+    return [map_futures]
+
+
 def create_reduce_job(
     config,
     internal_storage,
@@ -116,23 +148,24 @@ def create_reduce_job(
     include_modules,
     exclude_modules,
     execution_timeout=None,
-    extra_args=None
+    extra_args=None,
+    reduce_streaming=False,
+    reduce_groups=None
 ):
     """
-    Wrapper to create a reduce job. Apply a function across all map futures.
+    Wrapper to create a reduce job. Apply a function across all map futures,
+    or across each list of futures in reduce_groups if provided.
     """
     host_job_meta = {'host_job_create_tstamp': time.time()}
 
-    iterdata = [(map_futures, )]
+    if reduce_groups is None:
+        reduce_groups = create_reduce_groups(map_job, map_futures, obj_reduce_by_key)
 
-    if hasattr(map_job, 'parts_per_object') and obj_reduce_by_key:
-        prev_total_partitons = 0
-        iterdata = []
-        for total_partitions in map_job.parts_per_object:
-            iterdata.append((map_futures[prev_total_partitons:prev_total_partitons + total_partitions],))
-            prev_total_partitons += total_partitions
+    iterdata = [(group, ) for group in reduce_groups]
 
     reduce_job_env = {'__LITHOPS_REDUCE_JOB': True}
+    if reduce_streaming:
+        reduce_job_env['__LITHOPS_REDUCE_STREAMING'] = True
     if extra_env is None:
         ext_env = reduce_job_env
     else:
@@ -172,7 +205,9 @@ def _create_job(
     exclude_modules,
     execution_timeout,
     host_job_meta,
-    chunksize=None
+    chunksize=None,
+    worker_processes=None,
+    cache=False
 ):
     """
     Creates a new Job
@@ -189,7 +224,7 @@ def _create_job(
 
     job = SimpleNamespace()
     job.chunksize = chunksize or config['lithops']['chunksize']
-    job.worker_processes = config[backend]['worker_processes']
+    job.worker_processes = worker_processes or config[backend]['worker_processes']
     job.execution_timeout = execution_timeout or config['lithops']['execution_timeout']
     job.executor_id = executor_id
     job.job_id = job_id
@@ -268,11 +303,31 @@ def _create_job(
     upload_function = not config[backend].get("runtime_include_function", False)
     upload_data = any([(len(data_str) * job.chunksize) > MAX_DATA_IN_PAYLOAD for data_str in data_strs])
 
-    # Upload function and modules
     if upload_function:
         function_hash = hashlib.md5(func_module_str).hexdigest()
         job.func_key = create_func_key(executor_id, function_hash)
-        if job.func_key not in FUNCTION_CACHE:
+    else:
+        function_file = func.__code__.co_filename
+        function_hash = hashlib.md5(open(function_file, 'rb').read()).hexdigest()[:16]
+
+    # Look up the results of the calls in the results cache
+    job.cache_hash = function_hash if cache else None
+    job.cached_calls = {}
+    if cache:
+        lookup_start = time.time()
+        job.cached_calls = _find_cached_calls(internal_storage, function_hash, data_strs, job.chunksize)
+        host_job_meta['host_cache_lookup_time'] = round(time.time() - lookup_start, 6)
+        logger.debug(f'ExecutorID {executor_id} | JobID {job_id} - Results cache: '
+                     f'{len(job.cached_calls)} hits - {job.total_calls - len(job.cached_calls)} misses')
+
+    # No call is going to be invoked if all of them are cached
+    all_cached = job.total_calls > 0 and len(job.cached_calls) == job.total_calls
+
+    # Upload function and modules
+    if upload_function:
+        if all_cached:
+            host_job_meta['host_func_upload_time'] = 0
+        elif job.func_key not in FUNCTION_CACHE:
             logger.debug('ExecutorID {} | JobID {} - Uploading function and modules '
                          'to the storage backend'.format(executor_id, job_id))
             func_upload_start = time.time()
@@ -287,8 +342,6 @@ def _create_job(
 
     else:
         # Prepare function and modules locally to store in the runtime image later
-        function_file = func.__code__.co_filename
-        function_hash = hashlib.md5(open(function_file, 'rb').read()).hexdigest()[:16]
         mod_hash = hashlib.md5(repr(sorted(mod_paths)).encode('utf-8')).hexdigest()[:16]
         job.func_key = func_key_suffix
         job.ext_runtime_uuid = f'{function_hash}{mod_hash}'
@@ -297,7 +350,15 @@ def _create_job(
         host_job_meta['host_func_upload_time'] = 0
 
     # upload data
-    if upload_data or backend not in FAAS_BACKENDS:
+    if all_cached:
+        logger.debug('ExecutorID {} | JobID {} - All the calls are cached. Skipping '
+                     'the upload of the function and data'.format(executor_id, job_id))
+        job.data_key = None
+        job.data_byte_ranges = None
+        job.data_byte_strs = None
+        host_job_meta['host_data_upload_time'] = 0
+
+    elif upload_data or backend not in FAAS_BACKENDS:
         # Upload iterdata to COS only if a single element is greater than MAX_DATA_IN_PAYLOAD
         logger.debug('ExecutorID {} | JobID {} - Uploading data to the storage backend'
                      .format(executor_id, job_id))
@@ -328,6 +389,61 @@ def _create_job(
     return job
 
 
+def create_job_manifest(job):
+    """
+    Returns a JSON-serializable dictionary with the job metadata
+    needed to rebuild its futures and to invoke its calls again
+    """
+    manifest = {key: getattr(job, key, None) for key in MANIFEST_KEYS}
+    manifest['call_ids'] = ["{:05d}".format(i) for i in range(job.total_calls)]
+    manifest['cached_calls'] = {str(i): cached for i, cached in job.cached_calls.items()}
+    if not job.data_key and job.data_byte_strs is not None:
+        manifest['data_byte_strs'] = [base64.b64encode(data_str).decode() for data_str in job.data_byte_strs]
+
+    return manifest
+
+
+def load_job_manifest(manifest):
+    """
+    Creates a job from its manifest
+    """
+    job = SimpleNamespace(**{key: manifest.get(key) for key in MANIFEST_KEYS})
+    job.cached_calls = {int(i): tuple(cached) for i, cached in manifest['cached_calls'].items()}
+    if 'data_byte_strs' in manifest:
+        job.data_byte_strs = [base64.b64decode(data_str) for data_str in manifest['data_byte_strs']]
+    if job.data_byte_ranges is not None:
+        job.data_byte_ranges = [tuple(byte_range) for byte_range in job.data_byte_ranges]
+
+    return job
+
+
+def _find_cached_calls(internal_storage, function_hash, data_strs, chunksize):
+    """
+    Returns the calls whose result is stored in the results cache, as a
+    dict of call index -> (cache key, result size). A chunk of calls is only
+    skipped when all its calls are cached
+    """
+    cache_keys = [create_cache_key(function_hash, data_str) for data_str in data_strs]
+
+    def lookup(key):
+        try:
+            meta = internal_storage.storage.head_object(internal_storage.bucket, key)
+            return int(meta['content-length'])
+        except Exception:
+            return None
+
+    with cf.ThreadPoolExecutor(max_workers=CACHE_LOOKUP_THREADS) as ex:
+        sizes = list(ex.map(lookup, cache_keys))
+
+    cached_calls = {}
+    for i in range(0, len(cache_keys), chunksize):
+        chunk = range(i, min(i + chunksize, len(cache_keys)))
+        if all(sizes[j] is not None for j in chunk):
+            cached_calls.update({j: (cache_keys[j], sizes[j]) for j in chunk})
+
+    return cached_calls
+
+
 def _store_func_and_modules(
     job_tmp_dir,
     func_key,
@@ -215,7 +215,8 @@ class BaseEnv:
 
         local_job_dir = os.path.join(LITHOPS_TEMP_DIR, storage_bucket, JOBS_PREFIX)
         docker_job_dir = f'/tmp/{USER_TEMP_DIR}/{storage_bucket}/{JOBS_PREFIX}'
-        job_file = f'{job_key}-job.json'
+        # A pipelined job is run in several invocations, one per set of calls
+        job_file = f'{job_key}-{job_payload["call_ids"][0]}-job.json'
 
         os.makedirs(local_job_dir, exist_ok=True)
         local_job_filename = os.path.join(local_job_dir, job_file)
@@ -28,7 +28,7 @@ from multiprocessing.managers import SyncManager
 from xmlrpc.server import SimpleXMLRPCServer
 
 from lithops import utils
-from lithops.worker.utils import get_runtime_metadata
+from lithops.worker.utils import get_runtime_metadata, share_call_data, release_job_files
 from lithops.worker.handler import (
     ShutdownSentinel,
     create_job,
@@ -88,9 +88,11 @@ class ServerThread(threading.Thread):
         logger.info(f'ExecutorID {job.executor_id} | JobID {job.job_id} - Adding '
                     f'{job.total_calls} tasks in the localhost worker')
         try:
-            job_status_dict[job.job_key] = 0
+            # Number of pending tasks, the last one to finish removes the job data
+            job_status_dict[job.job_key] = len(job.call_ids)
+            job_data, job.data = job.data, None
             for call_id in job.call_ids:
-                data = job.data.pop(0)
+                data = share_call_data(job_data.pop(0))
                 self.work_queue.put((job, call_id, data))
             return True
         except Exception as e:
@@ -151,7 +153,9 @@ def check_inactivity(server_thread, max_idle_timeout, check_interval):
 
 def process_event(
         event, pid,
-        worker_status_dict
+        worker_status_dict,
+        job_status_dict,
+        job_status_lock
 ):
     """
     Processes the events received from the work queue
@@ -162,7 +166,17 @@ def process_event(
 
     worker_status_dict[pid] = ProcessStatus.BUSY.value
 
-    prepare_and_run_task(task)
+    try:
+        prepare_and_run_task(task)
+    finally:
+        with job_status_lock:
+            pending = job_status_dict[task.job_key] - 1
+            if pending > 0:
+                job_status_dict[task.job_key] = pending
+            else:
+                del job_status_dict[task.job_key]
+        if pending <= 0:
+            release_job_files(task)
 
     worker_status_dict[pid] = ProcessStatus.IDLE.value
 
@@ -173,7 +187,9 @@ def process_event(
 def python_queue_consumer(
         pid,
         work_queue,
-        worker_status_dict
+        worker_status_dict,
+        job_status_dict,
+        job_status_lock
 ):
     """
     Listens to the job_queue and executes the individual job tasks
@@ -190,7 +206,7 @@ def python_queue_consumer(
         if isinstance(event, ShutdownSentinel):
             break
 
-        process_event(event, pid, worker_status_dict)
+        process_event(event, pid, worker_status_dict, job_status_dict, job_status_lock)
 
     logger.info(f'Worker process {pid} finished')
 
@@ -222,7 +238,9 @@ if __name__ == "__main__":
             args=(
                 pid,
                 work_queue,
-                worker_status_dict
+                worker_status_dict,
+                job_status_dict,
+                job_status_lock
             )
         )
         task_runners.append(p)
@@ -19,13 +19,14 @@ import pika
 import logging
 import time
 import lithops
+import statistics
 import pickle
 import sys
 import queue
 import threading
-import concurrent.futures as cf
 from tblib import pickling_support
-from lithops.constants import MONITORING_INTERVAL
+from lithops.constants import MONITORING_INTERVAL, \
+    SPECULATION_QUANTILE_DEFAULT, SPECULATION_MULTIPLIER_DEFAULT
 
 pickling_support.install()
 
@@ -44,7 +45,10 @@ class Monitor(threading.Thread):
                  token_bucket_q,
                  job_chunksize,
                  generate_tokens,
-                 config):
+                 config,
+                 backup_invokers=None,
+                 speculation=None,
+                 job_pull_workers=None):
 
         super().__init__()
         self.executor_id = executor_id
@@ -55,6 +59,10 @@ class Monitor(threading.Thread):
         self.job_chunksize = job_chunksize
         self.generate_tokens = generate_tokens
         self.config = config
+        self.backup_invokers = backup_invokers if backup_invokers is not None else {}
+        self.speculation = speculation
+        self.speculated = set()
+        self.job_pull_workers = job_pull_workers if job_pull_workers is not None else {}
         self.daemon = True
 
         # vars for _generate_tokens
@@ -86,6 +94,10 @@ class Monitor(threading.Thread):
         for job_id in present_jobs:
             self.present_jobs.remove(job_id)
 
+        for job_key in {future.job_key for future in fs}:
+            self.backup_invokers.pop(job_key, None)
+        self.speculated.difference_update(fs)
+
     def _all_ready(self):
         """
         Checks if all futures are ready, success or done
@@ -133,6 +145,69 @@ class Monitor(threading.Thread):
                                'worker_end_tstamp': time.time()}
                 fut._set_ready(call_status)
 
+    def _release_pull_workers(self):
+        """
+        Generates one token per worker of the pull-based jobs that are done,
+        since their workers do not run a fixed number of calls
+        """
+        if not self.generate_tokens or not self.should_run:
+            return
+
+        for job_id, workers in list(self.job_pull_workers.items()):
+            fs = [f for f in self.futures if f.job_id == job_id]
+            if fs and all(f.ready or f.success or f.done for f in fs):
+                del self.job_pull_workers[job_id]
+                for _ in range(workers):
+                    self.token_bucket_q.put('#')
+
+    def _speculate_stragglers(self, futures):
+        """
+        Launches a backup activation of the running calls that take much
+        longer than the done calls of the same job. The first activation
+        that finishes sets the call status, so the future is ready as soon
+        as either of them is done
+        """
+        if not self.speculation or not self.backup_invokers:
+            return
+
+        jobs = {}
+        for f in futures:
+            if f.job_key in self.backup_invokers:
+                jobs.setdefault(f.job_key, []).append(f)
+
+        current_time = time.time()
+        for job_key, fs in jobs.items():
+            fs_done = [f for f in fs if f.ready or f.success or f.done]
+            if len(fs_done) < len(fs) * self.speculation['quantile']:
+                continue
+            durations = [f._call_status['worker_end_tstamp'] - f._call_status['worker_start_tstamp']
+                         for f in fs_done if f._call_status and 'worker_end_tstamp' in f._call_status
+                         and not f._call_status.get('host_cache_hit')]
+            if not durations:
+                continue
+            threshold = statistics.median(durations) * self.speculation['multiplier']
+
+            for f in fs:
+                if not f.running or f in self.speculated:
+                    continue
+                running_time = current_time - f._call_status['worker_start_tstamp']
+                if running_time <= threshold:
+                    continue
+                self.speculated.add(f)
+                logger.debug(
+                    f'ExecutorID {self.executor_id} | JobID {f.job_id} - Call {f.call_id} running '
+                    f'for {round(running_time, 2)}s (threshold {round(threshold, 2)}s), '
+                    'launching a backup activation'
+                )
+                try:
+                    self.backup_invokers[job_key](f.call_id)
+                    f.stats['host_backup_launch_tstamp'] = time.time()
+                except Exception as e:
+                    logger.warning(
+                        f'ExecutorID {self.executor_id} | JobID {f.job_id} - Unable to '
+                        f'launch the backup activation of call {f.call_id}: {e}'
+                    )
+
     def _print_status_log(self, previous_log=None, log_time=None):
         """prints a debug log showing the status of the job"""
         if not self.futures:
@@ -156,7 +231,10 @@ class RabbitmqMonitor(Monitor):
             token_bucket_q,
             job_chunksize,
             generate_tokens,
-            config
+            config,
+            backup_invokers=None,
+            speculation=None,
+            job_pull_workers=None
     ):
         super().__init__(
             executor_id,
@@ -164,9 +242,14 @@ class RabbitmqMonitor(Monitor):
             token_bucket_q,
             job_chunksize,
             generate_tokens,
-            config
+            config,
+            backup_invokers,
+            speculation,
+            job_pull_workers
         )
 
+        self.callids_done_processed = set()
+
         self.rabbit_amqp_url = config.get('amqp_url')
         self.queue = f'lithops-{self.executor_id}'
         self._create_resources()
@@ -228,7 +311,12 @@ class RabbitmqMonitor(Monitor):
         if not self.generate_tokens or not self.should_run:
             return
 
+        if self.job_chunksize.get(call_status['job_id'], True) is None:
+            return  # pull-based job
         call_id = (call_status['executor_id'], call_status['job_id'], call_status['call_id'])
+        if call_id in self.callids_done_processed:
+            return  # finish event of the backup activation of a straggler
+        self.callids_done_processed.add(call_id)
         worker_id = call_status['activation_id']
         if worker_id not in self.callids_done_worker:
             self.callids_done_worker[worker_id] = []
@@ -257,6 +345,7 @@ class RabbitmqMonitor(Monitor):
             elif call_status['type'] == '__end__':
                 self._generate_tokens(call_status)
                 self._tag_future_as_ready(call_status)
+                self._release_pull_workers()
 
             if self._all_ready() or not self.should_run:
                 ch.stop_consuming()
@@ -271,6 +360,7 @@ class RabbitmqMonitor(Monitor):
             # Format call_ids running, pending and done
             prevoius_log, log_time = self._print_status_log(previous_log=prevoius_log, log_time=log_time)
             self._future_timeout_checker(self.futures)
+            self._speculate_stragglers(self.futures)
             time.sleep(SLEEP_TIME)
             log_time += SLEEP_TIME
 
@@ -280,8 +370,6 @@ class RabbitmqMonitor(Monitor):
 
 class StorageMonitor(Monitor):
 
-    THREADPOOL_SIZE = 64
-
     def __init__(
             self,
             executor_id,
@@ -289,7 +377,10 @@ class StorageMonitor(Monitor):
             token_bucket_q,
             job_chunksize,
             generate_tokens,
-            config
+            config,
+            backup_invokers=None,
+            speculation=None,
+            job_pull_workers=None
     ):
         super().__init__(
             executor_id,
@@ -297,7 +388,10 @@ class StorageMonitor(Monitor):
             token_bucket_q,
             job_chunksize,
             generate_tokens,
-            config
+            config,
+            backup_invokers,
+            speculation,
+            job_pull_workers
         )
 
         self.monitoring_interval = config['monitoring_interval']
@@ -356,30 +450,15 @@ class StorageMonitor(Monitor):
         if not fs_to_query:
             return
 
-        def get_status(f):
-            cs = self.internal_storage.get_call_status(f.executor_id, f.job_id, f.call_id)
-            f._status_query_count += 1
-            if cs:
-                if not self._check_new_futures(cs, f):
-                    f._set_ready(cs)
-                return (f.executor_id, f.job_id, f.call_id)
-            else:
-                return None
-
+        futures = {(f.executor_id, f.job_id, f.call_id): f for f in fs_to_query}
         try:
-            pool = cf.ThreadPoolExecutor(max_workers=self.THREADPOOL_SIZE)
-            call_ids_processed = set(pool.map(get_status, fs_to_query))
-            pool.shutdown()
-        except Exception:
-            pass
-
-        try:
-            call_ids_processed.remove(None)
-        except Exception:
-            pass
-
-        try:
-            self.callids_done_processed_status.update(call_ids_processed)
+            for call_id, cs in self.internal_storage.get_call_statuses(futures):
+                f = futures[call_id]
+                f._status_query_count += 1
+                if cs:
+                    if not self._check_new_futures(cs, f):
+                        f._set_ready(cs)
+                    self.callids_done_processed_status.add(call_id)
         except Exception:
             pass
 
@@ -394,6 +473,8 @@ class StorageMonitor(Monitor):
         callids_done_to_process = callids_done - self.callids_done_processed
 
         for call_id, worker_id in callids_running_to_process:
+            if call_id in self.callids_running_worker:
+                continue  # backup activation of a straggler
             if worker_id not in self.workers:
                 self.workers[worker_id] = set()
             self.workers[worker_id].add(call_id)
@@ -411,6 +492,8 @@ class StorageMonitor(Monitor):
             if job_id not in self.present_jobs:
                 continue
             chunksize = self.job_chunksize[job_id]
+            if chunksize is None:
+                continue  # pull-based job
             if worker_id not in self.workers_done and \
                     len(self.callids_done_worker[worker_id]) == chunksize:
                 self.workers_done.append(worker_id)
@@ -452,6 +535,8 @@ class StorageMonitor(Monitor):
             self._generate_tokens(callids_running, callids_done)
             self._tag_future_as_running(callids_running)
             self._tag_future_as_ready(callids_done)
+            self._release_pull_workers()
+            self._speculate_stragglers(self.futures)
             prevoius_log, log_time = self._print_status_log(prevoius_log, log_time)
 
         logger.debug(f'ExecutorID {self.executor_id} - Storage job monitor finished')
@@ -467,13 +552,22 @@ class JobMonitor:
         self.token_bucket_q = queue.Queue()
         self.monitor = None
         self.job_chunksize = {}
+        self.job_pull_workers = {}
+        self.backup_invokers = {}
+
+        lithops_config = self.config['lithops'] if config else {}
+        self.speculation = {
+            'quantile': lithops_config.get('speculation_quantile', SPECULATION_QUANTILE_DEFAULT),
+            'multiplier': lithops_config.get('speculation_multiplier', SPECULATION_MULTIPLIER_DEFAULT)
+        } if lithops_config.get('speculation', False) else None
 
         self.MonitorClass = getattr(
             lithops.monitor,
             f'{self.backend.capitalize()}Monitor'
         )
 
-    def start(self, fs, job_id=None, chunksize=None, generate_tokens=False):
+    def start(self, fs, job_id=None, chunksize=None, generate_tokens=False,
+              backup_invoker=None, pull_workers=None):
         if self.backend == 'storage':
             mi = self.config['lithops'].get('monitoring_interval', MONITORING_INTERVAL) \
                 if self.config else MONITORING_INTERVAL
@@ -483,6 +577,13 @@ class JobMonitor:
 
         if job_id:
             self.job_chunksize[job_id] = chunksize
+            if pull_workers:
+                # The workers of a pull-based job run a variable number of calls
+                self.job_chunksize[job_id] = None
+                self.job_pull_workers[job_id] = pull_workers
+
+        if backup_invoker and self.speculation and fs:
+            self.backup_invokers[fs[0].job_key] = backup_invoker
 
         if not self.monitor or not self.monitor.is_alive():
             self.monitor = self.MonitorClass(
@@ -491,7 +592,10 @@ class JobMonitor:
                 token_bucket_q=self.token_bucket_q,
                 job_chunksize=self.job_chunksize,
                 generate_tokens=generate_tokens,
-                config=bk_config
+                config=bk_config,
+                backup_invokers=self.backup_invokers,
+                speculation=self.speculation,
+                job_pull_workers=self.job_pull_workers
             )
 
         self.monitor.add_futures(fs)
@@ -174,3 +174,40 @@ def create_histogram(fs, dst, figsize=(10, 6)):
 
     fig.savefig(dst)
     pylab.close(fig)
+
+
+def create_resources_plot(fs, dst, figsize=(10, 6)):
+    stats = [f.stats for f in fs if 'worker_func_resource_samples' in f.stats]
+    if not stats:
+        return
+
+    host_job_create_tstamp = min([cm['host_job_create_tstamp'] for cm in stats])
+
+    fig = pylab.figure(figsize=figsize)
+    ax_cpu = fig.add_subplot(2, 1, 1)
+    ax_mem = fig.add_subplot(2, 1, 2, sharex=ax_cpu)
+
+    for cs in stats:
+        samples = cs['worker_func_resource_samples']
+        tstamps = np.array(samples['tstamp']) - host_job_create_tstamp
+        ax_cpu.plot(tstamps, samples['cpu_percent'], c='k', alpha=0.4, linewidth=0.6)
+        ax_mem.plot(tstamps, np.array(samples['rss']) / 1024**2, c='k', alpha=0.4, linewidth=0.6)
+
+    ax_cpu.set_ylabel('CPU (%)')
+    ax_mem.set_ylabel('RSS (MiB)')
+    ax_mem.set_xlabel('Execution Time (sec)')
+    ax_cpu.set_xlim(left=0)
+    ax_cpu.grid(False)
+    ax_mem.grid(False)
+
+    fig.tight_layout()
+
+    if dst is None:
+        os.makedirs('plots', exist_ok=True)
+        dst = os.path.join(os.getcwd(), 'plots', '{}_{}'.format(int(time.time()), 'resources.png'))
+    else:
+        dst = os.path.expanduser(dst) if '~' in dst else dst
+        dst = '{}_{}'.format(os.path.realpath(dst), 'resources.png')
+
+    fig.savefig(dst)
+    pylab.close(fig)
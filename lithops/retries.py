@@ -12,10 +12,14 @@
 # limitations under the License.
 #
 
+import time
+import random
+import logging
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from lithops import FunctionExecutor
 from lithops.future import ResponseFuture
+from lithops.utils import is_lithops_worker, is_notebook
 from lithops.storage.utils import CloudObject
 from lithops.wait import (
     ALL_COMPLETED,
@@ -26,6 +30,11 @@ from lithops.wait import (
 )
 from six import reraise
 
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF_BASE = 1  # seconds
+RETRY_BACKOFF_MAX = 30  # seconds
+
 
 class RetryingFuture:
     """
@@ -54,13 +63,6 @@ class RetryingFuture:
     def _should_retry(self):
         return not self.cancelled and self.failure_count <= self.retries
 
-    def _retry(self, function_executor: FunctionExecutor):
-        inputs = [self.input]
-        futures_list = function_executor.map(
-            self.map_function, inputs, **self.map_kwargs
-        )
-        self.response_future = futures_list[0]
-
     def cancel(self):
         # cancelling will prevent any further retries, but won't affect any running tasks
         self.cancelled = True
@@ -110,8 +112,15 @@ class RetryingFunctionExecutor:
     A wrapper around `FunctionExecutor` that supports retries.
     """
 
-    def __init__(self, executor: FunctionExecutor):
+    def __init__(
+        self,
+        executor: FunctionExecutor,
+        backoff_base: Optional[float] = RETRY_BACKOFF_BASE,
+        backoff_max: Optional[float] = RETRY_BACKOFF_MAX,
+    ):
         self.executor = executor
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
 
     def __enter__(self):
         self.executor.__enter__()
@@ -181,46 +190,123 @@ class RetryingFunctionExecutor:
         wait_dur_sec: Optional[int] = WAIT_DUR_SEC,
         show_progressbar: Optional[bool] = True,
     ) -> Tuple[List[RetryingFuture], List[RetryingFuture]]:
-        lookup = {f.response_future: f for f in fs}
+        pending = dict.fromkeys(fs)
+        retrying_done = []
+
+        # A single progress bar for all the rounds, the inner waits show none
+        pbar = None
+        if not is_lithops_worker() and logger.getEffectiveLevel() == logging.INFO \
+           and show_progressbar:
+            from tqdm.auto import tqdm
+            if not is_notebook():
+                print()
+            pbar = tqdm(bar_format='  {l_bar}{bar}| {n_fmt}/{total_fmt}  ',
+                        total=len(fs), disable=None)
+
+        try:
+            self._wait_rounds(pending, retrying_done, pbar, throw_except, return_when,
+                              download_results, timeout, threadpool_size, wait_dur_sec)
+        finally:
+            if pbar and not pbar.disable:
+                pbar.close()
+                if not is_notebook():
+                    print()
+
+        # The inner waits never wait for all the calls, so they do not clean
+        if return_when == ALL_COMPLETED and not pending and self.executor.data_cleaner:
+            present_jobs = {f.response_future.job_key for f in retrying_done}
+            self.executor.compute_handler.clear(present_jobs)
+            self.executor.clean(clean_cloudobjects=False)
+
+        return retrying_done, list(pending)
+
+    def _wait_rounds(self, pending, retrying_done, pbar, throw_except, return_when,
+                     download_results, timeout, threadpool_size, wait_dur_sec):
+        """
+        Waits for the running futures and resubmits the failed ones until
+        the return_when condition is met
+        """
+        retry_queue = {}
+        retry_at = None
 
         while True:
-            response_futures = [f.response_future for f in fs]
+            # Only wait for the futures that are running, not for the queued retries
+            lookup = {f.response_future: f for f in pending if f not in retry_queue}
 
-            done, pending = self.executor.wait(
-                response_futures,
-                throw_except=throw_except,
-                return_when=return_when,
-                download_results=download_results,
-                timeout=timeout,
-                threadpool_size=threadpool_size,
-                wait_dur_sec=wait_dur_sec,
-                show_progressbar=show_progressbar,
-            )
+            if lookup:
+                done, _ = self.executor.wait(
+                    list(lookup),
+                    throw_except=throw_except,
+                    return_when=ALWAYS if retry_queue or return_when == ALWAYS else ANY_COMPLETED,
+                    download_results=download_results,
+                    timeout=timeout,
+                    threadpool_size=threadpool_size,
+                    wait_dur_sec=wait_dur_sec,
+                    show_progressbar=False,
+                )
 
-            retrying_done = []
-            retrying_pending = [lookup[response_future] for response_future in pending]
-            for response_future in done:
-                retrying_future = lookup[response_future]
-                if response_future.error:
-                    retrying_future._inc_failure_count()
-                    if retrying_future._should_retry():
-                        retrying_future._retry(self.executor)
-                        # put back into pending since we are retrying this input
-                        retrying_pending.append(retrying_future)
-                        lookup[retrying_future.response_future] = retrying_future
-                    else:
-                        retrying_done.append(retrying_future)
-                else:
+                for response_future in done:
+                    retrying_future = lookup[response_future]
+                    if response_future.error:
+                        retrying_future._inc_failure_count()
+                        if retrying_future._should_retry():
+                            if not retry_queue:
+                                retry_at = time.time() + self._backoff(retrying_future.failure_count)
+                            retry_queue[retrying_future] = None
+                            continue
+                    del pending[retrying_future]
                     retrying_done.append(retrying_future)
+                    if pbar:
+                        pbar.update(1)
+
+            if retry_queue:
+                now = time.time()
+                if return_when == ALWAYS or now >= retry_at:
+                    self._retry(list(retry_queue))
+                    retry_queue = {}
+                elif len(retry_queue) == len(pending):
+                    time.sleep(retry_at - now)
+                else:
+                    time.sleep(min(wait_dur_sec, retry_at - now))
 
             if return_when == ALWAYS:
                 break
             elif return_when == ANY_COMPLETED and len(retrying_done) > 0:
                 break
-            elif return_when == ALL_COMPLETED and len(retrying_pending) == 0:
+            elif return_when == ALL_COMPLETED and len(pending) == 0:
                 break
 
-        return retrying_done, retrying_pending
+    def _backoff(self, failure_count: int) -> float:
+        """
+        Exponential backoff with full jitter, so that the retries of
+        many inputs do not hit the backend at the same time
+        """
+        backoff = min(self.backoff_max, self.backoff_base * 2 ** (failure_count - 1))
+        return random.uniform(0, backoff)
+
+    def _retry(self, retrying_futures: List[RetryingFuture]):
+        """
+        Resubmits the failed inputs as a single job per map call
+        """
+        groups = []
+        for retrying_future in retrying_futures:
+            for group in groups:
+                if group[0].map_function is retrying_future.map_function \
+                   and group[0].map_kwargs == retrying_future.map_kwargs:
+                    group.append(retrying_future)
+                    break
+            else:
+                groups.append([retrying_future])
+
+        for group in groups:
+            logger.info(f'Retrying {len(group)} failed function activations')
+            futures_list = self.executor.map(
+                group[0].map_function,
+                [f.input for f in group],
+                **group[0].map_kwargs
+            )
+            for retrying_future, response_future in zip(group, futures_list):
+                retrying_future.response_future = response_future
 
     def clean(
         self,
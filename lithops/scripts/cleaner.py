@@ -16,15 +16,15 @@
 
 import os
 import sys
+import json
 import time
 import pickle
 import logging
 from concurrent.futures import ThreadPoolExecutor
 
 from lithops.storage import Storage
-from lithops.storage.utils import clean_bucket
-from lithops.constants import JOBS_PREFIX, TEMP_PREFIX, CLEANER_DIR, \
-    CLEANER_PID_FILE, CLEANER_LOG_FILE
+from lithops.storage.utils import clean_prefixes, delete_keys, get_clean_targets
+from lithops.constants import CLEANER_DIR, CLEANER_PID_FILE, CLEANER_LOG_FILE
 
 log_file_stream = open(CLEANER_LOG_FILE, 'a')
 sys.stdout = log_file_stream
@@ -37,128 +37,88 @@ logging.basicConfig(stream=log_file_stream, level=logging.INFO,
                             ' [%(threadName)s] - %(funcName)s: %(message)s'))
 logger.setLevel('DEBUG')
 
+CLEANER_INTERVAL = 5
+CLEANER_MAX_ATTEMPTS = 3
 
-def clean_executor_jobs(executor_id, executor_data):
 
-    storage = None
-
-    logger.debug(f"Cleaning Executor ID: {executor_id}")
-
-    for file_data in executor_data:
-        file_location = file_data['file_location']
-        data = file_data['data']
-
-        storage_config = data['storage_config']
-        clean_cloudobjects = data['clean_cloudobjects']
-
-        logger.debug(f"File location: {file_location}")
-
-        if not storage:
-            storage = Storage(storage_config=storage_config)
-
-        for job_key in data['jobs_to_clean']:
-            prefix = '/'.join([JOBS_PREFIX, job_key]) + '/'
-            logger.debug(f"Cleaning data from {prefix}")
-            clean_bucket(storage, storage.bucket, prefix)
-
-        if clean_cloudobjects:
-            for job_key in data['jobs_to_clean']:
-                prefix = '/'.join([TEMP_PREFIX, job_key]) + '/'
-                logger.debug(f"Cleaning cloudobjects from {prefix}")
-                clean_bucket(storage, storage.bucket, prefix)
-
-        if os.path.exists(file_location):
-            os.remove(file_location)
-        logger.info('Finished')
-
-
-def clean_cloudobjects(cloudobjects_data):
-    file_location = cloudobjects_data['file_location']
-    data = cloudobjects_data['data']
-
-    logger.info('Going to clean cloudobjects')
-    cos_to_clean = data['cos_to_clean']
-    storage_config = data['storage_config']
+def clean_storage(storage_config, prefixes, cloudobjects):
+    """
+    Deletes the prefixes and cloudobjects of all the clean requests
+    of a storage backend
+    """
     storage = Storage(storage_config=storage_config)
 
-    for co in cos_to_clean:
-        if co.backend == storage.backend:
-            logging.info('Cleaning {}://{}/{}'.format(co.backend,
-                                                      co.bucket,
-                                                      co.key))
-            storage.delete_object(co.bucket, co.key)
-
-    if os.path.exists(file_location):
-        os.remove(file_location)
-    logger.info('Finished')
+    if prefixes:
+        logger.info(f"Cleaning {len(prefixes)} prefixes from bucket '{storage.bucket}'")
+        total_objects = clean_prefixes(storage, storage.bucket, prefixes)
+        logger.info(f'Finished deleting objects, total found: {total_objects}')
 
-
-def clean_functions(functions_data):
-    file_location = functions_data['file_location']
-    data = functions_data['data']
-
-    executor_id = data['fn_to_clean']
-    storage_config = data['storage_config']
-    storage = Storage(storage_config=storage_config)
-    prefix = '/'.join([JOBS_PREFIX, executor_id]) + '/'
-    logger.info(f'Cleaning functions from {prefix}')
-    key_list = storage.list_keys(storage.bucket, prefix)
-    storage.delete_objects(storage.bucket, key_list)
-
-    if os.path.exists(file_location):
-        os.remove(file_location)
-    logger.info('Finished')
+    cos_keys = {}
+    for co in cloudobjects:
+        if co.backend == storage.backend:
+            cos_keys.setdefault(co.bucket, []).append(co.key)
+    for bucket, keys in cos_keys.items():
+        logger.info(f"Cleaning {len(keys)} cloudobjects from bucket '{bucket}'")
+        delete_keys(storage, bucket, keys)
 
 
 def clean():
+    """
+    Coalesces the pending clean requests of all the executors, and cleans
+    the storage backends of the requests concurrently, until there are no
+    more requests
+    """
+    attempts = {}
 
     while True:
-        executor_jobs = {}
-        cloudobjects = []
-        functions = []
-
-        files_to_clean = os.listdir(CLEANER_DIR)
+        files_to_clean = [os.path.join(CLEANER_DIR, file_name) for file_name in os.listdir(CLEANER_DIR)]
+        files_to_clean = [file_location for file_location in files_to_clean
+                          if file_location not in [CLEANER_LOG_FILE, CLEANER_PID_FILE]]
 
-        if len(files_to_clean) <= 2:
+        if not files_to_clean:
             break
 
-        for file_name in files_to_clean:
-            file_location = os.path.join(CLEANER_DIR, file_name)
-            if file_location in [CLEANER_LOG_FILE, CLEANER_PID_FILE]:
+        # Group the requests by storage backend
+        requests = {}
+        for file_location in files_to_clean:
+            try:
+                with open(file_location, 'rb') as pk:
+                    data = pickle.load(pk)
+            except (EOFError, pickle.UnpicklingError):
+                # The file can still be being written
+                data = None
+            if data is None:
+                attempts[file_location] = attempts.get(file_location, 0) + 1
+                if attempts[file_location] >= CLEANER_MAX_ATTEMPTS:
+                    logger.error(f'Discarding unreadable clean request {file_location}')
+                    os.remove(file_location)
                 continue
 
-            with open(file_location, 'rb') as pk:
-                data = pickle.load(pk)
-
-            if 'jobs_to_clean' in data:
-                # group data by executor_id
-                executor_id, job_id = next(iter(data['jobs_to_clean'])).rsplit('-', 1)
-                if executor_id not in executor_jobs:
-                    executor_jobs[executor_id] = []
-                executor_jobs[executor_id].append({'file_location': file_location, 'data': data})
-
-            elif 'cos_to_clean' in data:
-                cloudobjects.append({'file_location': file_location, 'data': data})
-
-            elif 'fn_to_clean' in data:
-                functions.append({'file_location': file_location, 'data': data})
-
-        if executor_jobs:
-            with ThreadPoolExecutor(max_workers=32) as ex:
-                for executor_id in executor_jobs:
-                    ex.submit(clean_executor_jobs, executor_id, executor_jobs[executor_id])
-
-        if cloudobjects:
-            with ThreadPoolExecutor(max_workers=32) as ex:
-                for cloudobjects_data in cloudobjects:
-                    ex.submit(clean_cloudobjects, cloudobjects_data)
-
-        if functions:
-            with ThreadPoolExecutor(max_workers=32) as ex:
-                for function_data in functions:
-                    ex.submit(clean_functions, function_data)
-
-        time.sleep(5)
+            storage_key = json.dumps(data['storage_config'], sort_keys=True, default=str)
+            request = requests.setdefault(storage_key, {
+                'storage_config': data['storage_config'],
+                'prefixes': set(), 'cloudobjects': [], 'files': []
+            })
+            prefixes, cloudobjects = get_clean_targets(data)
+            request['prefixes'].update(prefixes)
+            request['cloudobjects'].extend(cloudobjects)
+            request['files'].append(file_location)
+
+        if requests:
+            with ThreadPoolExecutor(max_workers=len(requests)) as ex:
+                cleaned = {ex.submit(clean_storage, r['storage_config'], r['prefixes'], r['cloudobjects']): r
+                           for r in requests.values()}
+
+            for future, request in cleaned.items():
+                error = future.exception()
+                if error:
+                    logger.error(f'Error cleaning storage: {error}')
+                for file_location in request['files']:
+                    attempts[file_location] = attempts.get(file_location, 0) + 1
+                    if not error or attempts[file_location] >= CLEANER_MAX_ATTEMPTS:
+                        os.remove(file_location)
+
+        time.sleep(CLEANER_INTERVAL)
 
 
 if __name__ == '__main__':
@@ -59,7 +59,7 @@ from lithops.constants import (
 )
 from lithops.storage import InternalStorage
 from lithops.serverless import ServerlessHandler
-from lithops.storage.utils import clean_bucket
+from lithops.storage.utils import clean_prefixes, logs_key_suffix
 from lithops.standalone import StandaloneHandler
 from lithops.localhost import LocalhostHandler
 
@@ -130,8 +130,9 @@ def clean(config, backend, storage, debug, region, all):
     storage = internal_storage.storage
     runtimes_path = RUNTIMES_PREFIX + '/' + backend
     jobs_path = JOBS_PREFIX
-    clean_bucket(storage, storage.bucket, runtimes_path, sleep=1)
-    clean_bucket(storage, storage.bucket, jobs_path, sleep=1)
+    logger.info(f"Deleting temporary objects from bucket '{storage.bucket}'")
+    total_objects = clean_prefixes(storage, storage.bucket, [runtimes_path, jobs_path])
+    logger.info(f'Finished deleting objects, total found: {total_objects}')
 
     # Clean localhost executor temp dirs
     shutil.rmtree(LITHOPS_TEMP_DIR, ignore_errors=True)
@@ -435,15 +436,32 @@ def poll():
 
 @logs.command('get')
 @click.argument('job_key')
-def get_logs(job_key):
+@click.option('--storage', '-s', 'from_storage', is_flag=True, help='fetch the logs from the storage backend')
+@click.option('--backend', '-b', default=None, help='storage backend')
+@click.option('--config', '-c', default=None, help='path to yaml config file', type=click.Path(exists=True))
+def get_logs(job_key, from_storage, backend, config):
     log_file = os.path.join(LOGS_DIR, job_key + '.log')
 
-    if not os.path.isfile(log_file):
+    if os.path.isfile(log_file) and not from_storage:
+        with open(log_file, 'r') as content_file:
+            print(content_file.read())
+        return
+
+    config = load_yaml_config(config) if config else None
+    storage = Storage(config=config, backend=backend)
+    prefix = '/'.join([JOBS_PREFIX, job_key]) + '/'
+    logs_keys = sorted(key for key in storage.list_keys(storage.bucket, prefix)
+                       if key.endswith(logs_key_suffix))
+
+    if not logs_keys:
         print('The execution id: {} does not exists in logs'.format(job_key))
         return
 
-    with open(log_file, 'r') as content_file:
-        print(content_file.read())
+    for key in logs_keys:
+        call_id = key.split('/')[-2]
+        logs = storage.get_object(storage.bucket, key).decode()
+        output = logs.replace('\r', '').replace('\n', '\n    ', logs.count('\n') - 1)
+        print("Call: '{}'\n[\n    {}]\n".format(call_id, output))
 
 
 # /---------------------------------------------------------------------------/
@@ -0,0 +1,189 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import zlib
+import heapq
+import pickle
+import struct
+import inspect
+import logging
+import tempfile
+import functools
+import concurrent.futures as cf
+from itertools import chain, groupby
+from operator import itemgetter
+
+from lithops.storage.utils import create_shuffle_key
+
+logger = logging.getLogger(__name__)
+
+SHUFFLE_MAX_CONCURRENCY = 16
+SHUFFLE_MAX_BUFFER_SIZE = 256  # MiB
+SHUFFLE_BATCH_SIZE = 1000  # Records pickled together in a segment
+SHUFFLE_INDEX_FORMAT = '<QQ'  # Offset and length of a segment
+
+
+def hash_partitioner(key, num_partitions):
+    """
+    Default partitioner. It is deterministic across processes, unlike hash()
+    """
+    return zlib.crc32(pickle.dumps(key, protocol=4)) % num_partitions
+
+
+def _combine(records, combiner):
+    combined = {}
+    for key, value in records:
+        combined[key] = combiner(combined[key], value) if key in combined else value
+    return list(combined.items())
+
+
+def _combine_sorted(records, combiner):
+    for key, group in groupby(records, key=itemgetter(0)):
+        yield key, functools.reduce(combiner, (value for _, value in group))
+
+
+def _add_reserved_params(function, wrapper, reserved):
+    """
+    Sets the signature of the user function to the wrapper, adding the
+    reserved parameters so that the worker fills them in
+    """
+    sig = inspect.signature(function)
+    params = list(sig.parameters.values())
+    for name in reserved:
+        if name not in sig.parameters:
+            params.append(inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY))
+    wrapper.__signature__ = sig.replace(parameters=params)
+    wrapper.__name__ = getattr(function, '__name__', type(function).__name__)
+
+
+def _dump_segment(partition):
+    return b''.join(pickle.dumps(partition[i:i + SHUFFLE_BATCH_SIZE])
+                    for i in range(0, len(partition), SHUFFLE_BATCH_SIZE))
+
+
+def _load_run(spill, offset, length):
+    """
+    Yields the records of a segment stored in the spill file. The file is
+    shared by all the runs, so its position is restored before each batch
+    """
+    end = offset + length
+    while offset < end:
+        spill.seek(offset)
+        batch = pickle.load(spill)
+        offset = spill.tell()
+        yield from batch
+
+
+def create_shuffle_mapper(map_function, executor_id, job_id, num_partitions, partitioner, combiner, sort):
+    """
+    Wraps the map function of a shuffle. The map function must return an
+    iterable of (key, value) records. The records are partitioned and stored
+    in a single object per mapper, under the job given by executor_id and
+    job_id. The object starts with the offset and length of each partition
+    """
+    user_params = inspect.signature(map_function).parameters
+
+    def shuffle_map(**kwargs):
+        storage = kwargs['storage'] if 'storage' in user_params else kwargs.pop('storage')
+        call_id = kwargs['id'] if 'id' in user_params else kwargs.pop('id')
+        records = map_function(**kwargs)
+
+        partitions = [[] for _ in range(num_partitions)]
+        for record in records:
+            partitions[partitioner(record[0], num_partitions)].append(record)
+
+        segments = []
+        index = []
+        offset = struct.calcsize(SHUFFLE_INDEX_FORMAT) * num_partitions
+        for partition in partitions:
+            if combiner is not None:
+                partition = _combine(partition, combiner)
+            if sort:
+                partition.sort(key=itemgetter(0))
+            segment = _dump_segment(partition)
+            segments.append(segment)
+            index.append(struct.pack(SHUFFLE_INDEX_FORMAT, offset, len(segment)))
+            offset += len(segment)
+
+        shuffle_key = create_shuffle_key(executor_id, job_id, '{:05d}'.format(call_id))
+        storage.put_object(storage.bucket, shuffle_key, b''.join(index + segments))
+
+    _add_reserved_params(map_function, shuffle_map, ('storage', 'id'))
+
+    return shuffle_map
+
+
+def create_shuffle_reducer(executor_id, job_id, num_mappers, reduce_function,
+                           combiner, sort, max_concurrency, max_buffer_size):
+    """
+    Creates the function that fetches the segments of a partition from the
+    objects of the num_mappers mappers of the job with byte-range GETs and
+    merges them. The segments are spilled to disk once they exceed
+    max_buffer_size MiB, and are read back one batch at a time
+    """
+    max_buffer_bytes = max(1, int(max_buffer_size * 1024 ** 2))
+    shuffle_keys = [create_shuffle_key(executor_id, job_id, '{:05d}'.format(i)) for i in range(num_mappers)]
+
+    def shuffle_reduce(partition, storage):
+        def get_object_range(key, offset, length):
+            extra_get_args = {'Range': f'bytes={offset}-{offset + length - 1}'}
+            return storage.get_object(storage.bucket, key, extra_get_args=extra_get_args)
+
+        def get_segment(key):
+            entry_size = struct.calcsize(SHUFFLE_INDEX_FORMAT)
+            entry = get_object_range(key, entry_size * partition, entry_size)
+            return (key, *struct.unpack(SHUFFLE_INDEX_FORMAT, entry))
+
+        spill = tempfile.SpooledTemporaryFile(max_size=max_buffer_bytes)
+        with spill, cf.ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            segments = [segment for segment in pool.map(get_segment, shuffle_keys) if segment[2] > 0]
+            runs = [None] * len(segments)
+
+            def store(download):
+                j, size = in_flight.pop(download)
+                runs[j] = (spill.tell(), size)
+                spill.write(download.result())
+                return size
+
+            # Limit the in-flight bytes, but always allow one download
+            in_flight = {}
+            in_flight_bytes = 0
+            for i, (key, offset, length) in enumerate(segments):
+                while in_flight and (len(in_flight) >= max_concurrency
+                                     or in_flight_bytes + length > max_buffer_bytes):
+                    done, _ = cf.wait(in_flight, return_when=cf.FIRST_COMPLETED)
+                    for download in done:
+                        in_flight_bytes -= store(download)
+                download = pool.submit(get_object_range, key, offset, length)
+                in_flight[download] = (i, length)
+                in_flight_bytes += length
+
+            for download in cf.as_completed(list(in_flight)):
+                store(download)
+
+            runs = [_load_run(spill, offset, length) for offset, length in runs]
+            if sort:
+                records = heapq.merge(*runs, key=itemgetter(0))
+            else:
+                records = chain(*runs)
+
+            if combiner is not None:
+                records = _combine_sorted(records, combiner) if sort else _combine(records, combiner)
+
+            if reduce_function is not None:
+                return reduce_function(records)
+
+            return list(records)
+
+    return shuffle_reduce
@@ -32,6 +32,9 @@ CONN_READ_TIMEOUT = 10
 
 
 class S3Backend:
+    # Minimum size of all the parts of a multipart upload but the last one
+    MULTIPART_MIN_PART_SIZE = 5 * 1024 ** 2
+
     def __init__(self, s3_config):
         logger.debug("Creating Boto3 AWS Session and S3 Client")
         self.config = s3_config
@@ -120,6 +123,24 @@ class S3Backend:
             else:
                 raise e
 
+    def put_object_if_absent(self, bucket_name, key, data):
+        """
+        Put an object in S3 only if the key does not exist yet.
+        :param key: key of the object.
+        :param data: data of the object
+        :type data: str/bytes
+        :return: True if the object was created, False if the key already existed
+        """
+        try:
+            self.s3_client.put_object(Bucket=bucket_name, Key=key, Body=data, IfNoneMatch='*')
+            logger.debug(f'PUT Object {key} if absent - OK')
+            return True
+        except botocore.exceptions.ClientError as e:
+            # 409 is returned when a concurrent conditional write is in progress
+            if e.response['Error']['Code'] in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                return False
+            raise e
+
     def get_object(self, bucket_name, key, stream=False, extra_get_args={}):
         """
         Get object from COS with a key. Throws StorageNoSuchKeyError if the given key does not exist.
@@ -182,6 +203,43 @@ class S3Backend:
             return False
         return True
 
+    def create_multipart_upload(self, bucket_name, key):
+        """
+        Starts a multipart upload.
+        :param key: key of the object
+        :return: ID of the upload
+        """
+        return self.s3_client.create_multipart_upload(Bucket=bucket_name, Key=key)['UploadId']
+
+    def upload_part(self, bucket_name, key, upload_id, part_number, data):
+        """
+        Uploads a part of a multipart upload.
+        :param upload_id: ID of the upload
+        :param part_number: number of the part, starting at 1
+        :param data: data of the part
+        :return: ETag of the part
+        """
+        res = self.s3_client.upload_part(Bucket=bucket_name, Key=key, UploadId=upload_id,
+                                         PartNumber=part_number, Body=data)
+        return res['ETag']
+
+    def complete_multipart_upload(self, bucket_name, key, upload_id, parts):
+        """
+        Completes a multipart upload.
+        :param upload_id: ID of the upload
+        :param parts: (part number, ETag) tuples, sorted by part number
+        """
+        multipart_upload = {'Parts': [{'PartNumber': num, 'ETag': etag} for num, etag in parts]}
+        self.s3_client.complete_multipart_upload(Bucket=bucket_name, Key=key, UploadId=upload_id,
+                                                 MultipartUpload=multipart_upload)
+
+    def abort_multipart_upload(self, bucket_name, key, upload_id):
+        """
+        Aborts a multipart upload, deleting the uploaded parts.
+        :param upload_id: ID of the upload
+        """
+        self.s3_client.abort_multipart_upload(Bucket=bucket_name, Key=key, UploadId=upload_id)
+
     def head_object(self, bucket_name, key):
         """
         Head object from COS with a key. Throws StorageNoSuchKeyError if the given key does not exist.
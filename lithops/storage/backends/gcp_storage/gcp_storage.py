@@ -99,6 +99,17 @@ class GCPStorageBackend:
             except google_exceptions.NotFound:
                 raise StorageNoSuchKeyError(bucket=bucket_name, key=key)
 
+    def put_object_if_absent(self, bucket_name, key, data):
+        try:
+            bucket = self.client.get_bucket(bucket_name, timeout=TIMEOUT)
+            blob = bucket.blob(blob_name=key)
+            blob.upload_from_string(data=data, if_generation_match=0)
+            return True
+        except google_exceptions.PreconditionFailed:
+            return False
+        except google_exceptions.NotFound:
+            raise StorageNoSuchKeyError(bucket=bucket_name, key=key)
+
     def get_object(self, bucket_name, key, stream=False, extra_get_args={}):
         try:
             bucket = self.client.get_bucket(bucket_name, timeout=TIMEOUT)
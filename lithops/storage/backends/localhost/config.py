@@ -20,3 +20,5 @@ def load_config(config_data):
         config_data['localhost'] = {}
 
     config_data['localhost']['storage_bucket'] = 'storage'
+    # There is no request quota to protect in local storage
+    config_data['localhost'].setdefault('delete_rate', 0)
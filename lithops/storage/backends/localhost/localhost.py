@@ -16,16 +16,19 @@
 
 import os
 import io
-import glob
+import uuid
 import shutil
 import logging
-from lithops.storage.utils import StorageNoSuchKeyError
+from email.utils import formatdate
+from lithops.storage.utils import StorageNoSuchKeyError, parse_byte_range
 from lithops.constants import LITHOPS_TEMP_DIR
 from lithops.constants import STORAGE_CLI_MSG
 
 
 logger = logging.getLogger(__name__)
 
+MULTIPART_DIR = os.path.join(LITHOPS_TEMP_DIR, '.multipart-uploads')
+
 
 class LocalhostStorageBackend:
     """
@@ -82,6 +85,27 @@ class LocalhostStorageBackend:
             with open(file_path, "w") as f:
                 f.write(data)
 
+    def put_object_if_absent(self, bucket_name, key, data):
+        """
+        Put an object in localhost filesystem only if the key does not exist yet.
+        :param key: key of the object.
+        :param data: data of the object
+        :type data: str/bytes
+        :return: True if the object was created, False if the key already existed
+        """
+        file_path = os.path.join(LITHOPS_TEMP_DIR, bucket_name, key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        try:
+            fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            return False
+
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data.encode() if isinstance(data, str) else data)
+
+        return True
+
     def get_object(self, bucket_name, key, stream=False, extra_get_args={}):
         """
         Get object from localhost filesystem with a key.
@@ -90,22 +114,22 @@ class LocalhostStorageBackend:
         :return: Data of the object
         :rtype: str/bytes
         """
-        buffer = None
+        file_path = os.path.join(LITHOPS_TEMP_DIR, bucket_name, key)
         try:
-            file_path = os.path.join(LITHOPS_TEMP_DIR, bucket_name, key)
-            with open(file_path, "rb") as f:
-                if 'Range' in extra_get_args:
-                    byte_range = extra_get_args['Range'].replace('bytes=', '')
-                    first_byte, last_byte = map(int, byte_range.split('-'))
-                    f.seek(first_byte)
-                    buffer = io.BytesIO(f.read(last_byte - first_byte + 1))
-                else:
-                    buffer = io.BytesIO(f.read())
-            if stream:
-                return buffer
+            if 'Range' in extra_get_args:
+                fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+                try:
+                    first_byte, last_byte = parse_byte_range(extra_get_args['Range'], os.fstat(fd).st_size)
+                    data = _pread(fd, max(last_byte - first_byte + 1, 0), first_byte)
+                finally:
+                    os.close(fd)
+                return io.BytesIO(data) if stream else data
+            elif stream:
+                return open(file_path, 'rb')
             else:
-                return buffer.read()
-        except Exception:
+                with open(file_path, 'rb') as f:
+                    return f.read()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
             raise StorageNoSuchKeyError(os.path.join(LITHOPS_TEMP_DIR, bucket_name), key)
 
     def upload_file(self, file_name, bucket, key=None, extra_args={}, config=None):
@@ -154,6 +178,53 @@ class LocalhostStorageBackend:
             return False
         return True
 
+    def create_multipart_upload(self, bucket_name, key):
+        """
+        Starts a multipart upload. The parts are stored in a temporary
+        directory until the upload is completed.
+        :param key: key of the object
+        :return: ID of the upload
+        """
+        upload_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(MULTIPART_DIR, upload_id))
+        return upload_id
+
+    def upload_part(self, bucket_name, key, upload_id, part_number, data):
+        """
+        Uploads a part of a multipart upload.
+        :param upload_id: ID of the upload
+        :param part_number: number of the part, starting at 1
+        :param data: data of the part
+        :return: ETag of the part
+        """
+        part_path = os.path.join(MULTIPART_DIR, upload_id, str(part_number))
+        with open(part_path, 'wb') as f:
+            f.write(data)
+        return part_path
+
+    def complete_multipart_upload(self, bucket_name, key, upload_id, parts):
+        """
+        Completes a multipart upload, joining the parts in the object file.
+        :param upload_id: ID of the upload
+        :param parts: (part number, ETag) tuples, sorted by part number
+        """
+        file_path = os.path.join(LITHOPS_TEMP_DIR, bucket_name, key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = os.path.join(MULTIPART_DIR, upload_id, 'object')
+        with open(tmp_path, 'wb') as out:
+            for _, part_path in parts:
+                with open(part_path, 'rb') as part:
+                    shutil.copyfileobj(part, out, 1024 * 1024)
+        os.replace(tmp_path, file_path)
+        shutil.rmtree(os.path.join(MULTIPART_DIR, upload_id), ignore_errors=True)
+
+    def abort_multipart_upload(self, bucket_name, key, upload_id):
+        """
+        Aborts a multipart upload, deleting the uploaded parts.
+        :param upload_id: ID of the upload
+        """
+        shutil.rmtree(os.path.join(MULTIPART_DIR, upload_id), ignore_errors=True)
+
     def head_object(self, bucket_name, key):
         """
         Head object from local filesystem with a key.
@@ -164,8 +235,11 @@ class LocalhostStorageBackend:
         file_path = os.path.join(LITHOPS_TEMP_DIR, bucket_name, key)
         if os.path.isfile(file_path):
             # Imitate the COS/S3 response
+            stat = os.stat(file_path)
             return {
-                'content-length': str(os.stat(file_path).st_size)
+                'content-length': str(stat.st_size),
+                'last-modified': formatdate(stat.st_mtime, usegmt=True),
+                'etag': f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
             }
 
         raise StorageNoSuchKeyError(os.path.join(LITHOPS_TEMP_DIR, bucket_name), key)
@@ -225,15 +299,8 @@ class LocalhostStorageBackend:
         :return: List of objects in bucket that match the given prefix.
         :rtype: list of str
         """
-        obj_list = []
-        base_dir = os.path.join(LITHOPS_TEMP_DIR, bucket_name, '')
-
-        for key in self.list_keys(bucket_name, prefix):
-            file_name = os.path.join(base_dir, key)
-            size = os.stat(file_name).st_size
-            obj_list.append({'Key': key, 'Size': size})
-
-        return obj_list
+        base_dir = os.path.join(LITHOPS_TEMP_DIR, bucket_name)
+        return [{'Key': key, 'Size': entry.stat().st_size} for key, entry in _walk(base_dir, prefix)]
 
     def list_keys(self, bucket_name, prefix=None):
         """
@@ -243,23 +310,50 @@ class LocalhostStorageBackend:
         :return: List of keys in bucket that match the given prefix.
         :rtype: list of str
         """
-        key_list = []
-        base_dir = os.path.join(LITHOPS_TEMP_DIR, bucket_name, '')
+        base_dir = os.path.join(LITHOPS_TEMP_DIR, bucket_name)
+        return [key for key, _ in _walk(base_dir, prefix)]
 
-        if prefix:
-            if prefix.endswith('/'):
-                roots = [os.path.join(base_dir, prefix, '**')]
-            else:
-                roots = [
-                    os.path.join(base_dir, prefix + '*'),
-                    os.path.join(base_dir, prefix + '*', '**'),
-                ]
-        else:
-            roots = [os.path.join(base_dir, '**')]
 
-        for root in roots:
-            for file_name in glob.glob(root, recursive=True):
-                if os.path.isfile(file_name):
-                    key_list.append(file_name.replace(base_dir, '').replace('\\', '/'))
+def _walk(base_dir, prefix):
+    """
+    Yields the (key, DirEntry) of the files under base_dir whose key starts
+    with prefix. It only scans the directories that can contain such keys.
+    Hidden files and directories are skipped.
+    """
+    dir_key, _, name_prefix = (prefix or '').rpartition('/')
+    stack = [(os.path.join(base_dir, dir_key), f'{dir_key}/' if dir_key else '', name_prefix)]
 
-        return key_list
+    while stack:
+        dir_path, key_prefix, name_prefix = stack.pop()
+        try:
+            entries = os.scandir(dir_path)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.name.startswith(name_prefix):
+                    continue
+                if entry.is_dir():
+                    stack.append((entry.path, f'{key_prefix}{entry.name}/', ''))
+                elif entry.is_file():
+                    yield key_prefix + entry.name, entry
+
+
+def _pread(fd, length, offset):
+    """
+    Reads up to length bytes at offset without moving the file position,
+    in a single system call for reads below 2 GiB
+    """
+    chunks = []
+    while length > 0:
+        if hasattr(os, 'pread'):
+            chunk = os.pread(fd, length, offset)
+        else:
+            os.lseek(fd, offset, os.SEEK_SET)
+            chunk = os.read(fd, length)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        length -= len(chunk)
+        offset += len(chunk)
+    return chunks[0] if len(chunks) == 1 else b''.join(chunks)
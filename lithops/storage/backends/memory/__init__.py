@@ -0,0 +1,3 @@
+from .memory import MemoryStorageBackend as StorageBackend
+
+__all__ = ['StorageBackend']
@@ -0,0 +1,400 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import io
+import os
+import time
+import uuid
+import bisect
+import signal
+import logging
+import threading
+from email.utils import formatdate
+from multiprocessing.managers import BaseManager
+
+from lithops.storage.utils import StorageNoSuchKeyError, parse_byte_range
+from lithops.constants import STORAGE_CLI_MSG
+from lithops.libs.globber import match
+
+logger = logging.getLogger(__name__)
+
+_STORE = None
+_SERVER = None
+_SERVER_LOCK = threading.Lock()
+
+
+class MemoryStore:
+    """
+    Buckets of objects kept in the memory of the store server process.
+    The keys of each bucket are also kept sorted, so that listing a prefix
+    is a binary search instead of a scan of the whole bucket.
+    """
+
+    def __init__(self):
+        self.instance = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.objects = {}  # bucket -> {key: (data, etag, mtime)}
+        self.keys = {}  # bucket -> sorted list of keys
+        self.uploads = {}  # upload ID -> {part number: data}
+        self.lock = threading.Lock()
+
+    def create_bucket(self, bucket):
+        with self.lock:
+            self.objects.setdefault(bucket, {})
+            self.keys.setdefault(bucket, [])
+
+    def has_bucket(self, bucket):
+        return bucket in self.objects
+
+    def put(self, bucket, key, data, if_absent=False):
+        """
+        Stores an object, and returns False if if_absent is set and the key
+        already exists
+        """
+        with self.lock:
+            objects = self.objects.setdefault(bucket, {})
+            if key not in objects:
+                bisect.insort(self.keys.setdefault(bucket, []), key)
+            elif if_absent:
+                return False
+            self.version += 1
+            objects[key] = (data, f'"{self.instance}-{self.version:x}"', time.time())
+        return True
+
+    def get(self, bucket, key, byte_range=None):
+        """
+        Returns the data of an object, or a 'bytes=first-last' range of it,
+        or None if the object does not exist
+        """
+        entry = self.objects.get(bucket, {}).get(key)
+        if entry is None:
+            return None
+        if byte_range is None:
+            return entry[0]
+        first_byte, last_byte = parse_byte_range(byte_range, len(entry[0]))
+        return entry[0][first_byte:last_byte + 1]
+
+    def head(self, bucket, key):
+        """
+        Returns the (size, etag, mtime) of an object, or None if it does not exist
+        """
+        entry = self.objects.get(bucket, {}).get(key)
+        if entry is None:
+            return None
+        data, etag, mtime = entry
+        return len(data), etag, mtime
+
+    def delete(self, bucket, keys):
+        with self.lock:
+            objects = self.objects.get(bucket, {})
+            sorted_keys = self.keys.get(bucket, [])
+            for key in keys:
+                if objects.pop(key, None) is not None:
+                    del sorted_keys[bisect.bisect_left(sorted_keys, key)]
+
+    def list(self, bucket, prefix=None, match_pattern=None):
+        """
+        Returns the (key, size) of the objects whose key starts with prefix
+        """
+        with self.lock:
+            objects = self.objects.get(bucket, {})
+            sorted_keys = self.keys.get(bucket, [])
+            prefix = prefix or ''
+            result = []
+            for i in range(bisect.bisect_left(sorted_keys, prefix), len(sorted_keys)):
+                key = sorted_keys[i]
+                if not key.startswith(prefix):
+                    break
+                if match_pattern is None or match(match_pattern, key):
+                    result.append((key, len(objects[key][0])))
+        return result
+
+    def create_upload(self):
+        upload_id = uuid.uuid4().hex
+        with self.lock:
+            self.uploads[upload_id] = {}
+        return upload_id
+
+    def put_part(self, upload_id, part_number, data):
+        with self.lock:
+            self.uploads[upload_id][part_number] = data
+
+    def complete_upload(self, bucket, key, upload_id, part_numbers):
+        with self.lock:
+            parts = self.uploads.pop(upload_id)
+        self.put(bucket, key, b''.join(parts[number] for number in part_numbers))
+
+    def abort_upload(self, upload_id):
+        with self.lock:
+            self.uploads.pop(upload_id, None)
+
+
+def _get_store():
+    global _STORE
+    if _STORE is None:
+        _STORE = MemoryStore()
+    return _STORE
+
+
+def _init_server():
+    # The store must outlive a KeyboardInterrupt of the process that started it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class MemoryStoreManager(BaseManager):
+    pass
+
+
+MemoryStoreManager.register('get_store', callable=_get_store)
+
+
+def start_store_server():
+    """
+    Starts the store server of this process, if not started yet.
+    The server runs in a child process, and it is stopped at exit.
+
+    :return: address and authkey (hex) of the server
+    """
+    global _SERVER
+    with _SERVER_LOCK:
+        if _SERVER is None:
+            authkey = os.urandom(16)
+            # The default address is a Unix socket (a named pipe on Windows),
+            # much faster to connect to than a TCP socket
+            manager = MemoryStoreManager(authkey=authkey)
+            manager.start(_init_server)
+            _SERVER = (manager, manager.address, authkey.hex())
+            logger.debug(f'Memory storage server started at {manager.address}')
+        return _SERVER[1], _SERVER[2]
+
+
+class MemoryStorageBackend:
+    """
+    Storage backend that keeps the objects in the memory of a store server
+    process. The server is started by the first process that creates the
+    backend, which adds its address to the configuration, so that the
+    processes that receive it, like the localhost workers, connect to the
+    same store.
+    """
+
+    def __init__(self, memory_config):
+        logger.debug("Creating Memory storage client")
+        self.config = memory_config
+
+        if 'address' not in self.config:
+            self.config['address'], self.config['authkey'] = start_store_server()
+
+        manager = MemoryStoreManager(address=self.config['address'], authkey=bytes.fromhex(self.config['authkey']))
+        manager.connect()
+        # The proxy opens a connection to the server per thread
+        self.store = manager.get_store()
+
+        msg = STORAGE_CLI_MSG.format('Memory storage')
+        logger.info(f"{msg} - Address: {self.config['address']}")
+
+    def get_client(self):
+        return self.store
+
+    def create_bucket(self, bucket_name):
+        """
+        Creates a bucket if not exists.
+        :param bucket_name: name of the bucket
+        """
+        self.store.create_bucket(bucket_name)
+
+    def put_object(self, bucket_name, key, data):
+        """
+        Put an object in the memory store. Override the object if the key already exists.
+        :param key: key of the object.
+        :param data: data of the object
+        :type data: str/bytes/file-like object
+        :return: None
+        """
+        self.store.put(bucket_name, key, _to_bytes(data))
+
+    def put_object_if_absent(self, bucket_name, key, data):
+        """
+        Put an object in the memory store only if the key does not exist yet.
+        :param key: key of the object.
+        :param data: data of the object
+        :type data: str/bytes
+        :return: True if the object was created, False if the key already existed
+        """
+        return self.store.put(bucket_name, key, _to_bytes(data), True)
+
+    def get_object(self, bucket_name, key, stream=False, extra_get_args={}):
+        """
+        Get object from the memory store with a key.
+        Throws StorageNoSuchKeyError if the given key does not exist.
+        :param key: key of the object
+        :return: Data of the object
+        :rtype: bytes
+        """
+        data = self.store.get(bucket_name, key, extra_get_args.get('Range'))
+
+        if data is None:
+            raise StorageNoSuchKeyError(bucket_name, key)
+
+        return io.BytesIO(data) if stream else data
+
+    def upload_file(self, file_name, bucket, key=None, extra_args={}, config=None):
+        """Upload a file
+
+        :param file_name: File to upload
+        :param bucket: Bucket to upload to
+        :param key: object name. If not specified then file_name is used
+        :return: True if file was uploaded, else False
+        """
+        if key is None:
+            key = os.path.basename(file_name)
+
+        try:
+            with open(file_name, 'rb') as in_file:
+                self.put_object(bucket, key, in_file)
+        except Exception as e:
+            logging.error(e)
+            return False
+        return True
+
+    def download_file(self, bucket, key, file_name=None, extra_args={}, config=None):
+        """Download a file
+
+        :param bucket: Bucket to download from
+        :param key: object name
+        :param file_name: File to download to. If not specified then key is used
+        :return: True if file was downloaded, else False
+        """
+        if file_name is None:
+            file_name = key
+
+        try:
+            dirname = os.path.dirname(file_name)
+            if dirname and not os.path.exists(dirname):
+                os.makedirs(dirname)
+            with open(file_name, 'wb') as out:
+                out.write(self.get_object(bucket, key))
+        except Exception as e:
+            logging.error(e)
+            return False
+        return True
+
+    def create_multipart_upload(self, bucket_name, key):
+        """
+        Starts a multipart upload. The parts are kept in the store until
+        the upload is completed.
+        :param key: key of the object
+        :return: ID of the upload
+        """
+        return self.store.create_upload()
+
+    def upload_part(self, bucket_name, key, upload_id, part_number, data):
+        """
+        Uploads a part of a multipart upload.
+        :param upload_id: ID of the upload
+        :param part_number: number of the part, starting at 1
+        :param data: data of the part
+        :return: ETag of the part
+        """
+        self.store.put_part(upload_id, part_number, _to_bytes(data))
+        return part_number
+
+    def complete_multipart_upload(self, bucket_name, key, upload_id, parts):
+        """
+        Completes a multipart upload, joining the parts in the object.
+        :param upload_id: ID of the upload
+        :param parts: (part number, ETag) tuples, sorted by part number
+        """
+        self.store.complete_upload(bucket_name, key, upload_id, [number for number, _ in parts])
+
+    def abort_multipart_upload(self, bucket_name, key, upload_id):
+        """
+        Aborts a multipart upload, deleting the uploaded parts.
+        :param upload_id: ID of the upload
+        """
+        self.store.abort_upload(upload_id)
+
+    def head_object(self, bucket_name, key):
+        """
+        Head object from the memory store with a key.
+        Throws StorageNoSuchKeyError if the given key does not exist.
+        :param key: key of the object
+        :return: metadata of the object
+        """
+        meta = self.store.head(bucket_name, key)
+        if meta is None:
+            raise StorageNoSuchKeyError(bucket_name, key)
+
+        # Imitate the COS/S3 response
+        size, etag, mtime = meta
+        return {
+            'content-length': str(size),
+            'last-modified': formatdate(mtime, usegmt=True),
+            'etag': etag
+        }
+
+    def delete_object(self, bucket_name, key):
+        """
+        Delete an object from storage.
+        :param bucket: bucket name
+        :param key: data key
+        """
+        self.store.delete(bucket_name, [key])
+
+    def delete_objects(self, bucket_name, key_list):
+        """
+        Delete a list of objects from storage.
+        :param bucket: bucket name
+        :param key_list: list of keys
+        """
+        self.store.delete(bucket_name, list(key_list))
+
+    def head_bucket(self, bucket_name):
+        """
+        Head bucket from the memory store with a name.
+        Throws StorageNoSuchKeyError if the given bucket does not exist.
+        :param bucket_name: name of the bucket
+        """
+        if self.store.has_bucket(bucket_name):
+            return {'ResponseMetadata': {'HTTPStatusCode': 200}}
+        raise StorageNoSuchKeyError(bucket_name, '')
+
+    def list_objects(self, bucket_name, prefix=None, match_pattern=None):
+        """
+        Return a list of objects for the prefix.
+        :param bucket_name: Name of the bucket.
+        :param prefix: Prefix to filter object names.
+        :param match_pattern: Glob pattern to filter object names.
+        :return: List of objects in bucket that match the given prefix.
+        :rtype: list of dict
+        """
+        return [{'Key': key, 'Size': size} for key, size in self.store.list(bucket_name, prefix, match_pattern)]
+
+    def list_keys(self, bucket_name, prefix=None):
+        """
+        Return a list of keys for the given prefix.
+        :param bucket_name: Name of the bucket.
+        :param prefix: Prefix to filter object names.
+        :return: List of keys in bucket that match the given prefix.
+        :rtype: list of str
+        """
+        return [key for key, _ in self.store.list(bucket_name, prefix)]
+
+
+def _to_bytes(data):
+    if hasattr(data, 'read'):
+        data = data.read()
+    if isinstance(data, str):
+        return data.encode()
+    return bytes(data)
@@ -33,6 +33,8 @@ class MinioStorageBackend:
     """
     A wrap-up around MinIO boto3 APIs.
     """
+    # Minimum size of all the parts of a multipart upload but the last one
+    MULTIPART_MIN_PART_SIZE = 5 * 1024 ** 2
 
     def __init__(self, minio_config):
         logger.debug("Creating MinIO client")
@@ -192,6 +194,43 @@ class MinioStorageBackend:
             return False
         return True
 
+    def create_multipart_upload(self, bucket_name, key):
+        """
+        Starts a multipart upload.
+        :param key: key of the object
+        :return: ID of the upload
+        """
+        return self.s3_client.create_multipart_upload(Bucket=bucket_name, Key=key)['UploadId']
+
+    def upload_part(self, bucket_name, key, upload_id, part_number, data):
+        """
+        Uploads a part of a multipart upload.
+        :param upload_id: ID of the upload
+        :param part_number: number of the part, starting at 1
+        :param data: data of the part
+        :return: ETag of the part
+        """
+        res = self.s3_client.upload_part(Bucket=bucket_name, Key=key, UploadId=upload_id,
+                                         PartNumber=part_number, Body=data)
+        return res['ETag']
+
+    def complete_multipart_upload(self, bucket_name, key, upload_id, parts):
+        """
+        Completes a multipart upload.
+        :param upload_id: ID of the upload
+        :param parts: (part number, ETag) tuples, sorted by part number
+        """
+        multipart_upload = {'Parts': [{'PartNumber': num, 'ETag': etag} for num, etag in parts]}
+        self.s3_client.complete_multipart_upload(Bucket=bucket_name, Key=key, UploadId=upload_id,
+                                                 MultipartUpload=multipart_upload)
+
+    def abort_multipart_upload(self, bucket_name, key, upload_id):
+        """
+        Aborts a multipart upload, deleting the uploaded parts.
+        :param upload_id: ID of the upload
+        """
+        self.s3_client.abort_multipart_upload(Bucket=bucket_name, Key=key, UploadId=upload_id)
+
     def head_object(self, bucket_name, key):
         """
         Head object from MinIO with a key. Throws StorageNoSuchKeyError if the given key does not exist.
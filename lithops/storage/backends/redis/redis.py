@@ -17,27 +17,101 @@
 import os
 import io
 import copy
+import math
+import time
+import uuid
 import redis
 import shutil
 import logging
-from lithops.storage.utils import StorageNoSuchKeyError
+from email.utils import formatdate
+from lithops.storage.utils import StorageNoSuchKeyError, parse_byte_range
 from lithops.constants import STORAGE_CLI_MSG
+from lithops.libs.globber import match
 
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE_DEFAULT = 1  # MiB
+BATCH_SIZE = 1000  # Keys per pipeline or command in multi-key operations
+
+# Config keys of the backend that are not redis.Redis() parameters
+LITHOPS_CONFIG_KEYS = ('storage_bucket', 'user_agent', 'chunk_size', 'max_concurrency', 'part_size', 'delete_rate')
+
+# Drops the current version of an object: the chunks of an object stored as a
+# manifest hash, or the entry in its parent dir set of an object stored with
+# the legacy layout, as plain strings indexed by a set per directory
+DROP_VERSION_LUA = """
+local function delete_chunks(redis_key, etag, chunks)
+    for i = 0, tonumber(chunks) - 1 do
+        redis.call('DEL', 'lithops.chunk:' .. etag .. ':' .. i .. ':' .. redis_key)
+    end
+end
+local function drop_version(redis_key)
+    local key_type = redis.call('TYPE', redis_key).ok
+    if key_type == 'hash' then
+        local old = redis.call('HMGET', redis_key, 'etag', 'chunks')
+        if old[1] then
+            delete_chunks(redis_key, old[1], old[2] or 0)
+        end
+    elseif key_type == 'string' then
+        local pdir, name = string.match(redis_key, '^(.*/)([^/]*)$')
+        redis.call('SREM', pdir, name)
+    end
+end
+"""
+
+# Replaces the manifest of an object, deleting the chunks of the replaced
+# version, and adds its key to the index of the bucket atomically. Returns 0
+# and deletes the new chunks if 'if_absent' is set and the object exists.
+REPLACE_MANIFEST_SCRIPT = DROP_VERSION_LUA + """
+if ARGV[2] == '1' and redis.call('EXISTS', KEYS[1]) == 1 then
+    delete_chunks(KEYS[1], ARGV[3], ARGV[4])
+    return 0
+end
+drop_version(KEYS[1])
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 5))
+redis.call('ZADD', KEYS[2], 0, ARGV[1])
+return 1
+"""
+
+# Deletes a batch of objects of a bucket with their chunks, so that no chunk
+# is left behind if the client fails halfway
+DELETE_OBJECTS_SCRIPT = DROP_VERSION_LUA + """
+for i = 2, #ARGV do
+    local redis_key = ARGV[1] .. '/' .. ARGV[i]
+    drop_version(redis_key)
+    redis.call('DEL', redis_key)
+    redis.call('ZREM', KEYS[1], ARGV[i])
+end
+"""
+
 
 class RedisBackend:
+    """
+    Each object is a hash with its manifest (size, etag, mtime). Objects
+    smaller than 'chunk_size' keep the data in the hash, while larger objects
+    are split in chunks stored as separate strings, so that no single command
+    moves a big value and blocks the server. The keys of each bucket are kept
+    in a sorted set, listed with lexicographic range scans.
+
+    Objects stored by previous versions as plain strings, indexed by a set of
+    entries per directory, are still readable, listed and deleted.
+    """
+
     def __init__(self, config):
         logger.debug("Creating Redis storage client")
         self.config = config
         self.user_agent = self.config['user_agent']
         self.host = self.config['host']
+        self.chunk_size = int(self.config.get('chunk_size', CHUNK_SIZE_DEFAULT) * 1024 ** 2)
 
         redis_config = copy.deepcopy(config)
-        redis_config.pop('storage_bucket')
-        redis_config.pop('user_agent')
+        for key in LITHOPS_CONFIG_KEYS:
+            redis_config.pop(key, None)
         self._client = redis.Redis(**redis_config)
+        self._replace_manifest = self._client.register_script(REPLACE_MANIFEST_SCRIPT)
+        self._delete_objects = self._client.register_script(DELETE_OBJECTS_SCRIPT)
 
         msg = STORAGE_CLI_MSG.format('Redis')
         logger.info(f"{msg} - Host: {self.host}")
@@ -51,32 +125,46 @@ class RedisBackend:
         :param bucket_name: bucket name
         :param key: key of the object.
         :param data: data of the object
-        :type data: str/bytes
+        :type data: str/bytes/file-like object
         :return: None
         """
-        if not isinstance(data, (str, bytes, bytearray)):
-            raise TypeError(type(data), 'valid types: {}'.format((str, bytes, bytearray)))
-
-        redis_key = self._format_key(bucket_name, key)
-        components = redis_key.split('/')
-
-        # NOTE: could use a lua script and add from the lowest
-        # to the highest dir and stop when SADD returns 0 since
-        # then we can assume higher dirs already exist
-        pipeline = self._client.pipeline(False)
-
-        # create parent dirs
-        for i in range(1, len(components) - 1):
-            loc = '/'.join(components[:i]) + '/'
-            pipeline.sadd(loc, components[i] + '/')
+        self._put(bucket_name, key, data)
 
-        # add file to lowest dir
-        loc = '/'.join(components[:-1]) + '/'
-        pipeline.sadd(loc, components[-1])
+    def put_object_if_absent(self, bucket_name, key, data):
+        """
+        Put an object in Redis only if the key does not exist yet.
+        :param bucket_name: bucket name
+        :param key: key of the object.
+        :param data: data of the object
+        :type data: str/bytes
+        :return: True if the object was created, False if the key already existed
+        """
+        return self._put(bucket_name, key, data, if_absent=True)
+
+    def _put(self, bucket_name, key, data, if_absent=False):
+        data = _to_bytes(data)
+        etag = uuid.uuid4().hex
+        manifest = {'size': len(data), 'etag': etag, 'mtime': time.time()}
+
+        chunks = 0
+        if len(data) > self.chunk_size:
+            # The chunks of each version have their own keys, so readers of
+            # the previous version are not affected until the manifest changes
+            chunks = math.ceil(len(data) / self.chunk_size)
+            manifest['chunk_size'] = self.chunk_size
+            pipeline = self._client.pipeline(False)
+            for i in range(chunks):
+                pipeline.set(self._chunk_key(bucket_name, key, etag, i),
+                             data[i * self.chunk_size:(i + 1) * self.chunk_size])
+            pipeline.execute()
+        else:
+            manifest['data'] = data
+        manifest['chunks'] = chunks
 
-        # set actual key
-        pipeline.set(redis_key, data)
-        pipeline.execute()
+        args = [key, int(if_absent), etag, chunks]
+        for field, value in manifest.items():
+            args.extend((field, value))
+        return bool(self._replace_manifest(keys=[self._format_key(bucket_name, key), self._index_key(bucket_name)], args=args))
 
     def get_object(self, bucket_name, key, stream=False, extra_get_args={}):
         """
@@ -87,18 +175,30 @@ class RedisBackend:
         :return: Data of the object
         :rtype: str/bytes
         """
-
-        redis_key = self._format_key(bucket_name, key)
-        try:
-            if 'Range' in extra_get_args:  # expected format: Range='bytes=L-H'
-                bytes_range = extra_get_args.pop('Range')[6:]
-                start, end = self._parse_range(bytes_range)
-                data = self._client.getrange(redis_key, start, end)
-            else:
-                data = self._client.get(redis_key)
-
-        except redis.exceptions.ResponseError:
-            raise StorageNoSuchKeyError(bucket_name, key)
+        byte_range = extra_get_args.get('Range')
+        # The chunks of the read version can be deleted by a concurrent
+        # overwrite, so the read is retried once with the new version
+        for attempt in range(2):
+            try:
+                size, etag, chunks, chunk_size, data = self._client.hmget(
+                    self._format_key(bucket_name, key), 'size', 'etag', 'chunks', 'chunk_size', 'data')
+            except redis.exceptions.ResponseError:
+                data = self._get_legacy(bucket_name, key, byte_range)
+                break
+            if size is None:
+                raise StorageNoSuchKeyError(bucket_name, key)
+
+            size = int(size)
+            first_byte, last_byte = parse_byte_range(byte_range, size) if byte_range else (0, size - 1)
+            if not int(chunks):
+                data = data[first_byte:last_byte + 1]
+                break
+
+            data = self._read_chunks(bucket_name, key, etag.decode(), int(chunk_size), first_byte, last_byte)
+            if data is not None:
+                break
+        else:
+            data = None
 
         if data is None:
             raise StorageNoSuchKeyError(bucket_name, key)
@@ -108,6 +208,70 @@ class RedisBackend:
         else:
             return data
 
+    def _read_chunks(self, bucket_name, key, etag, chunk_size, first_byte, last_byte):
+        """
+        Reads a byte range of a chunked object with one pipeline, or returns
+        None if some chunk no longer exists
+        """
+        if last_byte < first_byte:
+            return b''
+        first_chunk, last_chunk = first_byte // chunk_size, last_byte // chunk_size
+        pipeline = self._client.pipeline(False)
+        for i in range(first_chunk, last_chunk + 1):
+            start = first_byte - i * chunk_size if i == first_chunk else 0
+            end = last_byte - i * chunk_size if i == last_chunk else chunk_size - 1
+            pipeline.getrange(self._chunk_key(bucket_name, key, etag, i), start, end)
+        data = b''.join(pipeline.execute())
+        return data if len(data) == last_byte - first_byte + 1 else None
+
+    def _get_legacy(self, bucket_name, key, byte_range=None):
+        """
+        Reads an object stored with the legacy layout as a plain string, or
+        returns None if it does not exist
+        """
+        redis_key = self._format_key(bucket_name, key)
+        try:
+            if not byte_range:
+                return self._client.get(redis_key)
+            pipeline = self._client.pipeline(False)
+            pipeline.exists(redis_key)
+            pipeline.strlen(redis_key)
+            exists, size = pipeline.execute()
+            if not exists:
+                return None
+            first_byte, last_byte = parse_byte_range(byte_range, size)
+            return self._client.getrange(redis_key, first_byte, last_byte) if last_byte >= first_byte else b''
+        except redis.exceptions.ResponseError:
+            return None
+
+    def get_objects_batch(self, bucket_name, keys):
+        """
+        Get many small objects with a single pipeline, like the call statuses
+        read by the job monitor.
+        :param bucket_name: bucket name
+        :param keys: keys of the objects
+        :return: list with the data of each object, or None if it does not exist
+        :rtype: list
+        """
+        results = []
+        for i in range(0, len(keys), BATCH_SIZE):
+            batch = keys[i:i + BATCH_SIZE]
+            pipeline = self._client.pipeline(False)
+            for key in batch:
+                pipeline.hmget(self._format_key(bucket_name, key), 'size', 'chunks', 'data')
+            for key, fields in zip(batch, pipeline.execute(raise_on_error=False)):
+                if isinstance(fields, Exception):
+                    results.append(self._get_legacy(bucket_name, key))
+                    continue
+                size, chunks, data = fields
+                if size is None:
+                    results.append(None)
+                elif int(chunks):
+                    results.append(self.get_object(bucket_name, key))
+                else:
+                    results.append(data)
+        return results
+
     def upload_file(self, file_name, bucket, key=None, extra_args={}, config=None):
         """Upload a file
 
@@ -163,14 +327,28 @@ class RedisBackend:
         :return: Data of the object
         :rtype: dict
         """
-        redis_key = self._format_key(bucket_name, key)
         try:
-            meta = self._client.debug_object(redis_key)
+            size, etag, mtime = self._client.hmget(self._format_key(bucket_name, key), 'size', 'etag', 'mtime')
         except redis.exceptions.ResponseError:
+            return self._head_legacy(bucket_name, key)
+        if size is None:
             raise StorageNoSuchKeyError(bucket_name, key)
 
-        meta['content-length'] = meta['serializedlength'] - 1
-        return meta
+        return {
+            'content-length': size.decode(),
+            'last-modified': formatdate(float(mtime), usegmt=True),
+            'etag': f'"{etag.decode()}"'
+        }
+
+    def _head_legacy(self, bucket_name, key):
+        """
+        Heads an object stored with the legacy layout as a plain string
+        """
+        try:
+            size = self._client.strlen(self._format_key(bucket_name, key))
+        except redis.exceptions.ResponseError:
+            raise StorageNoSuchKeyError(bucket_name, key)
+        return {'content-length': str(size)}
 
     def delete_object(self, bucket_name, key):
         """
@@ -186,40 +364,44 @@ class RedisBackend:
         :param bucket_name: bucket name
         :param key_list: list of keys
         """
-        redis_key_list = [self._format_key(bucket_name, k) for k in key_list]
-
-        pipeline = self._client.pipeline(False)
-        pipeline.delete(*redis_key_list)
-
-        for full_path in redis_key_list:
-            components = full_path.split('/')
-            pdir = '/'.join(components[:-1]) + '/'
-            pipeline.srem(pdir, components[-1])
-
-        pipeline.execute()
+        key_list = list(key_list)
+        for i in range(0, len(key_list), BATCH_SIZE):
+            self._delete_objects(keys=[self._index_key(bucket_name)], args=[bucket_name] + key_list[i:i + BATCH_SIZE])
 
     def head_bucket(self, bucket_name):
         """
-        Head bucket from Redis with a name.
-        Throws StorageNoSuchKeyError if the given bucket does not exist.
+        Head bucket from Redis with a name. Buckets are just namespaces of
+        the keys in Redis, so any bucket exists.
         :param bucket_name: name of the bucket
         :return: metadata of the bucket
         :rtype: dict
         """
-        return bool(self._client.exists(self._format_key(bucket_name, '')))
+        return {'ResponseMetadata': {'HTTPStatusCode': 200}}
 
     def list_objects(self, bucket_name, prefix=None, match_pattern=None):
         """
         Return a list of objects for the given bucket and prefix.
         :param bucket_name: name of the bucket.
         :param prefix: Prefix to filter object names.
+        :param match_pattern: Glob pattern to filter object names.
         :return: List of objects in bucket that match the given prefix.
         :rtype: list of dict
         """
-        pipeline = self._client.pipeline(False)
-        for key in self.list_keys(bucket_name, prefix):
-            pipeline.get(self._format_key(bucket_name, key))
-        return pipeline.execute()
+        keys = [key for key in self.list_keys(bucket_name, prefix)
+                if match_pattern is None or match(match_pattern, key)]
+
+        objects = []
+        for i in range(0, len(keys), BATCH_SIZE):
+            batch = keys[i:i + BATCH_SIZE]
+            pipeline = self._client.pipeline(False)
+            for key in batch:
+                pipeline.hget(self._format_key(bucket_name, key), 'size')
+            for key, size in zip(batch, pipeline.execute(raise_on_error=False)):
+                if isinstance(size, Exception):
+                    size = self._client.strlen(self._format_key(bucket_name, key))
+                if size is not None:
+                    objects.append({'Key': key, 'Size': int(size)})
+        return objects
 
     def list_keys(self, bucket_name, prefix=None):
         """
@@ -229,56 +411,60 @@ class RedisBackend:
         :return: List of keys in bucket that match the given prefix.
         :rtype: list of str
         """
-        prefix = prefix or ''
-        redis_prefix = self._format_key(bucket_name, prefix)
-
-        pdir = '/'.join(redis_prefix.split('/')[:-1]) + '/'
-        dir_keys = [key.decode() for key in self._client.smembers(pdir)]
+        # Scan the range of the index with the keys that start with prefix,
+        # BATCH_SIZE keys per request. UTF-8 strings never contain 0xff.
+        prefix = (prefix or '').encode()
+        start, end = (b'[' + prefix, b'[' + prefix + b'\xff') if prefix else (b'-', b'+')
         key_list = []
+        while True:
+            keys = self._client.zrangebylex(self._index_key(bucket_name), start, end, 0, BATCH_SIZE)
+            key_list.extend(key.decode() for key in keys)
+            if len(keys) < BATCH_SIZE:
+                break
+            start = b'(' + keys[-1]
 
-        for key in dir_keys:
-            full_key = pdir + key
-            if full_key.startswith(redis_prefix):
+        if self._client.type(self._format_key(bucket_name, '')) == b'set':
+            key_list = sorted(set(key_list).union(self._list_legacy_keys(bucket_name, prefix.decode())))
+
+        return key_list
+
+    def _list_legacy_keys(self, bucket_name, prefix):
+        """
+        Lists the keys stored with the legacy layout by walking the sets of
+        entries of their directories
+        """
+        redis_prefix = self._format_key(bucket_name, prefix)
+        key_list = []
+        pending = ['/'.join(redis_prefix.split('/')[:-1]) + '/']
+        while pending:
+            pdir = pending.pop()
+            for entry in self._client.smembers(pdir):
+                full_key = pdir + entry.decode()
+                if not full_key.startswith(redis_prefix):
+                    continue
                 if full_key.endswith('/'):
-                    key_list.extend(self._walk(bucket_name, full_key))
+                    pending.append(full_key)
                 else:
                     key_list.append(full_key)
 
         offset = len(bucket_name) + 1
         return [key[offset:] for key in key_list]
 
-    def _walk(self, bucket_name, dir_key):
-        dir_keys = [key.decode() for key in self._client.smembers(dir_key)]
-        key_list = []
-
-        for key in dir_keys:
-            full_key = dir_key + key
-            if full_key.endswith('/'):
-                key_list.extend(self._walk(bucket_name, full_key))
-            else:
-                key_list.append(full_key)
-
-        return key_list
-
     def _format_key(self, bucket, key):
         return '/'.join([bucket, key])
 
-    def _parse_range(self, bytes_range):
-        if '--' in bytes_range:
-            bytes_range = bytes_range.replace('--', '-')
-            sign = -1
-        else:
-            sign = 1
-
-        if '-' in bytes_range:
-            bytes_range = bytes_range.split('-')
-            if bytes_range[0] == '':
-                end = int(bytes_range[1]) * -1
-                start = end
-            else:
-                start = int(bytes_range[0])
-                end = int(bytes_range[1]) * sign
-        else:
-            start = end = int(bytes_range)
+    def _index_key(self, bucket):
+        return f'lithops.index:{bucket}'
+
+    def _chunk_key(self, bucket, key, etag, i):
+        return f'lithops.chunk:{etag}:{i}:{bucket}/{key}'
+
 
-        return start, end
+def _to_bytes(data):
+    if hasattr(data, 'read'):
+        data = data.read()
+    if isinstance(data, str):
+        return data.encode()
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        raise TypeError(type(data), 'valid types: {}'.format((str, bytes, bytearray)))
+    return bytes(data)
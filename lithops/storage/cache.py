@@ -0,0 +1,185 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from lithops.constants import LITHOPS_TEMP_DIR, STORAGE_CACHE_MEMORY_DEFAULT, \
+    STORAGE_CACHE_DISK_DEFAULT
+from lithops.storage.utils import parse_byte_range
+
+logger = logging.getLogger(__name__)
+
+OBJECT_CACHE_DIR = os.path.join(LITHOPS_TEMP_DIR, 'object-cache')
+
+
+def get_validator(metadata):
+    """
+    Returns the value that changes when an object is overwritten, from its
+    head_object() metadata
+    """
+    etag = metadata.get('etag') or metadata.get('ETag')
+    if etag:
+        return etag.strip('"')
+    return f"{metadata.get('content-length')}-{metadata.get('last-modified')}"
+
+
+class ObjectCache:
+    """
+    Two-tier read cache of storage objects: a bounded in-memory LRU, backed by
+    a size-bounded directory in the local disk shared by all the processes of
+    the host. Each entry is an object, or a byte-range of an object, together
+    with the validator (ETag) of the object version it was read from.
+    """
+
+    def __init__(self, max_memory=STORAGE_CACHE_MEMORY_DEFAULT, max_disk=STORAGE_CACHE_DISK_DEFAULT,
+                 cache_dir=OBJECT_CACHE_DIR):
+        """
+        :param max_memory: max size of the memory tier (MiB)
+        :param max_disk: max size of the disk tier (MiB), 0 to disable it
+        :param cache_dir: directory of the disk tier
+        """
+        self.max_memory = max_memory * 1024 ** 2
+        self.max_disk = max_disk * 1024 ** 2
+        self.cache_dir = cache_dir
+        self.memory = OrderedDict()
+        self.memory_size = 0
+        self.disk_size = None
+        self.lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'hit_bytes': 0}
+
+    def _path(self, entry_key, validator):
+        name = hashlib.sha1(repr(entry_key).encode()).hexdigest()
+        version = hashlib.sha1(validator.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f'{name}-{version}')
+
+    def get(self, entry_key, validator=''):
+        """
+        Returns the cached data of an entry, or None if it is not cached or
+        it was read from another version of the object. A byte-range is also
+        served from the entry of the whole object.
+
+        :param entry_key: (backend, bucket, key, range) tuple, where range is
+            None or a 'bytes=first-last', 'bytes=first-' or 'bytes=-length' string
+        :param validator: validator of the current version of the object
+        """
+        backend, bucket, key, byte_range = entry_key
+        data, tier = self._lookup(entry_key, validator)
+        if data is None and byte_range is not None:
+            data, tier = self._lookup((backend, bucket, key, None), validator)
+            if data is not None:
+                first_byte, last_byte = parse_byte_range(byte_range, len(data))
+                data = data[first_byte:last_byte + 1]
+
+        with self.lock:
+            if data is None:
+                self.stats['misses'] += 1
+            else:
+                self.stats[f'{tier}_hits'] += 1
+                self.stats['hit_bytes'] += len(data)
+        return data
+
+    def _lookup(self, entry_key, validator):
+        with self.lock:
+            entry = self.memory.get(entry_key)
+            if entry is not None and entry[0] == validator:
+                self.memory.move_to_end(entry_key)
+                return entry[1], 'memory'
+
+        if self.max_disk:
+            path = self._path(entry_key, validator)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                return None, None
+            self._put_memory(entry_key, validator, data)
+            return data, 'disk'
+
+        return None, None
+
+    def put(self, entry_key, validator, data):
+        """
+        Adds an entry to both tiers
+
+        :param entry_key: (backend, bucket, key, range) tuple
+        :param validator: validator of the version of the object
+        :param data: data of the entry
+        """
+        data = bytes(data)
+        self._put_memory(entry_key, validator, data)
+        if self.max_disk and len(data) <= self.max_disk:
+            self._put_disk(entry_key, validator, data)
+
+    def _put_memory(self, entry_key, validator, data):
+        if len(data) > self.max_memory:
+            return
+        with self.lock:
+            old = self.memory.pop(entry_key, None)
+            if old is not None:
+                self.memory_size -= len(old[1])
+            self.memory[entry_key] = (validator, data)
+            self.memory_size += len(data)
+            while self.memory_size > self.max_memory:
+                _, (_, evicted) = self.memory.popitem(last=False)
+                self.memory_size -= len(evicted)
+
+    def _put_disk(self, entry_key, validator, data):
+        path = self._path(entry_key, validator)
+        tmp_path = f'{path}.tmp-{uuid.uuid4().hex[:8]}'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f'Could not add {entry_key} to the disk cache: {e}')
+            return
+
+        with self.lock:
+            if self.disk_size is not None:
+                self.disk_size += len(data)
+            if self.disk_size is None or self.disk_size > self.max_disk:
+                self._evict_disk()
+
+    def _evict_disk(self):
+        """
+        Removes the least recently used files of the disk tier until it is
+        below its max size. The size is recomputed, since other processes
+        share the directory.
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if '.tmp-' in entry.name:
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, entry.path, stat.st_size))
+
+        self.disk_size = sum(size for _, _, size in entries)
+        for _, path, size in sorted(entries):
+            if self.disk_size <= self.max_disk:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.disk_size -= size
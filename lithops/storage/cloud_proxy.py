@@ -17,11 +17,15 @@
 import io
 import os as base_os
 from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from lithops.storage import Storage
 from lithops.utils import is_lithops_worker
 from lithops.config import default_storage_config, load_yaml_config, extract_storage_config
 from lithops.constants import JOBS_PREFIX, TEMP_PREFIX, LOGS_PREFIX, RUNTIMES_PREFIX
 
+WRITE_MAX_CONCURRENCY = 4  # Max parts uploading at a time in each file
+WRITE_PART_SIZE_GROWTH = 1000  # The part size doubles every this number of parts
+
 
 def remove_lithops_keys(keys):
     return list(filter(lambda key: not any([key.startswith(prefix) for prefix in [
@@ -101,39 +105,23 @@ class CloudFileProxy:
         return list(names)
 
     def walk(self, top, topdown=True, onerror=None, followlinks=False):
-        dirs = []
-        files = []
+        # The prefix is listed once, and the directory tree is built from the keys
+        prefix = top.lstrip('/')
+        if prefix and not prefix.endswith('/'):
+            prefix = prefix + '/'
 
-        for path in self.listdir(top, suffix_dirs=True):
-            if path.endswith('/'):
-                dirs.append(path[:-1])
-            else:
-                files.append(path)
-
-        if dirs == [] and files == [] and not self.path.exists(top):
-            raise StopIteration
-        elif topdown:
-            yield top, dirs, files
-            for dir_name in dirs:
-                for result in self.walk(
-                        base_os.path.join(
-                            top,
-                            dir_name),
-                        topdown,
-                        onerror,
-                        followlinks):
-                    yield result
-        else:
-            for dir_name in dirs:
-                for result in self.walk(
-                        base_os.path.join(
-                            top,
-                            dir_name),
-                        topdown,
-                        onerror,
-                        followlinks):
-                    yield result
-            yield top, dirs, files
+        tree = ({}, [])
+        for key in remove_lithops_keys(self._storage.list_bucket_keys(prefix=prefix)):
+            *dir_names, file_name = key[len(prefix):].split('/')
+            node = tree
+            for dir_name in dir_names:
+                node = node[0].setdefault(dir_name, ({}, []))
+            if file_name:
+                # keys ending in '/' are folder markers, not files
+                node[1].append(file_name)
+
+        if tree != ({}, []):
+            yield from _walk_tree(top, tree, topdown)
 
     def remove(self, path):
         self._storage.delete_data(path)
@@ -189,41 +177,180 @@ class _path:
         return False
 
 
-class DelayedBytesBuffer(io.BytesIO):
-    def __init__(self, action, initial_bytes=None):
-        super().__init__(initial_bytes)
-        self._action = action
+def _walk_tree(top, tree, topdown):
+    subdirs, files = tree
+    dirs = list(subdirs)
+    if topdown:
+        yield top, dirs, files
+    for dir_name in dirs:
+        yield from _walk_tree(base_os.path.join(top, dir_name), subdirs[dir_name], topdown)
+    if not topdown:
+        yield top, dirs, files
+
+
+class CloudFileReader(io.RawIOBase):
+    """
+    Seekable reader of a storage object, with byte-range requests of
+    'part_size' bytes. When the object is read sequentially, the next
+    range is downloaded in the background while the current one is
+    consumed, so at most two ranges are held in memory.
+    """
+
+    def __init__(self, storage, key, part_size=None):
+        self._storage = storage
+        self._key = key
+        self._part_size = part_size or storage.part_size
+        self._size = int(storage.head_object(storage.bucket, key)['content-length'])
+        self._pos = 0
+        self._part = (0, b'')  # (first byte, data)
+        self._prefetch = None  # (first byte, future)
+        self._pool = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError(f'negative seek position {offset}')
+        self._pos = offset
+        return self._pos
+
+    def _get_range(self, first_byte):
+        last_byte = min(first_byte + self._part_size, self._size) - 1
+        return self._storage.get_object(self._storage.bucket, self._key,
+                                        extra_get_args={'Range': f'bytes={first_byte}-{last_byte}'})
+
+    def _load_part(self):
+        first_byte = self._pos - self._pos % self._part_size
+        sequential = first_byte == self._part[0] + len(self._part[1])
+        if self._prefetch and self._prefetch[0] == first_byte:
+            data = self._prefetch[1].result()
+        else:
+            data = self._get_range(first_byte)
+        self._part = (first_byte, data)
+        self._prefetch = None
+
+        next_byte = first_byte + len(data)
+        if sequential and next_byte < self._size:
+            self._pool = self._pool or ThreadPoolExecutor(max_workers=1)
+            self._prefetch = (next_byte, self._pool.submit(self._get_range, next_byte))
+
+    def readinto(self, buffer):
+        if self._pos >= self._size:
+            return 0
+        first_byte, data = self._part
+        if not first_byte <= self._pos < first_byte + len(data):
+            self._load_part()
+            first_byte, data = self._part
+        start = self._pos - first_byte
+        length = min(len(buffer), len(data) - start)
+        memoryview(buffer)[:length] = data[start:start + length]
+        self._pos += length
+        return length
 
     def close(self):
-        self._action(self.getvalue())
-        io.BytesIO.close(self)
-
-
-class DelayedStringBuffer(io.StringIO):
-    def __init__(self, action, initial_value=None):
-        super().__init__(initial_value)
-        self._action = action
+        if self._prefetch:
+            self._prefetch[1].cancel()
+        if self._pool:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        self._part = (0, b'')
+        self._prefetch = None
+        super().close()
+
+
+class CloudFileWriter(io.RawIOBase):
+    """
+    Writer of a storage object. The data is uploaded in parts of 'part_size'
+    bytes as it is written, with at most WRITE_MAX_CONCURRENCY parts in flight,
+    if the backend supports multipart uploads. Otherwise, or if the object
+    is smaller than a part, it is uploaded with a single request on close().
+    """
+
+    def __init__(self, storage, key, part_size=None):
+        self._storage = storage
+        self._key = key
+        self._part_size = part_size or storage.part_size
+        self._multipart = storage.supports_multipart_uploads()
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []  # (part number, future)
+        self._pool = None
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        if self._multipart:
+            while len(self._buffer) >= self._part_size:
+                part = bytes(self._buffer[:self._part_size])
+                del self._buffer[:self._part_size]
+                self._upload_part(part)
+        return len(data)
+
+    def _upload_part(self, data):
+        handler, bucket = self._storage.storage_handler, self._storage.bucket
+        if self._upload_id is None:
+            self._upload_id = handler.create_multipart_upload(bucket, self._key)
+            self._pool = ThreadPoolExecutor(max_workers=WRITE_MAX_CONCURRENCY)
+
+        # Bound the memory of the parts in flight
+        running = [future for _, future in self._parts if not future.done()]
+        if len(running) >= WRITE_MAX_CONCURRENCY:
+            wait(running, return_when=FIRST_COMPLETED)
+
+        part_number = len(self._parts) + 1
+        future = self._pool.submit(handler.upload_part, bucket, self._key, self._upload_id, part_number, data)
+        self._parts.append((part_number, future))
+        # Keep the number of parts of large files within the backend limits
+        if part_number % WRITE_PART_SIZE_GROWTH == 0:
+            self._part_size *= 2
 
     def close(self):
-        self._action(self.getvalue())
-        io.StringIO.close(self)
+        if self.closed:
+            return
+        handler, bucket = self._storage.storage_handler, self._storage.bucket
+        try:
+            if self._upload_id is None:
+                self._storage.put_object(bucket, self._key, bytes(self._buffer))
+            else:
+                try:
+                    if self._buffer:
+                        self._upload_part(bytes(self._buffer))
+                    parts = [(part_number, future.result()) for part_number, future in self._parts]
+                    handler.complete_multipart_upload(bucket, self._key, self._upload_id, parts)
+                except Exception:
+                    for _, future in self._parts:
+                        future.cancel()
+                    handler.abort_multipart_upload(bucket, self._key, self._upload_id)
+                    raise
+                finally:
+                    self._pool.shutdown(wait=False)
+        finally:
+            self._buffer = bytearray()
+            super().close()
 
 
 def cloud_open(filename, mode='r', cloud_storage=None):
     storage = cloud_storage or CloudStorage()
     if 'r' in mode:
-        if 'b' in mode:
-            # we could get_data(stream=True) but some streams are not seekable
-            return io.BytesIO(storage.get_data(filename))
-        else:
-            return io.StringIO(storage.get_data(filename).decode())
+        reader = io.BufferedReader(CloudFileReader(storage, filename))
+        return reader if 'b' in mode else io.TextIOWrapper(reader, encoding='utf-8', newline='\n')
 
     if 'w' in mode:
-        action = partial(storage.put_data, filename)
-        if 'b' in mode:
-            return DelayedBytesBuffer(action)
-        else:
-            return DelayedStringBuffer(action)
+        writer = io.BufferedWriter(CloudFileWriter(storage, filename))
+        return writer if 'b' in mode else io.TextIOWrapper(writer, encoding='utf-8', newline='\n')
 
 
 if not is_lithops_worker():
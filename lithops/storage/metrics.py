@@ -0,0 +1,251 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import time
+import bisect
+import threading
+import functools
+
+# Upper bounds (ms) of the latency histogram buckets. The last bucket
+# counts the requests slower than the last bound
+LATENCY_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Methods of the storage backends that do not send requests
+UNTRACKED_METHODS = {'get_client', 'generate_bucket_name'}
+
+# Position and name of the data argument of the write methods
+WRITE_DATA_ARGS = {
+    'put_object': (2, 'data'),
+    'put_object_if_absent': (2, 'data'),
+    'upload_part': (4, 'data')
+}
+
+COUNTERS = ('requests', 'errors', 'retries', 'read_bytes', 'write_bytes', 'time')
+
+
+def new_op_stats():
+    stats = dict.fromkeys(COUNTERS, 0)
+    stats['latency_histogram'] = [0] * (len(LATENCY_BUCKETS) + 1)
+    return stats
+
+
+def data_size(data):
+    """
+    Returns the size in bytes of an object body, or 0 if it is a
+    file-like object of unknown size
+    """
+    if isinstance(data, memoryview):
+        return data.nbytes
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if isinstance(data, str):
+        return len(data.encode())
+    return 0
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except (TypeError, OSError):
+        return 0
+
+
+class StorageMetrics:
+    """
+    Thread-safe counters of the requests sent to a storage backend,
+    per operation: requests, failed requests, retries, bytes read and
+    written, total time (s) and a latency histogram (see LATENCY_BUCKETS)
+    """
+
+    def __init__(self):
+        self.ops = {}
+        self.lock = threading.Lock()
+
+    def _op(self, op):
+        if op not in self.ops:
+            self.ops[op] = new_op_stats()
+        return self.ops[op]
+
+    def record(self, op, elapsed, read_bytes=0, write_bytes=0, error=False):
+        """
+        Records a request of an operation
+
+        :param op: name of the operation
+        :param elapsed: duration of the request (s)
+        :param read_bytes: bytes received
+        :param write_bytes: bytes sent
+        :param error: True if the request failed
+        """
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, elapsed * 1000)
+        with self.lock:
+            stats = self._op(op)
+            stats['requests'] += 1
+            stats['errors'] += int(error)
+            stats['read_bytes'] += read_bytes
+            stats['write_bytes'] += write_bytes
+            stats['time'] += elapsed
+            stats['latency_histogram'][bucket] += 1
+
+    def record_read(self, op, read_bytes):
+        """
+        Adds the bytes read from a streamed response to an operation
+        """
+        with self.lock:
+            self._op(op)['read_bytes'] += read_bytes
+
+    def record_retry(self, op):
+        """
+        Records that a failed request of an operation was retried
+        """
+        with self.lock:
+            self._op(op)['retries'] += 1
+
+    def snapshot(self):
+        """
+        Returns a copy of the counters of each operation
+        """
+        with self.lock:
+            return {op: dict(stats, latency_histogram=list(stats['latency_histogram']))
+                    for op, stats in self.ops.items()}
+
+
+def diff_ops(after, before):
+    """
+    Returns the counters of the requests recorded between two snapshots
+    """
+    ops = {}
+    for op, stats in after.items():
+        prev = before.get(op) or new_op_stats()
+        delta = {counter: stats[counter] - prev[counter] for counter in COUNTERS}
+        delta['latency_histogram'] = [a - b for a, b in zip(stats['latency_histogram'],
+                                                            prev['latency_histogram'])]
+        if any(delta[counter] for counter in COUNTERS):
+            ops[op] = delta
+    return ops
+
+
+def merge_ops(ops_list):
+    """
+    Adds up the counters of several snapshots
+    """
+    ops = {}
+    for snapshot in ops_list:
+        for op, stats in snapshot.items():
+            total = ops.setdefault(op, new_op_stats())
+            for counter in COUNTERS:
+                total[counter] += stats[counter]
+            total['latency_histogram'] = [a + b for a, b in zip(total['latency_histogram'],
+                                                                stats['latency_histogram'])]
+    return ops
+
+
+def summarize_ops(ops):
+    """
+    Returns the totals of all the operations of a snapshot, with the
+    per-operation counters under the 'ops' key
+    """
+    summary = {counter: sum(stats[counter] for stats in ops.values()) for counter in COUNTERS}
+    summary['time'] = round(summary['time'], 6)
+    summary['ops'] = ops
+    return summary
+
+
+class CountingStream:
+    """
+    File-like wrapper of a streamed get_object() response that counts
+    the bytes read from it
+    """
+
+    def __init__(self, stream, metrics, op):
+        self._stream = stream
+        self._metrics = metrics
+        self._op = op
+
+    def read(self, *args, **kwargs):
+        data = self._stream.read(*args, **kwargs)
+        self._metrics.record_read(self._op, len(data))
+        return data
+
+    def readinto(self, buffer):
+        n = self._stream.readinto(buffer)
+        self._metrics.record_read(self._op, n or 0)
+        return n
+
+    def readline(self, *args, **kwargs):
+        line = self._stream.readline(*args, **kwargs)
+        self._metrics.record_read(self._op, len(line))
+        return line
+
+    def __iter__(self):
+        for line in self._stream:
+            self._metrics.record_read(self._op, len(line))
+            yield line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class InstrumentedBackend:
+    """
+    Proxy of a storage backend that records the requests, bytes and
+    latency of each of its methods in a StorageMetrics instance
+    """
+
+    def __init__(self, backend, metrics):
+        self._backend = backend
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        if name in ('_backend', '_metrics'):
+            raise AttributeError(name)
+        attr = getattr(self._backend, name)
+        if name.startswith('_') or name in UNTRACKED_METHODS or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def method(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception:
+                self._metrics.record(name, time.perf_counter() - start, error=True)
+                raise
+            elapsed = time.perf_counter() - start
+
+            read_bytes = write_bytes = 0
+            if name in WRITE_DATA_ARGS:
+                position, arg = WRITE_DATA_ARGS[name]
+                write_bytes = data_size(args[position] if len(args) > position else kwargs.get(arg))
+            elif name == 'upload_file':
+                write_bytes = file_size(args[0] if args else kwargs.get('file_name'))
+            elif name == 'download_file':
+                read_bytes = file_size(args[2] if len(args) > 2 else kwargs.get('file_name'))
+            elif name == 'get_object':
+                read_bytes = data_size(result)
+                if result is not None and not read_bytes and hasattr(result, 'read'):
+                    result = CountingStream(result, self._metrics, name)
+
+            self._metrics.record(name, elapsed, read_bytes, write_bytes)
+            return result
+
+        # Cache the wrapper, so the next lookups skip __getattr__
+        setattr(self, name, method)
+        return method
@@ -17,14 +17,20 @@
 
 import os
 import json
+import time
 import logging
 import itertools
 import importlib
-from typing import Optional, List, Union, Tuple, Dict, TextIO, BinaryIO, Any
+import concurrent.futures as cf
+from typing import Optional, List, Union, Tuple, Dict, TextIO, BinaryIO, Any, Iterable, Iterator
 
-from lithops.constants import CACHE_DIR, RUNTIMES_PREFIX, JOBS_PREFIX, TEMP_PREFIX
+from lithops.constants import CACHE_DIR, RUNTIMES_PREFIX, JOBS_PREFIX, TEMP_PREFIX, \
+    STORAGE_MAX_CONCURRENCY_DEFAULT, STORAGE_PART_SIZE_DEFAULT, STORAGE_CACHE_MEMORY_DEFAULT, \
+    STORAGE_CACHE_DISK_DEFAULT, STORAGE_DELETE_RATE_DEFAULT
 from lithops.utils import is_lithops_worker
 from lithops.storage import utils
+from lithops.storage.cache import ObjectCache, get_validator
+from lithops.storage.metrics import StorageMetrics, InstrumentedBackend
 from lithops.config import extract_storage_config, default_storage_config
 
 logger = logging.getLogger(__name__)
@@ -33,6 +39,60 @@ logger = logging.getLogger(__name__)
 RUNTIME_META_CACHE = {}
 COBJECTS_INDEX = itertools.count()
 
+BULK_RETRIES = 2
+BULK_RETRY_BACKOFF = 0.1  # seconds
+
+MULTIPART_MAX_PARTS = 10000
+
+
+def _run_bulk(operation, items, max_concurrency, retries, return_exceptions, item_key=None, on_retry=None):
+    """
+    Runs a storage operation over the items with at most max_concurrency
+    operations in flight, and yields (item, result) in completion order.
+    The items are consumed lazily, so they can be a generator. on_retry
+    is called each time a failed operation is retried.
+    """
+    item_key = item_key or (lambda item: item)
+
+    def run(item):
+        for attempt in itertools.count():
+            try:
+                return operation(item)
+            except utils.StorageNoSuchKeyError:
+                raise
+            except Exception:
+                if attempt >= retries:
+                    raise
+                if on_retry:
+                    on_retry()
+                time.sleep(BULK_RETRY_BACKOFF * 2 ** attempt)
+
+    items = iter(items)
+    errors = []
+    total = 0
+
+    with cf.ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        in_flight = {pool.submit(run, item): item for item in itertools.islice(items, max_concurrency)}
+        total += len(in_flight)
+        while in_flight:
+            done, _ = cf.wait(in_flight, return_when=cf.FIRST_COMPLETED)
+            finished = [(in_flight.pop(op), op) for op in done]
+            # Keep the pool busy while the caller processes the results
+            for item in itertools.islice(items, len(finished)):
+                in_flight[pool.submit(run, item)] = item
+                total += 1
+            for item, op in finished:
+                error = op.exception()
+                if error is None:
+                    yield item_key(item), op.result()
+                elif return_exceptions:
+                    yield item_key(item), error
+                else:
+                    errors.append((item_key(item), error))
+
+    if errors:
+        raise utils.StorageBulkOperationError(errors, total)
+
 
 class Storage:
     """
@@ -63,7 +123,8 @@ class Storage:
             module_location = f'lithops.storage.backends.{self.backend}'
             sb_module = importlib.import_module(module_location)
             StorageBackend = getattr(sb_module, 'StorageBackend')
-            self.storage_handler = StorageBackend(self.config[self.backend])
+            self.metrics = StorageMetrics()
+            self.storage_handler = InstrumentedBackend(StorageBackend(self.config[self.backend]), self.metrics)
         except Exception as e:
             logger.error("An exception was produced trying to create the "
                          f"'{self.backend}' storage backend")
@@ -71,6 +132,31 @@ class Storage:
 
         bucket = self.config[self.backend].get('storage_bucket')
         self.bucket = bucket or self.storage_handler.generate_bucket_name()
+        self.max_concurrency = self.config[self.backend].get('max_concurrency', STORAGE_MAX_CONCURRENCY_DEFAULT)
+        self.part_size = self.config[self.backend].get('part_size', STORAGE_PART_SIZE_DEFAULT) * 1024 ** 2
+        self.delete_rate = self.config[self.backend].get('delete_rate', STORAGE_DELETE_RATE_DEFAULT)
+
+        self.cache = None
+        if self.config.get('cache'):
+            self.enable_cache(**self.config['cache'])
+
+    def enable_cache(self,
+                     max_memory: Optional[int] = None,
+                     max_disk: Optional[int] = None,
+                     validate: Optional[bool] = True):
+        """
+        Enables the two-tier read cache of get_object() and get_cloudobject().
+
+        :param max_memory: Max size of the in-memory tier (MiB)
+        :param max_disk: Max size of the local disk tier (MiB). 0 to disable it
+        :param validate: Check with a HEAD request that the cached data is from the
+            current version of the object. If False, the objects are assumed immutable
+        """
+        self.cache = ObjectCache(
+            max_memory=STORAGE_CACHE_MEMORY_DEFAULT if max_memory is None else max_memory,
+            max_disk=STORAGE_CACHE_DISK_DEFAULT if max_disk is None else max_disk
+        )
+        self.cache_validate = validate
 
     def get_client(self) -> object:
         """
@@ -108,6 +194,30 @@ class Storage:
         """
         return self.storage_handler.put_object(bucket, key, body)
 
+    def put_object_if_absent(self, bucket: str, key: str,
+                             body: Union[str, bytes]) -> bool:
+        """
+        Adds an object to a bucket only if the key does not exist yet. The
+        existence check and the write are atomic in the storage backend.
+
+        :param bucket: Name of the bucket
+        :param key: Key of the object
+        :param body: Object data
+
+        :return: True if the object was created, False if the key already existed
+        """
+        if not self.supports_conditional_writes():
+            raise NotImplementedError(f'The {self.backend} storage backend does not support conditional writes')
+        return self.storage_handler.put_object_if_absent(bucket, key, body)
+
+    def supports_conditional_writes(self) -> bool:
+        """
+        Checks if the storage backend implements put_object_if_absent()
+
+        :return: True if conditional writes are supported
+        """
+        return hasattr(self.storage_handler, 'put_object_if_absent')
+
     def get_object(self,
                    bucket: str,
                    key: str,
@@ -127,9 +237,32 @@ class Storage:
 
         :return: Object, as a binary array or as a file-like stream if parameter `stream` is enabled
         """
+        if self.cache is not None and not stream and set(extra_get_args) <= {'Range'} \
+           and not (key.startswith(JOBS_PREFIX) and not key.startswith(TEMP_PREFIX)):
+            return self._get_cached_object(bucket, key, extra_get_args.get('Range'))
+
         return self.storage_handler.get_object(
             bucket, key, stream, extra_get_args)
 
+    def _get_cached_object(self, bucket, key, byte_range):
+        """
+        Gets an object, or a byte-range of it, through the read cache. The
+        internal job objects are not cached, except the cloudobjects, which
+        are never overwritten.
+        """
+        validator = ''
+        if self.cache_validate and not key.startswith(TEMP_PREFIX):
+            validator = get_validator(self.storage_handler.head_object(bucket, key))
+
+        entry_key = (self.backend, bucket, key, byte_range)
+        data = self.cache.get(entry_key, validator)
+        if data is None:
+            extra_get_args = {'Range': byte_range} if byte_range else {}
+            data = self.storage_handler.get_object(bucket, key, False, extra_get_args)
+            self.cache.put(entry_key, validator, data)
+
+        return data
+
     def upload_file(self,
                     file_name: str,
                     bucket: str,
@@ -172,6 +305,192 @@ class Storage:
         """
         return self.storage_handler.download_file(bucket, key, file_name, extra_args, config)
 
+    def get_objects(self,
+                    bucket: str,
+                    keys: Iterable[Union[str, Tuple[str, Dict]]],
+                    stream: Optional[bool] = False,
+                    max_concurrency: Optional[int] = None,
+                    retries: Optional[int] = BULK_RETRIES,
+                    return_exceptions: Optional[bool] = False) -> Iterator[Tuple[Any, Any]]:
+        """
+        Retrieves many objects from the storage backend concurrently.
+
+        :param bucket: Name of the bucket
+        :param keys: Keys of the objects, or (key, extra_get_args) tuples to read byte-ranges.
+            For example: ``('data.csv', {'Range': 'bytes=0-100'})``
+        :param stream: Get the objects data or file-like objects
+        :param max_concurrency: Max number of requests in flight. By default, the 'max_concurrency' of the backend config
+        :param retries: Number of retries of each failed request. Missing keys are not retried
+        :param return_exceptions: Yield the exception of the failed requests instead of raising a StorageBulkOperationError at the end
+
+        :return: Iterator of (key, data) tuples, in completion order
+        """
+        def get(item):
+            key, extra_get_args = (item, {}) if isinstance(item, str) else item
+            return self.storage_handler.get_object(bucket, key, stream, extra_get_args)
+
+        return _run_bulk(get, keys, max_concurrency or self.max_concurrency, retries, return_exceptions,
+                         on_retry=lambda: self.metrics.record_retry('get_object'))
+
+    def put_objects(self,
+                    bucket: str,
+                    objects: Iterable[Tuple[str, Union[str, bytes, TextIO, BinaryIO]]],
+                    max_concurrency: Optional[int] = None,
+                    retries: Optional[int] = BULK_RETRIES,
+                    return_exceptions: Optional[bool] = False) -> List[Tuple[str, Any]]:
+        """
+        Adds many objects to a bucket of the storage backend concurrently.
+        It returns once all the objects are uploaded.
+
+        :param bucket: Name of the bucket
+        :param objects: (key, body) tuples
+        :param max_concurrency: Max number of requests in flight. By default, the 'max_concurrency' of the backend config
+        :param retries: Number of retries of each failed request
+        :param return_exceptions: Return the exception of the failed requests instead of raising a StorageBulkOperationError
+
+        :return: List of (key, response) tuples, in completion order
+        """
+        def put(item):
+            key, body = item
+            return self.storage_handler.put_object(bucket, key, body)
+
+        return list(_run_bulk(put, objects, max_concurrency or self.max_concurrency, retries,
+                              return_exceptions, item_key=lambda item: item[0],
+                              on_retry=lambda: self.metrics.record_retry('put_object')))
+
+    def head_objects(self,
+                     bucket: str,
+                     keys: Iterable[str],
+                     max_concurrency: Optional[int] = None,
+                     retries: Optional[int] = BULK_RETRIES,
+                     return_exceptions: Optional[bool] = False) -> List[Tuple[str, Dict]]:
+        """
+        Retrieves the metadata of many objects concurrently.
+        It returns once all the requests are done.
+
+        :param bucket: Name of the bucket
+        :param keys: Keys of the objects
+        :param max_concurrency: Max number of requests in flight. By default, the 'max_concurrency' of the backend config
+        :param retries: Number of retries of each failed request. Missing keys are not retried
+        :param return_exceptions: Return the exception of the failed requests instead of raising a StorageBulkOperationError
+
+        :return: List of (key, metadata) tuples, in completion order
+        """
+        def head(key):
+            return self.storage_handler.head_object(bucket, key)
+
+        return list(_run_bulk(head, keys, max_concurrency or self.max_concurrency, retries, return_exceptions,
+                              on_retry=lambda: self.metrics.record_retry('head_object')))
+
+    def multipart_download(self,
+                           bucket: str,
+                           key: str,
+                           file_name: Optional[str] = None,
+                           part_size: Optional[int] = None,
+                           max_concurrency: Optional[int] = None) -> Optional[bytearray]:
+        """
+        Downloads an object with concurrent byte-range requests, written into a
+        preallocated buffer or file as they arrive.
+
+        :param bucket: Name of the bucket
+        :param key: Key of the object
+        :param file_name: Name of the file to save the object data. If not set, the data is returned
+        :param part_size: Size of each byte-range request in bytes. By default, the 'part_size' of the backend config
+        :param max_concurrency: Max number of requests in flight. By default, the 'max_concurrency' of the backend config
+
+        :return: Object data, or None if it is saved in a file
+        """
+        part_size = part_size or self.part_size
+        size = int(self.head_object(bucket, key)['content-length'])
+        ranges = ((key, {'Range': f'bytes={start}-{min(start + part_size, size) - 1}'})
+                  for start in range(0, size, part_size))
+
+        def offset(item):
+            return int(item[1]['Range'][6:].split('-')[0])
+
+        parts = self.get_objects(bucket, ranges, max_concurrency=max_concurrency)
+
+        if file_name is None:
+            buffer = bytearray(size)
+            for item, data in parts:
+                start = offset(item)
+                buffer[start:start + len(data)] = data
+            return buffer
+
+        dirname = os.path.dirname(file_name)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with open(file_name, 'wb') as out:
+            out.truncate(size)
+            for item, data in parts:
+                out.seek(offset(item))
+                out.write(data)
+
+    def multipart_upload(self,
+                         bucket: str,
+                         key: str,
+                         body: Optional[Union[str, bytes]] = None,
+                         file_name: Optional[str] = None,
+                         part_size: Optional[int] = None,
+                         max_concurrency: Optional[int] = None):
+        """
+        Uploads an object in parts with concurrent requests, if the backend
+        supports multipart uploads. Otherwise, it uploads it with a single request.
+
+        :param bucket: Name of the bucket
+        :param key: Key of the object
+        :param body: Object data
+        :param file_name: Name of the file to upload, if body is not set
+        :param part_size: Size of each part in bytes. By default, the 'part_size' of the backend config.
+            It is raised to the minimum part size of the backend if it is smaller
+        :param max_concurrency: Max number of requests in flight. By default, the 'max_concurrency' of the backend config
+        """
+        if isinstance(body, str):
+            body = body.encode()
+        size = len(body) if body is not None else os.path.getsize(file_name)
+        min_part_size = getattr(self.storage_handler, 'MULTIPART_MIN_PART_SIZE', 1)
+        part_size = max(part_size or self.part_size, min_part_size, -(-size // MULTIPART_MAX_PARTS))
+
+        if size <= part_size or not self.supports_multipart_uploads():
+            if body is not None:
+                return self.storage_handler.put_object(bucket, key, body)
+            with open(file_name, 'rb') as in_file:
+                return self.storage_handler.put_object(bucket, key, in_file)
+
+        def read_parts():
+            if body is not None:
+                for part_number, start in enumerate(range(0, size, part_size), 1):
+                    yield part_number, body[start:start + part_size]
+            else:
+                with open(file_name, 'rb') as in_file:
+                    for part_number in itertools.count(1):
+                        data = in_file.read(part_size)
+                        if not data:
+                            break
+                        yield part_number, data
+
+        def upload_part(item):
+            part_number, data = item
+            return self.storage_handler.upload_part(bucket, key, upload_id, part_number, data)
+
+        upload_id = self.storage_handler.create_multipart_upload(bucket, key)
+        try:
+            parts = sorted(_run_bulk(upload_part, read_parts(), max_concurrency or self.max_concurrency,
+                                     BULK_RETRIES, False, item_key=lambda item: item[0],
+                                     on_retry=lambda: self.metrics.record_retry('upload_part')))
+            self.storage_handler.complete_multipart_upload(bucket, key, upload_id, parts)
+        except Exception:
+            self.storage_handler.abort_multipart_upload(bucket, key, upload_id)
+            raise
+
+    def supports_multipart_uploads(self) -> bool:
+        """
+        Checks if the storage backend implements multipart uploads
+
+        :return: True if multipart uploads are supported
+        """
+        return hasattr(self.storage_handler, 'upload_part')
+
     def head_object(self, bucket: str, key: str) -> Dict:
         """
         The HEAD operation retrieves metadata from an object without returning the object itself. This operation is
@@ -261,16 +580,38 @@ class Storage:
 
         :return: CloudObject instance
         """
-        prefix = os.environ.get('__LITHOPS_SESSION_ID', '')
-        coid = hex(next(COBJECTS_INDEX))[2:]
-        coname = 'cloudobject_{}'.format(coid)
-        name = '/'.join([prefix, coname]) if prefix else coname
-        key = key or '/'.join([TEMP_PREFIX, name])
+        key = key or self._create_cloudobject_key()
         bucket = bucket or self.bucket
         self.storage_handler.put_object(bucket, key, body)
 
         return utils.CloudObject(self.backend, bucket, key)
 
+    def put_cloudobjects(self,
+                         bodies: Iterable[Union[str, bytes, TextIO, BinaryIO]],
+                         bucket: Optional[str] = None,
+                         max_concurrency: Optional[int] = None) -> List[utils.CloudObject]:
+        """
+        Put many CloudObjects into storage concurrently.
+
+        :param bodies: Data contents
+        :param bucket: Destination bucket
+        :param max_concurrency: Max number of requests in flight
+
+        :return: List of CloudObject instances, in the order of the bodies
+        """
+        bucket = bucket or self.bucket
+        objects = [(self._create_cloudobject_key(), body) for body in bodies]
+        self.put_objects(bucket, objects, max_concurrency=max_concurrency)
+
+        return [utils.CloudObject(self.backend, bucket, key) for key, _ in objects]
+
+    def _create_cloudobject_key(self):
+        prefix = os.environ.get('__LITHOPS_SESSION_ID', '')
+        coid = hex(next(COBJECTS_INDEX))[2:]
+        coname = 'cloudobject_{}'.format(coid)
+        name = '/'.join([prefix, coname]) if prefix else coname
+        return '/'.join([TEMP_PREFIX, name])
+
     def get_cloudobject(self,
                         cloudobject: utils.CloudObject,
                         stream: Optional[bool] = False) -> Union[str,
@@ -288,7 +629,7 @@ class Storage:
         if cloudobject.backend == self.backend:
             bucket = cloudobject.bucket
             key = cloudobject.key
-            return self.storage_handler.get_object(bucket, key, stream=stream)
+            return self.get_object(bucket, key, stream=stream)
         else:
             raise Exception("CloudObject: Invalid Storage backend")
 
@@ -323,7 +664,7 @@ class Storage:
             if backend == self.backend:
                 for bucket in cobjs[backend]:
                     self.storage_handler.delete_objects(
-                        bucket, cobjs[backend][co.bucket])
+                        bucket, cobjs[backend][bucket])
             else:
                 raise Exception("CloudObject: Invalid Storage backend")
 
@@ -392,6 +733,33 @@ class InternalStorage:
         return self.storage.get_object(
             self.bucket, key, stream, extra_get_args)
 
+    def get_objects(self, keys, stream=False, return_exceptions=False):
+        """
+        Get many data objects from storage concurrently.
+        :param keys: data keys, or (key, extra_get_args) tuples
+        :param return_exceptions: yield the exception of the failed requests instead of raising
+        :return: iterator of (key, data content) tuples, in completion order
+        """
+        return self.storage.get_objects(self.bucket, keys, stream, return_exceptions=return_exceptions)
+
+    def put_objects(self, objects, return_exceptions=False):
+        """
+        Put many data objects into storage concurrently.
+        :param objects: (key, data content) tuples
+        :param return_exceptions: return the exception of the failed requests instead of raising
+        :return: list of (key, response) tuples, in completion order
+        """
+        return self.storage.put_objects(self.bucket, objects, return_exceptions=return_exceptions)
+
+    def head_objects(self, keys, return_exceptions=False):
+        """
+        Get the metadata of many data objects concurrently.
+        :param keys: data keys
+        :param return_exceptions: return the exception of the failed requests instead of raising
+        :return: list of (key, metadata) tuples, in completion order
+        """
+        return self.storage.head_objects(self.bucket, keys, return_exceptions=return_exceptions)
+
     def get_func(self, key):
         """
         Get serialized function from storage.
@@ -429,6 +797,71 @@ class InternalStorage:
 
         return set(running_callids), set(done_callids)
 
+    def put_job_manifest(self, executor_id, job_id, manifest):
+        """
+        Put the manifest of a job into storage.
+        :param executor_id: executor ID of the job
+        :param job_id: job ID
+        :param manifest: dictionary with the job metadata
+        """
+        manifest_key = utils.create_manifest_key(executor_id, job_id)
+        self.storage.put_object(self.bucket, manifest_key, json.dumps(manifest))
+
+    def get_job_manifest(self, executor_id, job_id):
+        """
+        Get the manifest of a job.
+        :param executor_id: executor ID of the job
+        :param job_id: job ID
+        :return: A dictionary with the job metadata
+        """
+        manifest_key = utils.create_manifest_key(executor_id, job_id)
+        data = self.storage.get_object(self.bucket, manifest_key)
+        return json.loads(data.decode('ascii'))
+
+    def claim_call_range(self, executor_id, job_id, index, worker_id):
+        """
+        Claims a range of calls of a job for a worker.
+        :param executor_id: executor ID of the job
+        :param job_id: job ID
+        :param index: index of the range of calls
+        :param worker_id: ID of the worker that claims the range
+        :return: True if the range was claimed, False if another worker claimed it before
+        """
+        claim_key = utils.create_claim_key(executor_id, job_id, index)
+        return self.storage.put_object_if_absent(self.bucket, claim_key, worker_id)
+
+    def get_claimed_ranges(self, executor_id, job_id):
+        """
+        Get the indexes of the ranges of calls of a job already claimed.
+        :param executor_id: executor ID of the job
+        :param job_id: job ID
+        :return: A set with the claimed indexes
+        """
+        claims_prefix = utils.create_claim_key(executor_id, job_id, 0).rsplit('/', 1)[0] + '/'
+        keys = self.storage.list_keys(self.bucket, claims_prefix)
+        return {int(k.rsplit('/', 1)[-1].split('.')[0]) for k in keys
+                if k.endswith('.' + utils.claim_key_suffix)}
+
+    def get_job_manifests(self, executor_id):
+        """
+        Get the manifests of all the jobs of an executor.
+        :param executor_id: executor ID
+        :return: A list with the manifests of the jobs
+        """
+        callset_prefix = '/'.join([JOBS_PREFIX, executor_id])
+        keys = self.storage.list_keys(self.bucket, callset_prefix)
+        manifest_keys = [k for k in keys if k.endswith('/' + utils.manifest_key_suffix)]
+
+        manifests = []
+        for manifest_key in manifest_keys:
+            data = self.storage.get_object(self.bucket, manifest_key)
+            manifest = json.loads(data.decode('ascii'))
+            # The prefix also matches the executors created inside the functions
+            if manifest['executor_id'] == executor_id:
+                manifests.append(manifest)
+
+        return manifests
+
     def get_call_status(self, executor_id, job_id, call_id):
         """
         Get status of a call.
@@ -443,6 +876,70 @@ class InternalStorage:
         except utils.StorageNoSuchKeyError:
             return None
 
+    def get_call_statuses(self, call_ids):
+        """
+        Get the status of many calls concurrently.
+        :param call_ids: (executor_id, job_id, call_id) tuples
+        :return: iterator of (call_id tuple, status) tuples in completion order,
+            where the status is None if the call has no updated status
+        """
+        status_keys = {utils.create_status_key(*call_id): call_id for call_id in call_ids}
+
+        if hasattr(self.storage.storage_handler, 'get_objects_batch'):
+            # The backend reads many small objects in a single request
+            keys = list(status_keys)
+            for status_key, data in zip(keys, self.storage.storage_handler.get_objects_batch(self.bucket, keys)):
+                yield status_keys[status_key], None if data is None else json.loads(data.decode('ascii'))
+            return
+
+        for status_key, data in self.get_objects(status_keys, return_exceptions=True):
+            if isinstance(data, utils.StorageNoSuchKeyError):
+                yield status_keys[status_key], None
+            elif isinstance(data, Exception):
+                raise data
+            else:
+                yield status_keys[status_key], json.loads(data.decode('ascii'))
+
+    def call_status_exists(self, executor_id, job_id, call_id):
+        """
+        Checks if a call already has a finish status.
+        :param executor_id: executor ID of the call
+        :param call_id: call ID of the call
+        :return: True if the status of the call exists
+        """
+        status_key = utils.create_status_key(executor_id, job_id, call_id)
+        try:
+            self.storage.head_object(self.bucket, status_key)
+            return True
+        except utils.StorageNoSuchKeyError:
+            return False
+
+    def claim_call_completion(self, executor_id, job_id, call_id, token, speculation=False):
+        """
+        Claims the completion of a call for an activation, so that only one
+        activation stores the output and the status of the call. Only needed
+        when speculative backup activations are enabled. The claim is atomic
+        in the storage backends with conditional writes. Otherwise it only
+        checks that no other activation stored the status of the call yet.
+        :param executor_id: executor ID of the call
+        :param call_id: call ID of the call
+        :param token: unique token of the activation
+        :param speculation: whether backup activations are enabled
+        :return: True if the activation claimed the completion of the call
+        """
+        if not speculation:
+            return True
+        try:
+            if not self.storage.supports_conditional_writes():
+                return not self.call_status_exists(executor_id, job_id, call_id)
+            done_key = utils.create_done_key(executor_id, job_id, call_id)
+            if self.storage.put_object_if_absent(self.bucket, done_key, token):
+                return True
+            # The activation may have claimed the call before
+            return self.storage.get_object(self.bucket, done_key).decode() == token
+        except Exception:
+            return True
+
     def get_call_output(self, executor_id, job_id, call_id):
         """
         Get the output of a call.
@@ -456,6 +953,30 @@ class InternalStorage:
         except utils.StorageNoSuchKeyError:
             return None
 
+    def get_cached_output(self, cache_key):
+        """
+        Get the output of a call from the results cache.
+        :param cache_key: cache key of the call
+        :return: Output of the call, or None if it is not cached.
+        """
+        try:
+            return self.storage.get_object(self.bucket, cache_key)
+        except utils.StorageNoSuchKeyError:
+            return None
+
+    def get_call_logs(self, executor_id, job_id, call_id):
+        """
+        Get the execution logs of a call.
+        :param executor_id: executor ID of the call
+        :param call_id: call ID of the call
+        :return: Logs of the call, or None if the call did not store them.
+        """
+        logs_key = utils.create_logs_key(executor_id, job_id, call_id)
+        try:
+            return self.storage.get_object(self.bucket, logs_key).decode()
+        except utils.StorageNoSuchKeyError:
+            return None
+
     def get_runtime_meta(self, key):
         """
         Get the metadata given a runtime name.
@@ -17,8 +17,11 @@
 
 import os
 import time
+import hashlib
 import logging
-from lithops.constants import JOBS_PREFIX
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from lithops.constants import JOBS_PREFIX, TEMP_PREFIX, RESULTS_CACHE_PREFIX
 
 
 logger = logging.getLogger(__name__)
@@ -29,8 +32,17 @@ agg_data_key_suffix = "aggdata.pickle"
 data_key_suffix = "data.pickle"
 output_key_suffix = "output.pickle"
 status_key_suffix = "status.json"
+logs_key_suffix = "execution.log"
+shuffle_key_suffix = "shuffle.data"
+manifest_key_suffix = "manifest.json"
+claim_key_suffix = "claim"
+done_key_suffix = "done"
 init_key_suffix = ".init"
 
+DELETE_BATCH_SIZE = 1000  # Max keys of a delete_objects() request in S3-like APIs
+CLEAN_MAX_ROUNDS = 3
+CLEAN_ROUND_DELAY = 1  # Seconds before listing again the prefixes that had keys
+
 
 class StorageNoSuchKeyError(Exception):
     def __init__(self, bucket, key):
@@ -38,6 +50,14 @@ class StorageNoSuchKeyError(Exception):
         super(StorageNoSuchKeyError, self).__init__(msg)
 
 
+class StorageBulkOperationError(Exception):
+    def __init__(self, errors, total):
+        self.errors = errors
+        item, error = errors[0]
+        msg = f"{len(errors)} of {total} storage operations failed. First error on {item}: {error}"
+        super(StorageBulkOperationError, self).__init__(msg)
+
+
 class StorageConfigMismatchError(Exception):
     def __init__(self, current_path, prev_path):
         msg = f"The data is stored at {prev_path}, but current storage is configured at {current_path}"
@@ -73,7 +93,97 @@ class CloudObjectLocal:
         return f'<CloudObject at {self.path}>'
 
 
-def clean_bucket(storage, bucket, prefix, sleep=5):
+class RateLimiter:
+    """
+    Token bucket that allows 'rate' units per second on average, with
+    bursts of up to one second of units. A rate of 0 disables it.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.tstamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """
+        Takes amount units, and sleeps until they are available
+        """
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.tstamp) * self.rate) - amount
+            self.tstamp = now
+            wait = -self.tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _map(function, items, max_concurrency):
+    """
+    Applies a function to the items with up to max_concurrency threads. With
+    max_concurrency 1 it runs in the calling thread, so it also works in the
+    atexit callbacks, where new threads can no longer be started.
+    """
+    if max_concurrency <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as pool:
+        return list(pool.map(function, items))
+
+
+def delete_keys(storage, bucket, keys, max_concurrency=None, delete_rate=None):
+    """
+    Deletes a list of keys with concurrent delete_objects() requests of up
+    to DELETE_BATCH_SIZE keys, deleting at most delete_rate keys per second.
+
+    :param max_concurrency: max requests in flight. By default, the one of the storage
+    :param delete_rate: max keys deleted per second. By default, the one of the storage
+    """
+    limiter = RateLimiter(storage.delete_rate if delete_rate is None else delete_rate)
+
+    def delete(batch):
+        limiter.acquire(len(batch))
+        storage.delete_objects(bucket, batch)
+
+    batches = [keys[i:i + DELETE_BATCH_SIZE] for i in range(0, len(keys), DELETE_BATCH_SIZE)]
+    _map(delete, batches, max_concurrency or storage.max_concurrency)
+
+
+def clean_prefixes(storage, bucket, prefixes, max_concurrency=None, round_delay=CLEAN_ROUND_DELAY):
+    """
+    Deletes all the objects under a set of prefixes. The prefixes are listed
+    concurrently, and the keys are deleted with delete_keys(). The prefixes
+    are listed again until they are empty, up to CLEAN_MAX_ROUNDS times, to
+    also delete the objects written while cleaning. Each new round waits
+    round_delay seconds, since the listings of some backends can still
+    return the keys just deleted.
+
+    :return: number of deleted objects
+    """
+    # A prefix under another one is already listed with it
+    to_list = []
+    for prefix in sorted(set(prefixes)):
+        if not to_list or not prefix.startswith(to_list[-1]):
+            to_list.append(prefix)
+
+    total_objects = 0
+    max_concurrency = max_concurrency or storage.max_concurrency
+    for i in range(CLEAN_MAX_ROUNDS):
+        if i > 0:
+            time.sleep(round_delay)
+        listed = _map(lambda prefix: storage.list_keys(bucket, prefix), to_list, max_concurrency)
+        keys = [key for prefix_keys in listed for key in prefix_keys]
+        if not keys:
+            break
+        delete_keys(storage, bucket, keys, max_concurrency)
+        total_objects += len(keys)
+        to_list = [prefix for prefix, prefix_keys in zip(to_list, listed) if prefix_keys]
+
+    return total_objects
+
+
+def clean_bucket(storage, bucket, prefix, sleep=CLEAN_ROUND_DELAY):
     """
     Deletes all the files from COS. These files include the function,
     the data serialization and the function invocation results.
@@ -81,16 +191,24 @@ def clean_bucket(storage, bucket, prefix, sleep=5):
     msg = f"Deleting objects from bucket '{bucket}'"
     msg = msg + f" and prefix '{prefix}'" if prefix else msg
     logger.info(msg)
-    total_objects = 0
-    objects_to_delete = storage.list_keys(bucket, prefix)
+    total_objects = clean_prefixes(storage, bucket, [prefix or ''], round_delay=sleep)
+    logger.info(f'Finished deleting objects, total found: {total_objects}')
 
-    while objects_to_delete:
-        total_objects = total_objects + len(objects_to_delete)
-        storage.delete_objects(bucket, objects_to_delete)
-        time.sleep(sleep)
-        objects_to_delete = storage.list_keys(bucket, prefix)
 
-    logger.info(f'Finished deleting objects, total found: {total_objects}')
+def get_clean_targets(data):
+    """
+    Returns the prefixes and the cloudobjects to delete of a clean request,
+    as written by FunctionExecutor.clean()
+    """
+    prefixes = set()
+    for job_key in data.get('jobs_to_clean', []):
+        prefixes.add(f'{JOBS_PREFIX}/{job_key}/')
+        if data['clean_cloudobjects']:
+            prefixes.add(f'{TEMP_PREFIX}/{job_key}/')
+    if 'fn_to_clean' in data:
+        prefixes.add(f'{JOBS_PREFIX}/{data["fn_to_clean"]}/')
+
+    return prefixes, list(data.get('cos_to_clean', []))
 
 
 def create_job_key(executor_id, job_id):
@@ -151,6 +269,77 @@ def create_status_key(executor_id, job_id, call_id):
     return '/'.join([JOBS_PREFIX, job_key, call_id, status_key_suffix])
 
 
+def create_logs_key(executor_id, job_id, call_id):
+    """
+    Create execution logs key
+    :param executor_id: Executor's ID
+    :param job_id: Job's ID
+    :param call_id: call's ID
+    :return: logs key
+    """
+    job_key = create_job_key(executor_id, job_id)
+    return '/'.join([JOBS_PREFIX, job_key, call_id, logs_key_suffix])
+
+
+def create_shuffle_key(executor_id, job_id, call_id):
+    """
+    Create shuffle output key
+    :param executor_id: Executor's ID
+    :param job_id: Job's ID
+    :param call_id: call's ID
+    :return: shuffle output key
+    """
+    job_key = create_job_key(executor_id, job_id)
+    return '/'.join([JOBS_PREFIX, job_key, call_id, shuffle_key_suffix])
+
+
+def create_manifest_key(executor_id, job_id):
+    """
+    Create job manifest key
+    :param executor_id: Executor's ID
+    :param job_id: Job's ID
+    :return: manifest key
+    """
+    job_key = create_job_key(executor_id, job_id)
+    return '/'.join([JOBS_PREFIX, job_key, manifest_key_suffix])
+
+
+def create_claim_key(executor_id, job_id, index):
+    """
+    Create the key that claims a range of calls of a job
+    :param executor_id: Executor's ID
+    :param job_id: Job's ID
+    :param index: index of the range of calls
+    :return: claim key
+    """
+    job_key = create_job_key(executor_id, job_id)
+    return '/'.join([JOBS_PREFIX, job_key, 'claims', f'{index:05d}.{claim_key_suffix}'])
+
+
+def create_done_key(executor_id, job_id, call_id):
+    """
+    Create the key that claims the completion of a call
+    :param executor_id: Executor's ID
+    :param job_id: Job's ID
+    :param call_id: call's ID
+    :return: done key
+    """
+    job_key = create_job_key(executor_id, job_id)
+    return '/'.join([JOBS_PREFIX, job_key, call_id, done_key_suffix])
+
+
+def create_cache_key(function_hash, call_data):
+    """
+    Create the key of the cached result of a call
+    :param function_hash: hash of the function and its modules
+    :param call_data: serialized input data of the call
+    :return: cache key
+    """
+    cache_hash = hashlib.sha256(function_hash.encode())
+    cache_hash.update(call_data)
+    return '/'.join([RESULTS_CACHE_PREFIX, f'{cache_hash.hexdigest()}.{output_key_suffix}'])
+
+
 def create_init_key(executor_id, job_id, call_id, act_id):
     """
     Create init key
@@ -164,6 +353,18 @@ def create_init_key(executor_id, job_id, call_id, act_id):
     return '/'.join([JOBS_PREFIX, job_key, call_id, f'{act_id}{init_key_suffix}'])
 
 
+def parse_byte_range(byte_range, size):
+    """
+    Returns the first and last bytes of a 'bytes=first-last' range of an
+    object of the given size, including open-ended ('first-') and suffix
+    ('-length') ranges
+    """
+    first_byte, last_byte = byte_range.replace('bytes=', '').split('-')
+    if not first_byte:
+        return max(size - int(last_byte), 0), size - 1
+    return int(first_byte), min(int(last_byte), size - 1) if last_byte else size - 1
+
+
 def get_storage_path(storage_config):
     backend = storage_config['backend']
     bucket = storage_config[backend]['storage_bucket']
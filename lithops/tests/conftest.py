@@ -38,7 +38,7 @@ def setup_global(request):
     config_ow = {'lithops': {}, 'backend': {}}
     if storage:
         config_ow['lithops']['storage'] = storage
-        if storage == 'localhost':
+        if storage in ('localhost', 'memory'):
             config_ow['lithops']['monitoring_interval'] = 0.1
     if backend:
         config_ow['lithops']['backend'] = backend
@@ -0,0 +1,92 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import copy
+import pytest
+import logging
+import lithops
+from types import SimpleNamespace
+from lithops.autotune import PerformanceHistory, get_function_key, \
+    estimate_makespan, tune_job, summarize_run, HISTORY_MAX_RUNS
+from lithops.tests.functions import simple_map_function
+
+logger = logging.getLogger(__name__)
+
+
+def make_run(exec_time=1.0, startup_time=2.0, worker_processes=1, cpu_usage=10, cores=1, peak_memory=None):
+    return {
+        'tstamp': 0, 'calls': 100, 'chunksize': 1, 'worker_processes': worker_processes,
+        'runtime_memory': 256, 'exec_time': exec_time, 'peak_memory': peak_memory,
+        'startup_time': startup_time, 'cpu_usage': cpu_usage, 'cores': cores
+    }
+
+
+class TestAutotune:
+
+    def test_estimate_makespan(self):
+        assert estimate_makespan(100, 100, 1, 1, 1.0, 2.0) == 3.0
+        assert estimate_makespan(100, 10, 1, 1, 1.0, 2.0) == 30.0
+        assert estimate_makespan(100, 10, 10, 1, 1.0, 2.0) == 12.0
+        assert estimate_makespan(100, 10, 10, 2, 1.0, 2.0) == 7.0
+
+    def test_tune_short_calls(self):
+        # Startup dominates: pack the calls in one wave of activations
+        runs = [make_run(exec_time=0.1, startup_time=5.0)]
+        tuned = tune_job(runs, 1000, 100, 1, 1, 256)
+        assert tuned['makespan'] < tuned['current_makespan']
+        assert tuned['chunksize'] * 100 >= 1000
+
+    def test_tune_cpu_bound(self):
+        # CPU-bound calls on a single core do not gain from more processes
+        runs = [make_run(exec_time=1.0, startup_time=1.0, cpu_usage=100, cores=1)]
+        tuned = tune_job(runs, 1000, 100, 1, 1, 256)
+        assert tuned['worker_processes'] == 1
+
+    def test_tune_io_bound(self):
+        runs = [make_run(exec_time=1.0, startup_time=1.0, cpu_usage=5, cores=1,
+                         peak_memory=200 * 1024 ** 2)]
+        tuned = tune_job(runs, 1000, 100, 1, 1, 256)
+        assert tuned['worker_processes'] > 1
+        assert tuned['runtime_memory'] >= tuned['worker_processes'] * 200
+
+    def test_tune_memory_decrease(self):
+        runs = [make_run(exec_time=1.0, startup_time=1.0, cpu_usage=100, cores=1,
+                         peak_memory=50 * 1024 ** 2)]
+        tuned = tune_job(runs, 1000, 100, 1, 1, 2048)
+        assert tuned['runtime_memory'] < 2048
+
+    def test_summarize_incomplete_stats(self):
+        # Calls that failed before starting the worker lack the timestamps
+        futures = [SimpleNamespace(stats={'worker_func_exec_time': 1.0})]
+        assert summarize_run(futures, 1, 1, 256) is None
+
+    def test_performance_history(self, tmp_path):
+        history = PerformanceHistory('localhost')
+        history.history_dir = str(tmp_path)
+        function_key = get_function_key(simple_map_function)
+        assert history.load(function_key) == []
+        for _ in range(HISTORY_MAX_RUNS + 5):
+            history.add(function_key, make_run())
+        assert len(history.load(function_key)) == HISTORY_MAX_RUNS
+
+    def test_record_runs(self, tmp_path):
+        config = copy.deepcopy(pytest.lithops_config)
+        config['lithops']['autotune'] = 'recommend'
+        fexec = lithops.FunctionExecutor(config=config)
+        fexec.performance_history.history_dir = str(tmp_path)
+        fexec.map(simple_map_function, [(1, 2), (3, 4), (5, 6)])
+        assert fexec.get_result() == [3, 7, 11]
+        runs = fexec.performance_history.load(get_function_key(simple_map_function))
+        assert len(runs) == 1
+        assert runs[0]['calls'] == 3
@@ -14,9 +14,12 @@
 # limitations under the License.
 #
 
+import os
+import copy
 import pytest
 import lithops
 import logging
+from lithops.constants import LOGS_DIR
 from lithops.tests.functions import (
     SideEffect,
     passthrough_function,
@@ -61,3 +64,26 @@ class TestCallAsync:
         fexec.call_async(passthrough_function, se)
         result = fexec.get_result()
         assert result == 5
+
+    def test_execution_logs(self):
+        def print_function(x):
+            print(f'Processing {x}')
+            return x
+
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        future = fexec.call_async(print_function, 'item-6')
+        assert fexec.get_result() == 'item-6'
+        assert 'logs' in future._call_status
+        assert 'Processing item-6' in future.logs
+
+        config = copy.deepcopy(pytest.lithops_config)
+        config['lithops']['execution_logs'] = 'storage'
+        fexec = lithops.FunctionExecutor(config=config)
+        future = fexec.call_async(print_function, 'item-7')
+        result = fexec.get_result()
+        assert result == 'item-7'
+        assert 'logs' not in future._call_status
+        # The logs are copied before the job data is cleaned
+        with open(os.path.join(LOGS_DIR, future.job_key + '.log')) as log_file:
+            assert 'Processing item-7' in log_file.read()
+        assert 'Processing item-7' in future.logs
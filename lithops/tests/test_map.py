@@ -14,8 +14,14 @@
 # limitations under the License.
 #
 
+import os
+import copy
+import time
+import uuid
 import pytest
+import tempfile
 import lithops
+from lithops.storage.utils import create_status_key, create_data_key
 from lithops.tests.functions import (
     simple_map_function,
     hello_world,
@@ -23,6 +29,7 @@ from lithops.tests.functions import (
     lithops_return_futures_map,
     lithops_return_futures_call_async,
     lithops_return_futures_map_multiple,
+    my_map_function_obj,
     concat
 )
 
@@ -118,3 +125,93 @@ class TestMap:
         fexec.wait()
         result = fexec.get_result()
         assert result == [1, 2, 3, 1, 2, 3]
+
+    def test_resource_sampling(self):
+        def sleep_function(x):
+            time.sleep(0.5)
+            return x
+
+        config = copy.deepcopy(pytest.lithops_config)
+        config['lithops']['stats_sampling_interval'] = 0.1
+        fexec = lithops.FunctionExecutor(config=config)
+        futures = fexec.map(sleep_function, range(2))
+        result = fexec.get_result()
+        assert result == [0, 1]
+        for fut in futures:
+            samples = fut.stats['worker_func_resource_samples']
+            assert len(samples['tstamp']) > 1
+            assert len(samples['rss']) == len(samples['tstamp'])
+            assert fut.stats['worker_func_peak_rss'] == max(samples['rss'])
+            assert 'worker_peak_memory_end' in fut.stats
+
+    def test_pipelined_chaining(self):
+        def first_stage(x):
+            time.sleep(x)
+            return x
+
+        def second_stage(x):
+            return x + 1
+
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        futures = fexec.map(first_stage, [2, 0, 1]).map(second_stage).map(second_stage)
+        result = futures.get_result()
+        assert result == [4, 2, 3]
+
+    def test_result_cache(self):
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        # A unique input avoids the results cached by previous test runs
+        iterdata = [(uuid.uuid4().hex, 'a'), (uuid.uuid4().hex, 'b')]
+        futures = fexec.map(simple_map_function, iterdata, cache=True)
+        result = fexec.get_result(fs=futures)
+        assert not any(f.stats.get('host_cache_hit') for f in futures)
+
+        futures = fexec.map(simple_map_function, iterdata + [(uuid.uuid4().hex, 'c')], cache=True)
+        assert fexec.get_result(fs=futures)[:2] == result
+        assert [f.stats.get('host_cache_hit', False) for f in futures] == [True, True, False]
+
+        # Nothing is uploaded nor invoked when all the calls are cached
+        futures = fexec.map(simple_map_function, iterdata, cache=True)
+        assert fexec.get_result(fs=futures) == result
+        assert all(f.stats.get('host_cache_hit') for f in futures)
+        data_key = create_data_key(fexec.executor_id, futures[0].job_id)
+        assert fexec.internal_storage.storage.list_keys(fexec.internal_storage.bucket, data_key) == []
+
+        with pytest.raises(ValueError):
+            fexec.map(my_map_function_obj, f'{fexec.internal_storage.backend}://bucket/key', cache=True)
+
+    def test_speculation(self):
+        config = copy.deepcopy(pytest.lithops_config)
+        config['lithops']['speculation'] = True
+        config['lithops']['monitoring_interval'] = 0.5
+
+        def straggler_function(x, marker):
+            # Only the first activation of the last call is slow
+            if x == 3 and not os.path.exists(marker):
+                open(marker, 'w').close()
+                time.sleep(5)
+            return x
+
+        marker = os.path.join(tempfile.gettempdir(), uuid.uuid4().hex)
+        fexec = lithops.FunctionExecutor(config=config)
+        futures = fexec.map(straggler_function, [(x, marker) for x in range(4)])
+        assert fexec.get_result(fs=futures) == [0, 1, 2, 3]
+        assert 'host_backup_launch_tstamp' in futures[3].stats
+        assert not any('host_backup_launch_tstamp' in f.stats for f in futures[:3])
+        os.remove(marker)
+
+    def test_reattach(self):
+        config = copy.deepcopy(pytest.lithops_config)
+        config['lithops']['data_cleaner'] = False
+        fexec = lithops.FunctionExecutor(config=config)
+        iterdata = [(1, 1), (2, 2), (3, 3)]
+        futures = fexec.map(simple_map_function, iterdata)
+        lithops.wait(futures)
+
+        # Simulate a call that did not finish
+        status_key = create_status_key(fexec.executor_id, futures[1].job_id, futures[1].call_id)
+        fexec.storage.delete_object(fexec.internal_storage.bucket, status_key)
+
+        new_fexec = lithops.FunctionExecutor(config=pytest.lithops_config, executor_id=fexec.executor_id)
+        futures = new_fexec.reattach(resubmit=True)
+        result = new_fexec.get_result(futures)
+        assert result == [2, 4, 6]
@@ -69,6 +69,24 @@ class TestMapReduce:
         result = fexec.get_result()
         assert result == 20
 
+    def test_streaming_map_reduce(self):
+        logger.info('Testing map_reduce() with a streaming reducer')
+        iterdata = [(1, 1), (2, 2), (3, 3), (4, 4)]
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        fexec.map_reduce(simple_map_function, iterdata, simple_reduce_function,
+                         reduce_streaming=True)
+        result = fexec.get_result()
+        assert result == 20
+
+    def test_tree_map_reduce(self):
+        logger.info('Testing map_reduce() with a reduction tree')
+        iterdata = [(x, x) for x in range(10)]
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        fexec.map_reduce(simple_map_function, iterdata, simple_reduce_function,
+                         reduce_fanin=3)
+        result = fexec.get_result()
+        assert result == 90
+
     def test_obj_bucket(self):
         logger.info('Testing map_reduce() over a bucket')
         data_prefix = self.storage_backend + '://' + self.bucket + '/' + DATASET_PREFIX + '/'
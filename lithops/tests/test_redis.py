@@ -0,0 +1,124 @@
+#
+# Copyright Cloudlab URV 2021
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import redis
+import pytest
+import logging
+from lithops.storage.backends.redis.redis import RedisBackend
+from lithops.storage.utils import StorageNoSuchKeyError
+from lithops.tests.conftest import TESTS_PREFIX
+
+logger = logging.getLogger(__name__)
+
+REDIS_BUCKET = 'storage'
+REDIS_PREFIX = TESTS_PREFIX + '/redis'
+
+
+class TestRedis:
+
+    @classmethod
+    def setup_class(cls):
+        # Uses the 'redis' section of the test config, or a local redis-server
+        config = dict(pytest.lithops_config.get('redis', {}))
+        config.setdefault('host', 'localhost')
+        config.update({'user_agent': 'lithops-tests', 'storage_bucket': REDIS_BUCKET, 'chunk_size': 1 / 1024})
+        cls.backend = RedisBackend(config)
+        cls.client = cls.backend.get_client()
+        try:
+            cls.client.ping()
+        except redis.exceptions.ConnectionError:
+            pytest.skip('No redis server available', allow_module_level=True)
+
+    @classmethod
+    def teardown_class(cls):
+        keys = cls.backend.list_keys(REDIS_BUCKET, REDIS_PREFIX)
+        cls.backend.delete_objects(REDIS_BUCKET, keys)
+
+    def chunk_keys(self, key):
+        return list(self.client.scan_iter(f'lithops.chunk:*:{REDIS_BUCKET}/{key}'))
+
+    def put_legacy(self, key, data):
+        # Layout of previous versions: a plain string per object, and a set
+        # with the entries of each directory
+        components = self.backend._format_key(REDIS_BUCKET, key).split('/')
+        for i in range(1, len(components) - 1):
+            self.client.sadd('/'.join(components[:i]) + '/', components[i] + '/')
+        self.client.sadd('/'.join(components[:-1]) + '/', components[-1])
+        self.client.set('/'.join(components), data)
+
+    def test_chunked_object(self):
+        logger.info('Testing chunked objects')
+        key = REDIS_PREFIX + '/chunked'
+        data = bytes(range(256)) * 14
+        self.backend.put_object(REDIS_BUCKET, key, data)
+        assert len(self.chunk_keys(key)) == 4
+
+        assert self.backend.get_object(REDIS_BUCKET, key) == data
+        assert self.backend.head_object(REDIS_BUCKET, key)['content-length'] == str(len(data))
+        for byte_range, expected in (('bytes=1000-2100', data[1000:2101]), ('bytes=3000-', data[3000:]),
+                                     ('bytes=-10', data[-10:]), ('bytes=1024-1024', data[1024:1025])):
+            assert self.backend.get_object(REDIS_BUCKET, key, extra_get_args={'Range': byte_range}) == expected
+
+    def test_overwrite_and_delete(self):
+        logger.info('Testing the chunks of overwritten and deleted objects')
+        key = REDIS_PREFIX + '/overwritten'
+        self.backend.put_object(REDIS_BUCKET, key, b'x' * 3000)
+        assert len(self.chunk_keys(key)) == 3
+        self.backend.put_object(REDIS_BUCKET, key, b'y' * 2000)
+        assert len(self.chunk_keys(key)) == 2
+        self.backend.put_object(REDIS_BUCKET, key, b'small')
+        assert self.chunk_keys(key) == []
+        assert self.backend.get_object(REDIS_BUCKET, key) == b'small'
+
+        self.backend.put_object(REDIS_BUCKET, key, b'z' * 3000)
+        self.backend.delete_object(REDIS_BUCKET, key)
+        assert self.chunk_keys(key) == []
+        assert key not in self.backend.list_keys(REDIS_BUCKET, REDIS_PREFIX)
+        with pytest.raises(StorageNoSuchKeyError):
+            self.backend.get_object(REDIS_BUCKET, key)
+
+    def test_put_object_if_absent(self):
+        logger.info('Testing put_object_if_absent()')
+        key = REDIS_PREFIX + '/absent'
+        assert self.backend.put_object_if_absent(REDIS_BUCKET, key, b'a' * 2000)
+        assert not self.backend.put_object_if_absent(REDIS_BUCKET, key, b'b' * 3000)
+        assert len(self.chunk_keys(key)) == 2
+        assert self.backend.get_object(REDIS_BUCKET, key) == b'a' * 2000
+
+    def test_legacy_objects(self):
+        logger.info('Testing objects stored with the legacy layout')
+        legacy_key = REDIS_PREFIX + '/legacy/dir/object'
+        self.put_legacy(legacy_key, b'legacy object')
+        self.backend.put_object(REDIS_BUCKET, REDIS_PREFIX + '/legacy/new', b'new object')
+
+        assert self.backend.get_object(REDIS_BUCKET, legacy_key) == b'legacy object'
+        assert self.backend.get_object(REDIS_BUCKET, legacy_key, extra_get_args={'Range': 'bytes=-6'}) == b'object'
+        assert self.backend.head_object(REDIS_BUCKET, legacy_key)['content-length'] == '13'
+        assert self.backend.get_objects_batch(REDIS_BUCKET, [legacy_key]) == [b'legacy object']
+        assert self.backend.list_keys(REDIS_BUCKET, REDIS_PREFIX + '/legacy') == \
+            [legacy_key, REDIS_PREFIX + '/legacy/new']
+        assert self.backend.list_objects(REDIS_BUCKET, REDIS_PREFIX + '/legacy/d') == [{'Key': legacy_key, 'Size': 13}]
+
+        # Overwriting a legacy object moves it to the new layout
+        self.backend.put_object(REDIS_BUCKET, legacy_key, b'x' * 2000)
+        assert self.backend.list_keys(REDIS_BUCKET, REDIS_PREFIX + '/legacy/dir') == [legacy_key]
+        self.backend.delete_object(REDIS_BUCKET, legacy_key)
+
+        self.put_legacy(legacy_key, b'legacy object')
+        self.backend.delete_object(REDIS_BUCKET, legacy_key)
+        assert self.backend.list_keys(REDIS_BUCKET, REDIS_PREFIX + '/legacy') == [REDIS_PREFIX + '/legacy/new']
+        with pytest.raises(StorageNoSuchKeyError):
+            self.backend.head_object(REDIS_BUCKET, legacy_key)
@@ -154,3 +154,23 @@ def check_invocation_counts(
                     f"Invocation count for {i}, expected: {expected_count}, actual: {actual_count}"
                 )
     assert actual_invocation_counts == expected_invocation_counts
+
+
+def test_batched_retries(tmp_path, monkeypatch):
+    # no jitter, so that all the failures wait for the first backoff
+    monkeypatch.setattr('lithops.retries.random.uniform', lambda a, b: b)
+    timing_map = {0: [-1], 1: [-1], 2: [-1]}
+
+    def partial_map_function(x):
+        return deterministic_failure(tmp_path, timing_map, x)
+
+    fexec = FunctionExecutor(config=pytest.lithops_config)
+    with RetryingFunctionExecutor(fexec, backoff_base=10) as executor:
+        futures = executor.map(partial_map_function, range(3), retries=2)
+        done, pending = executor.wait(futures, throw_except=False)
+        assert len(pending) == 0
+        assert set(f.result() for f in done) == set(range(3))
+        # the inputs that fail within the backoff are retried in one job
+        assert len({f.job_key for f in fexec.futures}) == 2
+
+    check_invocation_counts(tmp_path, timing_map, 3, retries=2)
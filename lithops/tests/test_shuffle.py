@@ -0,0 +1,65 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import pytest
+import logging
+import lithops
+
+logger = logging.getLogger(__name__)
+
+
+def word_records(words):
+    return [(word, 1) for word in words.split()]
+
+
+class TestShuffle:
+
+    def test_shuffle(self):
+        iterdata = ['a b c a', 'b c d', 'a d d e']
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        fexec.shuffle(word_records, iterdata, num_partitions=2)
+        result = fexec.get_result()
+        assert len(result) == 2
+        records = sorted(record for partition in result for record in partition)
+        assert records == sorted(record for words in iterdata for record in word_records(words))
+
+    def test_shuffle_combine_sort(self):
+        iterdata = ['a b c a', 'b c d', 'a d d e']
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        fexec.shuffle(word_records, iterdata, num_partitions=3,
+                      combiner=lambda x, y: x + y, sort=True)
+        result = fexec.get_result()
+        for partition in result:
+            assert partition == sorted(partition)
+        counts = dict(record for partition in result for record in partition)
+        assert counts == {'a': 3, 'b': 2, 'c': 2, 'd': 3, 'e': 1}
+
+    def test_shuffle_partitioner_reduce(self):
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        fexec.shuffle(lambda x: [(x, x)], range(10), num_partitions=2,
+                      partitioner=lambda key, n: key % n,
+                      reduce_function=lambda records: sum(v for k, v in records))
+        result = fexec.get_result()
+        assert result == [20, 25]
+
+    def test_shuffle_spill(self):
+        iterdata = [' '.join(str(i % 50) for i in range(j, j + 2000)) for j in range(4)]
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        fexec.shuffle(word_records, iterdata, num_partitions=2, sort=True,
+                      max_buffer_size=0.01)
+        result = fexec.get_result()
+        for partition in result:
+            assert partition == sorted(partition)
+        records = sorted(record for partition in result for record in partition)
+        assert records == sorted(record for words in iterdata for record in word_records(words))
@@ -14,14 +14,21 @@
 # limitations under the License.
 #
 
+import io
+import copy
 import pytest
 import logging
 import lithops
 from io import BytesIO
 from lithops.config import extract_storage_config
-from lithops.storage.utils import CloudObject, StorageNoSuchKeyError
+from lithops.storage.utils import CloudObject, StorageNoSuchKeyError, StorageBulkOperationError, \
+    clean_prefixes, clean_bucket, delete_keys
+from lithops.storage.cloud_proxy import CloudStorage, CloudFileProxy, CloudFileReader, CloudFileWriter
+from lithops.job.partitioner import CHUNK_THRESHOLD
+from lithops.utils import WrappedStreamingBodyPartition
+from lithops.worker.utils import ReadAheadStream
 from lithops.tests.conftest import TESTS_PREFIX
-from lithops.tests.functions import my_map_function_storage, \
+from lithops.tests.functions import my_map_function_storage, my_map_function_obj, \
     my_cloudobject_put, my_cloudobject_get, my_reduce_function
 
 
@@ -87,6 +94,10 @@ class TestStorage:
         result = self.storage.get_object(self.bucket, key, extra_get_args={'Range': 'bytes=1-4'})
 
         assert result == b'1234'
+        assert self.storage.get_object(self.bucket, key, extra_get_args={'Range': 'bytes=7-'}) == b'789'
+        assert self.storage.get_object(self.bucket, key, extra_get_args={'Range': 'bytes=-3'}) == b'789'
+        assert self.storage.get_object(self.bucket, key, extra_get_args={'Range': 'bytes=8-100'}) == b'89'
+        assert self.storage.get_object(self.bucket, key, extra_get_args={'Range': 'bytes=-100'}) == b'0123456789'
 
     def test_list_keys(self):
         logger.info('Testing Storage.list_keys')
@@ -106,6 +117,7 @@ class TestStorage:
         foo_keys = self.storage.list_keys(self.bucket, STORAGE_PREFIX + '/foo')
         foo_slash_keys = self.storage.list_keys(self.bucket, STORAGE_PREFIX + '/foo/')
         bar_keys = self.storage.list_keys(self.bucket, STORAGE_PREFIX + '/bar')
+        foo_ba_keys = self.storage.list_keys(self.bucket, STORAGE_PREFIX + '/foo/ba')
         non_existent_keys = self.storage.list_keys(self.bucket, STORAGE_PREFIX + '/doesnt_exist')
 
         assert set(all_bucket_keys).issuperset(test_keys)
@@ -125,9 +137,23 @@ class TestStorage:
             STORAGE_PREFIX + '/bar',
             STORAGE_PREFIX + '/bar_baz',
         ])
+        assert sorted(foo_ba_keys) == sorted([
+            STORAGE_PREFIX + '/foo/baz',
+            STORAGE_PREFIX + '/foo/bar/baz',
+        ])
 
         assert non_existent_keys == []
 
+    def test_list_keys_hidden(self):
+        logger.info('Testing Storage.list_keys with hidden files and directories')
+        if self.storage_backend != 'localhost':
+            pytest.skip('Only the localhost backend hides the entries starting with a dot')
+        for key in ['/hidden/visible', '/hidden/.file', '/hidden/.dir/file', '/hidden/dir/.file']:
+            self.storage.put_object(self.bucket, STORAGE_PREFIX + key, b'x')
+
+        assert self.storage.list_keys(self.bucket, STORAGE_PREFIX + '/hidden/') == [STORAGE_PREFIX + '/hidden/visible']
+        assert self.storage.get_object(self.bucket, STORAGE_PREFIX + '/hidden/.file') == b'x'
+
     def test_head_object(self):
         logger.info('Testing Storage.head_object')
         data = b'123456789'
@@ -139,6 +165,209 @@ class TestStorage:
         with pytest.raises(StorageNoSuchKeyError):
             self.storage.head_object(self.bucket, STORAGE_PREFIX + '/doesnt_exist')
 
+    def test_put_object_if_absent(self):
+        logger.info('Testing Storage.put_object_if_absent')
+        if not self.storage.supports_conditional_writes():
+            pytest.skip(f'{self.storage_backend} does not support conditional writes')
+        key = STORAGE_PREFIX + '/claim'
+
+        assert self.storage.put_object_if_absent(self.bucket, key, b'first')
+        assert not self.storage.put_object_if_absent(self.bucket, key, b'second')
+        assert self.storage.get_object(self.bucket, key) == b'first'
+
+    def test_bulk_operations(self):
+        logger.info('Testing Storage.put_objects/get_objects/head_objects')
+        objects = {f'{STORAGE_PREFIX}/bulk/{i}': f'object {i}'.encode() for i in range(20)}
+
+        put_keys = [key for key, _ in self.storage.put_objects(self.bucket, objects.items(), max_concurrency=4)]
+        assert sorted(put_keys) == sorted(objects)
+
+        assert dict(self.storage.get_objects(self.bucket, objects)) == objects
+        sizes = dict(self.storage.head_objects(self.bucket, objects))
+        assert all(int(sizes[key]['content-length']) == len(objects[key]) for key in objects)
+
+        key = STORAGE_PREFIX + '/bulk/0'
+        ranges = [(key, {'Range': 'bytes=0-5'}), (key, {'Range': 'bytes=7-7'})]
+        assert sorted(data for _, data in self.storage.get_objects(self.bucket, ranges)) == [b'0', b'object']
+
+        missing = [STORAGE_PREFIX + '/bulk/missing', key]
+        with pytest.raises(StorageBulkOperationError):
+            list(self.storage.get_objects(self.bucket, missing))
+        results = dict(self.storage.get_objects(self.bucket, missing, return_exceptions=True))
+        assert isinstance(results[missing[0]], StorageNoSuchKeyError)
+        assert results[key] == objects[key]
+
+    def test_clean_prefixes(self):
+        logger.info('Testing clean_prefixes/delete_keys')
+        objects = [(f'{STORAGE_PREFIX}/clean/{job}/{i}', b'x') for job in range(3) for i in range(10)]
+        self.storage.put_objects(self.bucket, objects)
+        prefixes = [f'{STORAGE_PREFIX}/clean/{job}/' for job in range(2)] + [f'{STORAGE_PREFIX}/clean/0/']
+
+        assert clean_prefixes(self.storage, self.bucket, prefixes, max_concurrency=2) == 20
+        remaining = self.storage.list_keys(self.bucket, STORAGE_PREFIX + '/clean/')
+        assert sorted(remaining) == sorted(key for key, _ in objects[20:])
+
+        delete_keys(self.storage, self.bucket, remaining, delete_rate=5)
+        assert self.storage.list_keys(self.bucket, STORAGE_PREFIX + '/clean/') == []
+
+        self.storage.put_objects(self.bucket, objects[:10])
+        clean_bucket(self.storage, self.bucket, STORAGE_PREFIX + '/clean/', sleep=0)
+        assert self.storage.list_keys(self.bucket, STORAGE_PREFIX + '/clean/') == []
+
+    def test_cloud_proxy(self):
+        logger.info('Testing cloud_proxy file objects')
+        storage = CloudStorage(self.storage.config)
+        proxy = CloudFileProxy(storage)
+        data = bytes(range(256)) * 1000
+        key = STORAGE_PREFIX + '/proxy/dir/file.bin'
+
+        with io.BufferedWriter(CloudFileWriter(storage, key, part_size=64 * 1024)) as f:
+            for i in range(0, len(data), 10000):
+                f.write(data[i:i + 10000])
+        assert self.storage.get_object(self.bucket, key) == data
+
+        with io.BufferedReader(CloudFileReader(storage, key, part_size=10000)) as f:
+            assert f.read(100) == data[:100]
+            f.seek(150000)
+            assert f.read(30000) == data[150000:180000]
+            f.seek(-10, io.SEEK_END)
+            assert f.read() == data[-10:]
+
+        with proxy.open(STORAGE_PREFIX + '/proxy/dir/sub/file.txt', 'w') as f:
+            f.write('line 1\nline 2')
+        with proxy.open(STORAGE_PREFIX + '/proxy/dir/sub/file.txt', 'r') as f:
+            assert f.readlines() == ['line 1\n', 'line 2']
+
+        walk = list(proxy.walk(STORAGE_PREFIX + '/proxy'))
+        assert [(root, dirs, files) for root, dirs, files in walk] == [
+            (STORAGE_PREFIX + '/proxy', ['dir'], []),
+            (STORAGE_PREFIX + '/proxy/dir', ['sub'], ['file.bin']),
+            (STORAGE_PREFIX + '/proxy/dir/sub', [], ['file.txt'])
+        ]
+
+    def test_read_ahead_stream(self):
+        logger.info('Testing the read-ahead stream of object chunks')
+        data = b''.join(f'line {i}\n'.encode() for i in range(100000))
+        key = STORAGE_PREFIX + '/read-ahead.txt'
+        self.storage.put_object(self.bucket, key, data)
+
+        with ReadAheadStream(self.storage, self.bucket, key, 1000, 299999, 4, 64 * 1024) as stream:
+            assert stream.read(10) == data[1000:1010]
+            assert stream.readline() == data[1010:data.index(b'\n', 1010) + 1]
+            assert stream.read() == data[data.index(b'\n', 1010) + 1:300000]
+
+        # Chunks split on the newlines, as in the partitioner. The range of the
+        # next to last chunk ends past the end of the object
+        chunk_size = 200000
+        lines = []
+        for start in range(0, len(data), chunk_size):
+            first_byte = start - 1 if start > 0 else 0
+            last_byte = start + chunk_size + CHUNK_THRESHOLD
+            if start + chunk_size >= len(data):
+                last_byte = len(data) - 1
+            stream = ReadAheadStream(self.storage, self.bucket, key, first_byte, last_byte, 4, 64 * 1024)
+            body = WrappedStreamingBodyPartition(stream, min(chunk_size, len(data) - start),
+                                                 (first_byte, last_byte))
+            lines.extend(body.read().splitlines(keepends=True))
+        assert b''.join(lines) == data
+
+        # The last part starts past the end of the object
+        with ReadAheadStream(self.storage, self.bucket, key, 0, len(data) + 1000, 2, len(data) // 2) as stream:
+            assert stream.read() == data
+
+        # Object chunks of the functions read with 1MiB parts
+        key = STORAGE_PREFIX + '/read-ahead/lines.txt'
+        self.storage.put_object(self.bucket, key, data * 4)
+        config = copy.deepcopy(pytest.lithops_config)
+        config['lithops']['data_read_ahead_buffer'] = 1
+        fexec = lithops.FunctionExecutor(config=config)
+        fexec.map_reduce(my_map_function_obj, f'{self.storage_backend}://{self.bucket}/{key}',
+                         my_reduce_function, obj_chunk_size=2 * 1024 ** 2, obj_newline='\n')
+        assert fexec.get_result() == 800000
+
+    def test_multipart_transfer(self, tmp_path):
+        logger.info('Testing Storage.multipart_upload/multipart_download')
+        data = bytes(range(256)) * 1000 + b'tail'
+        key = STORAGE_PREFIX + '/multipart'
+
+        self.storage.multipart_upload(self.bucket, key, data, part_size=10000, max_concurrency=4)
+        assert self.storage.get_object(self.bucket, key) == data
+        assert self.storage.multipart_download(self.bucket, key, part_size=10000, max_concurrency=4) == data
+
+        file_name = str(tmp_path / 'multipart')
+        self.storage.multipart_download(self.bucket, key, file_name, part_size=10000)
+        with open(file_name, 'rb') as f:
+            assert f.read() == data
+
+        self.storage.multipart_upload(self.bucket, key + '.copy', file_name=file_name, part_size=10000)
+        assert self.storage.get_object(self.bucket, key + '.copy') == data
+
+    def test_storage_cache(self, tmp_path):
+        logger.info('Testing the Storage read cache')
+        storage = lithops.Storage(storage_config=self.storage.config)
+        storage.enable_cache(max_memory=1, max_disk=1)
+        storage.cache.cache_dir = str(tmp_path)
+        key = STORAGE_PREFIX + '/cached'
+        storage.put_object(self.bucket, key, b'cached data')
+
+        assert storage.get_object(self.bucket, key) == b'cached data'
+        assert storage.get_object(self.bucket, key) == b'cached data'
+        extra_get_args = {'Range': 'bytes=0-5'}
+        assert storage.get_object(self.bucket, key, extra_get_args=extra_get_args) == b'cached'
+        extra_get_args = {'Range': 'bytes=-4'}
+        assert storage.get_object(self.bucket, key, extra_get_args=extra_get_args) == b'data'
+        assert storage.cache.stats['misses'] == 1
+        assert storage.cache.stats['memory_hits'] == 3
+
+        # Streamed reads bypass the cache
+        assert storage.get_object(self.bucket, key, stream=True).read() == b'cached data'
+        assert storage.cache.stats['memory_hits'] == 3
+
+        # So do the parts of the read-ahead streams, read once
+        with ReadAheadStream(storage, self.bucket, key, 0, 10, 2, 4) as stream:
+            assert stream.read() == b'cached data'
+        assert storage.cache.stats['memory_hits'] == 3
+        assert storage.cache.stats['misses'] == 1
+
+        # Overwritten objects are read again
+        storage.put_object(self.bucket, key, b'new data')
+        assert storage.get_object(self.bucket, key) == b'new data'
+        assert storage.cache.stats['misses'] == 2
+
+        # Other instances read the disk tier
+        other_storage = lithops.Storage(storage_config=self.storage.config)
+        other_storage.enable_cache()
+        other_storage.cache.cache_dir = str(tmp_path)
+        assert other_storage.get_object(self.bucket, key) == b'new data'
+        assert other_storage.cache.stats['disk_hits'] == 1
+
+    def test_storage_metrics(self):
+        logger.info('Testing the storage operation metrics')
+        storage = lithops.Storage(storage_config=self.storage.config)
+        key = STORAGE_PREFIX + '/metrics'
+        storage.put_object(self.bucket, key, b'metrics data')
+        assert storage.get_object(self.bucket, key) == b'metrics data'
+        assert storage.get_object(self.bucket, key, stream=True).read() == b'metrics data'
+        with pytest.raises(StorageNoSuchKeyError):
+            storage.get_object(self.bucket, key + '-missing')
+
+        ops = storage.metrics.snapshot()
+        assert ops['put_object']['requests'] == 1
+        assert ops['put_object']['write_bytes'] == 12
+        assert ops['get_object']['requests'] == 3
+        assert ops['get_object']['errors'] == 1
+        assert ops['get_object']['read_bytes'] == 24
+        assert sum(ops['get_object']['latency_histogram']) == 3
+
+        # The calls report their storage requests in the stats
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        fexec.map(my_map_function_storage, [(key, self.bucket)])
+        fexec.get_result()
+        stats = fexec.storage_stats()
+        assert stats['workers']['ops']['get_object']['read_bytes'] == 12
+        assert stats['jobs'][fexec.futures[0].job_key]['requests'] >= 1
+        assert stats['host']['requests'] > 0
+
     def test_list_objects(self):
         logger.info('Testing Storage.list_objects')
         test_keys = sorted([
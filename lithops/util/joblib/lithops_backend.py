@@ -15,9 +15,7 @@
 #
 
 import logging
-import os
 import pickle
-import diskcache
 from numpy import ndarray
 from multiprocessing.pool import ThreadPool
 from concurrent.futures import ThreadPoolExecutor
@@ -29,11 +27,12 @@ from joblib.pool import PicklingPool
 from joblib.parallel import register_parallel_backend
 
 from lithops.multiprocessing import Pool, cpu_count
-from lithops.constants import LITHOPS_TEMP_DIR
 from lithops.storage import Storage
 
 logger = logging.getLogger(__name__)
 
+CACHED_STORAGE = None
+
 
 def register_lithops():
     """ Register Lithops Backend to be called with parallel_backend("lithops"). """
@@ -143,37 +142,35 @@ def find_shared_objects(calls):
     # store it in shared memory, pass a proxy as a value
     calls = [list(item) for item in calls]
 
-    storage = Storage()
-    thread_pool = ThreadPoolExecutor(max_workers=len(record))
-
-    def put_arg_obj(positions):
+    shared = []
+    for positions in record.values():
         obj = positions.pop(0)
         if len(positions) > 1 and consider_sharing(obj):
             logger.debug('Proxying {}'.format(type(obj)))
-            obj_bin = pickle.dumps(obj)
-            cloud_object = storage.put_cloudobject(obj_bin)
+            shared.append((obj, positions))
 
-            for pos in positions:
-                call_n, idx_or_key = pos
-                call = calls[call_n]
+    if not shared:
+        return [tuple(item) for item in calls]
 
-                if isinstance(idx_or_key, str):
-                    call[2][idx_or_key] = cloud_object
-                else:
-                    args_as_list = list(call[1])
-                    args_as_list[idx_or_key] = cloud_object
-                    call[1] = tuple(args_as_list)
+    storage = Storage()
+    cloud_objects = storage.put_cloudobjects(pickle.dumps(obj) for obj, _ in shared)
 
-                try:
-                    call[3].append(idx_or_key)
-                except IndexError:
-                    call.append([idx_or_key])
+    for (_, positions), cloud_object in zip(shared, cloud_objects):
+        for pos in positions:
+            call_n, idx_or_key = pos
+            call = calls[call_n]
 
-    fut = []
-    for positions in record.values():
-        f = thread_pool.submit(put_arg_obj, positions)
-        fut.append(f)
-    [f.result() for f in fut]
+            if isinstance(idx_or_key, str):
+                call[2][idx_or_key] = cloud_object
+            else:
+                args_as_list = list(call[1])
+                args_as_list[idx_or_key] = cloud_object
+                call[1] = tuple(args_as_list)
+
+            try:
+                call[3].append(idx_or_key)
+            except IndexError:
+                call.append([idx_or_key])
 
     return [tuple(item) for item in calls]
 
@@ -193,9 +190,15 @@ def handle_call_process(func, args, kwargs, proxy_positions=[]):
 
 
 def replace_with_values(args, kwargs, proxy_positions):
+    global CACHED_STORAGE
+
     args_as_list = list(args)
     thread_pool = ThreadPoolExecutor(max_workers=len(proxy_positions))
-    cache = diskcache.Cache(os.path.join(LITHOPS_TEMP_DIR, 'cache'))
+
+    if CACHED_STORAGE is None:
+        # The shared objects are immutable cloudobjects
+        CACHED_STORAGE = Storage()
+        CACHED_STORAGE.enable_cache(validate=False)
 
     def get_arg_obj(idx_or_key):
         if isinstance(idx_or_key, str):
@@ -203,15 +206,9 @@ def replace_with_values(args, kwargs, proxy_positions):
         else:
             obj_id = args_as_list[idx_or_key]
 
-        if obj_id in cache:
-            logger.debug('Get {} (arg {}) from cache'.format(obj_id, idx_or_key))
-            obj = cache[obj_id]
-        else:
-            logger.debug('Get {} (arg {}) from storage'.format(obj_id, idx_or_key))
-            storage = Storage()
-            obj_bin = storage.get_cloudobject(obj_id)
-            obj = pickle.loads(obj_bin)
-            cache[obj_id] = obj
+        logger.debug('Get {} (arg {})'.format(obj_id, idx_or_key))
+        obj_bin = CACHED_STORAGE.get_cloudobject(obj_id)
+        obj = pickle.loads(obj_bin)
 
         if isinstance(idx_or_key, str):
             kwargs[idx_or_key] = obj
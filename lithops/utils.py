@@ -75,6 +75,18 @@ def iterchunks(lst, n):
         yield lst[i:i + n]
 
 
+def iterguidedchunks(lst, workers, min_size=1):
+    """
+    Yield chunks from lst with guided self-scheduling: each chunk has
+    1/workers of the remaining items, so the chunks shrink toward the end
+    """
+    i = 0
+    while i < len(lst):
+        n = max(min_size, -(-(len(lst) - i) // workers))
+        yield lst[i:i + n]
+        i += n
+
+
 def agg_data(data_strs):
     """Auxiliary function that aggregates data of a job to a single
     byte string.
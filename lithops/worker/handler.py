@@ -28,6 +28,7 @@ import traceback
 import multiprocessing as mp
 from queue import Queue, Empty
 from threading import Thread
+from concurrent.futures import ThreadPoolExecutor, wait
 from multiprocessing import Process, Pipe
 from tblib import pickling_support
 from types import SimpleNamespace
@@ -36,11 +37,15 @@ from multiprocessing.managers import SyncManager
 from lithops.version import __version__
 from lithops.config import extract_storage_config
 from lithops.storage import InternalStorage
+from lithops.job import load_job_manifest
 from lithops.worker.jobrunner import JobRunner
 from lithops.worker.utils import LogStream, custom_redirection, \
-    get_function_and_modules, get_function_data
-from lithops.constants import JOBS_PREFIX, LITHOPS_TEMP_DIR, MODULES_DIR
-from lithops.utils import setup_lithops_logger, is_unix_system
+    get_function_and_modules, get_function_data, prefetch_input_chunk, share_call_data, \
+    release_job_files
+from lithops.storage.utils import create_logs_key
+from lithops.constants import JOBS_PREFIX, LITHOPS_TEMP_DIR, MODULES_DIR, \
+    EXECUTION_LOGS_DEFAULT
+from lithops.utils import setup_lithops_logger, is_unix_system, iterguidedchunks
 from lithops.worker.status import create_call_status
 from lithops.worker.utils import SystemMonitor
 
@@ -54,12 +59,39 @@ class ShutdownSentinel:
     pass
 
 
-def create_job(payload: dict) -> SimpleNamespace:
+def create_job(payload: dict, prefetch_input: bool = False) -> SimpleNamespace:
+    """
+    Downloads the function, the data and, optionally, the input object
+    chunk of the first call concurrently
+    """
     job = SimpleNamespace(**payload)
+    job.prefetched_input = None
     storage_config = extract_storage_config(job.config)
     internal_storage = InternalStorage(storage_config)
-    job.func = get_function_and_modules(job, internal_storage)
-    job.data = get_function_data(job, internal_storage)
+
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        func_future = ex.submit(get_function_and_modules, job, internal_storage)
+        data_future = ex.submit(get_function_data, job, internal_storage)
+
+        if prefetch_input:
+            def prefetch():
+                return prefetch_input_chunk(job, data_future.result(), internal_storage, func_future.result)
+            prefetch_future = ex.submit(prefetch)
+
+        try:
+            job.func = func_future.result()
+            job.data = data_future.result()
+        except Exception:
+            data_future.cancel()
+            wait([func_future, data_future])
+            release_job_files(job)
+            raise
+
+        if prefetch_input:
+            try:
+                job.prefetched_input = prefetch_future.result()
+            except Exception as e:
+                logger.debug(f'Unable to prefetch the input chunk: {e}')
 
     return job
 
@@ -68,46 +100,120 @@ def function_handler(payload):
     """
     Default function entry point called from Serverless backends
     """
-    job = create_job(payload)
-    setup_lithops_logger(job.log_level)
+    if payload.get('dispatch') == 'pull':
+        return pull_function_handler(payload)
 
-    worker_processes = min(job.worker_processes, len(job.call_ids))
-    logger.info(f'Tasks received: {len(job.call_ids)} - Worker processes: {worker_processes}')
+    prefetch_input = min(payload['worker_processes'], len(payload['call_ids'])) == 1
+    job = create_job(payload, prefetch_input)
+    setup_lithops_logger(job.log_level)
 
-    if worker_processes == 1:
-        work_queue = Queue()
-        for call_id in job.call_ids:
-            data = job.data.pop(0)
-            work_queue.put((job, call_id, data))
-        work_queue.put(ShutdownSentinel())
-        python_queue_consumer(0, work_queue, )
-    else:
-        manager = SyncManager()
-        manager.start()
-        work_queue = manager.Queue()
-        job_runners = []
+    try:
+        worker_processes = min(job.worker_processes, len(job.call_ids))
+        logger.info(f'Tasks received: {len(job.call_ids)} - Worker processes: {worker_processes}')
 
-        for call_id in job.call_ids:
-            data = job.data.pop(0)
-            work_queue.put((job, call_id, data))
+        # The data of each call is sent along with its task, not within the job
+        job_data, job.data = job.data, None
 
-        for pid in range(worker_processes):
+        if worker_processes == 1:
+            work_queue = Queue()
+            for call_id in job.call_ids:
+                data = job_data.pop(0)
+                work_queue.put((job, call_id, data))
             work_queue.put(ShutdownSentinel())
-            p = mp.Process(target=python_queue_consumer, args=(pid, work_queue,))
-            job_runners.append(p)
-            p.start()
+            python_queue_consumer(0, work_queue, )
+        else:
+            manager = SyncManager()
+            manager.start()
+            work_queue = manager.Queue()
+            job_runners = []
+
+            for call_id in job.call_ids:
+                data = share_call_data(job_data.pop(0))
+                work_queue.put((job, call_id, data))
+
+            for pid in range(worker_processes):
+                work_queue.put(ShutdownSentinel())
+                p = mp.Process(target=python_queue_consumer, args=(pid, work_queue,))
+                job_runners.append(p)
+                p.start()
+
+            for runner in job_runners:
+                runner.join()
+
+            manager.shutdown()
+    finally:
+        # Delete modules path from syspath
+        module_path = os.path.join(MODULES_DIR, job.job_key)
+        if module_path in sys.path:
+            sys.path.remove(module_path)
 
-        for runner in job_runners:
-            runner.join()
+        release_job_files(job)
 
-        manager.shutdown()
+    os.environ.pop('__LITHOPS_TOTAL_EXECUTORS', None)
 
-    # Delete modules path from syspath
-    module_path = os.path.join(MODULES_DIR, job.job_key)
-    if module_path in sys.path:
-        sys.path.remove(module_path)
 
-    os.environ.pop('__LITHOPS_TOTAL_EXECUTORS', None)
+def pull_function_handler(payload):
+    """
+    Entry point of the workers of a job with pull-based dispatch. The calls
+    of the job are split in guided self-scheduling ranges, and the worker
+    claims and runs ranges until all of them are claimed
+    """
+    setup_lithops_logger(payload['log_level'])
+    executor_id = payload['executor_id']
+    job_id = payload['job_id']
+
+    storage_config = extract_storage_config(payload['config'])
+    internal_storage = InternalStorage(storage_config)
+    job = load_job_manifest(internal_storage.get_job_manifest(executor_id, job_id))
+
+    call_ids = [i for i in range(job.total_calls) if i not in job.cached_calls]
+    ranges = list(iterguidedchunks(call_ids, payload['dispatch_workers'], payload['chunksize']))
+    worker_id = os.environ.get('__LITHOPS_ACTIVATION_ID') or uuid.uuid4().hex[:12]
+
+    def run_range(index):
+        logger.info(f'Claimed range {index} of {len(ranges)} - Calls: {len(ranges[index])}')
+        range_payload = payload.copy()
+        range_payload['dispatch'] = 'static'
+        range_payload['call_ids'] = ["{:05d}".format(i) for i in ranges[index]]
+        if job.data_key:
+            range_payload['data_byte_ranges'] = [job.data_byte_ranges[i] for i in ranges[index]]
+        else:
+            range_payload['data_byte_strs'] = [str(job.data_byte_strs[i]) for i in ranges[index]]
+        function_handler(range_payload)
+
+    def claim(index):
+        return internal_storage.claim_call_range(executor_id, job_id, index, worker_id)
+
+    claimed = 0
+
+    # Each worker first runs its own range
+    start = payload['dispatch_index'] % len(ranges) if ranges else 0
+    if ranges and claim(start):
+        run_range(start)
+        claimed += 1
+
+    # The remaining ranges are claimed in order by all the workers. After a
+    # failed claim, the worker jumps past the last claimed range instead of
+    # trying every index, so each range costs O(1) writes and not O(workers)
+    index = payload['dispatch_workers']
+    while index < len(ranges):
+        if claim(index):
+            run_range(index)
+            claimed += 1
+            index += 1
+        else:
+            claimed_ranges = internal_storage.get_claimed_ranges(executor_id, job_id)
+            index = max(max(claimed_ranges, default=index), index) + 1
+
+    # The initial range of a worker that did not start yet is left unclaimed
+    if ranges:
+        unclaimed = set(range(len(ranges))) - internal_storage.get_claimed_ranges(executor_id, job_id)
+        for index in sorted(unclaimed):
+            if claim(index):
+                run_range(index)
+                claimed += 1
+
+    logger.info(f'No more ranges to claim - Ranges run by this worker: {claimed}')
 
 
 def python_queue_consumer(pid, work_queue, initializer=None, callback=None):
@@ -146,6 +252,9 @@ def prepare_and_run_task(task):
         act_id = str(uuid.uuid4()).replace('-', '')[:12]
         os.environ['__LITHOPS_ACTIVATION_ID'] = act_id
 
+    # Identifies this execution of the call when claiming its completion
+    task.claim_token = uuid.uuid4().hex
+
     os.environ['LITHOPS_WORKER'] = 'True'
     os.environ['PYTHONUNBUFFERED'] = 'True'
     os.environ.update(task.extra_env)
@@ -162,6 +271,9 @@ def prepare_and_run_task(task):
         with custom_redirection(task.log_stream):
             run_task(task)
 
+    # The prefetched input chunk only belongs to the first call of the job
+    task.prefetched_input = None
+
     # Unset specific job env vars
     for key in task.extra_env:
         os.environ.pop(key, None)
@@ -207,7 +319,8 @@ def run_task(task):
         jrp = Process(target=jobrunner.run) if is_unix_system() else Thread(target=jobrunner.run)
 
         process_id = os.getpid() if is_unix_system() else mp.current_process().pid
-        sys_monitor = SystemMonitor(process_id)
+        sampling_interval = task.config['lithops'].get('stats_sampling_interval')
+        sys_monitor = SystemMonitor(process_id, sampling_interval)
         sys_monitor.start()
 
         jrp.start()
@@ -230,6 +343,11 @@ def run_task(task):
         call_status.add('worker_func_vms', mem_info['vms'])
         call_status.add('worker_func_uss', mem_info['uss'])
 
+        samples = sys_monitor.get_samples()
+        if samples:
+            call_status.add('worker_func_peak_rss', max(sys_monitor.samples['rss']))
+            call_status.add('worker_func_resource_samples', samples)
+
         if jrp.is_alive():
             # If process is still alive after jr.join(job_max_runtime), kill it
             try:
@@ -280,12 +398,24 @@ def run_task(task):
         if not job_interruped:
             call_status.add('worker_end_tstamp', time.time())
 
-            # Flush log stream and save it to the call status
+            # Flush log stream and store it according to the execution_logs mode
             task.log_stream.flush()
-            if os.path.isfile(task.log_file):
+            logs_mode = task.config['lithops'].get('execution_logs', EXECUTION_LOGS_DEFAULT)
+            if logs_mode == 'on_error':
+                logs_mode = 'storage' if call_status.status.get('exception') else 'none'
+            if logs_mode != 'none' and os.path.isfile(task.log_file):
                 with open(task.log_file, 'rb') as lf:
-                    log_str = base64.b64encode(zlib.compress(lf.read())).decode()
+                    log_data = lf.read()
+                if logs_mode == 'status':
+                    log_str = base64.b64encode(zlib.compress(log_data)).decode()
                     call_status.add('logs', log_str)
+                else:
+                    logs_key = create_logs_key(task.executor_id, task.job_id, task.call_id)
+                    try:
+                        internal_storage.put_data(logs_key, log_data)
+                        call_status.add('logs_key', logs_key)
+                    except Exception as e:
+                        logger.debug(f'Unable to store execution logs: {e}')
 
             call_status.send_finish_event()
 
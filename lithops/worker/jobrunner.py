@@ -18,6 +18,7 @@
 import os
 import io
 import sys
+import json
 import pika
 import time
 import pickle
@@ -25,9 +26,11 @@ import logging
 import inspect
 import requests
 import traceback
+import concurrent.futures as cf
 from pydoc import locate
 
-from lithops.worker.utils import peak_memory
+from lithops.worker.utils import peak_memory, PrefetchedStream, ReadAheadStream, \
+    READ_AHEAD_MIN_PART_SIZE, load_call_data
 
 try:
     import numpy as np
@@ -35,17 +38,23 @@ try:
 except ModuleNotFoundError:
     pass
 
+from lithops.constants import DATA_READ_AHEAD_CONCURRENCY_DEFAULT, DATA_READ_AHEAD_BUFFER_DEFAULT
 from lithops.storage import Storage
 from lithops.wait import wait
+from lithops.monitor import JobMonitor
 from lithops.future import ResponseFuture
 from lithops.utils import WrappedStreamingBody, sizeof_fmt, \
     is_object_processing_function, FuturesList, verify_args
 from lithops.utils import WrappedStreamingBodyPartition
 from lithops.util.metrics import PrometheusExporter
-from lithops.storage.utils import create_output_key
+from lithops.storage.utils import create_output_key, create_cache_key
+from lithops.storage.metrics import COUNTERS, diff_ops, summarize_ops
 
 logger = logging.getLogger(__name__)
 
+REDUCE_PREFETCH_WINDOW = 8
+REDUCE_POLL_INTERVAL = 0.5
+
 
 class JobStats:
 
@@ -86,8 +95,14 @@ class JobRunner:
         func_sig = inspect.signature(function)
 
         if len(data) == 1 and 'future' in data:
-            # Function chaining feature
-            out = [data.pop('future').result(internal_storage=self.internal_storage)]
+            # Function chaining feature. The host invokes pipelined calls once
+            # their upstream future is done, so the result is already available
+            future = data.pop('future')
+            if future.new:
+                # The upstream call was pipelined as well, and it was not yet
+                # invoked when this job was created
+                future._set_invoked()
+            out = [future.result(internal_storage=self.internal_storage)]
             data.update(verify_args(function, out, None)[0])
 
         if 'ibm_cos' in func_sig.parameters:
@@ -115,6 +130,17 @@ class JobRunner:
         if 'id' in func_sig.parameters:
             data['id'] = int(self.job.call_id)
 
+    def _put_cached_output(self, call_data, pickled_output):
+        """
+        Stores the output of the call in the results cache. A failure
+        only means that the call will be executed again next time
+        """
+        try:
+            cache_key = create_cache_key(self.job.cache_hash, call_data)
+            self.internal_storage.put_data(cache_key, pickled_output)
+        except Exception as e:
+            logger.warning(f'Unable to store the result in the results cache: {e}')
+
     def _wait_futures(self, data):
         logger.info('Reduce function: waiting for map results')
         fut_list = list(data.values())[0]
@@ -123,6 +149,59 @@ class JobRunner:
         fut_list.clear()
         data[next(iter(data))] = results
 
+    def _stream_futures(self, data):
+        logger.info('Reduce function: streaming map results')
+        fut_list = list(data.values())[0]
+        data[next(iter(data))] = self._iter_results(fut_list)
+
+    def _iter_results(self, fut_list):
+        """
+        Yields the map results in completion order. Results are downloaded
+        through a bounded prefetch window and released once consumed
+        """
+        pending = list(fut_list)
+        fut_list.clear()
+        if not pending:
+            return
+
+        job_monitor = JobMonitor(executor_id=pending[0].executor_id,
+                                 internal_storage=self.internal_storage)
+        job_monitor.start(fs=pending)
+        downloads = {}
+        pool = cf.ThreadPoolExecutor(max_workers=REDUCE_PREFETCH_WINDOW)
+
+        def get_result(f):
+            return f.result(internal_storage=self.internal_storage)
+
+        try:
+            while pending or downloads:
+                ready = [f for f in pending if f.ready or f.success or f.done]
+                for f in ready[:REDUCE_PREFETCH_WINDOW - len(downloads)]:
+                    pending.remove(f)
+                    downloads[pool.submit(get_result, f)] = f
+
+                if not downloads:
+                    time.sleep(REDUCE_POLL_INTERVAL)
+                    continue
+
+                done, _ = cf.wait(downloads, timeout=REDUCE_POLL_INTERVAL,
+                                  return_when=cf.FIRST_COMPLETED)
+                for download in done:
+                    f = downloads.pop(download)
+                    download.result()
+                    if f.futures:
+                        pending.extend(f._new_futures)
+                        job_monitor.start(fs=f._new_futures)
+                        continue
+                    # Drop the reference held by the future, so that the result
+                    # is released as soon as the reduce function is done with it
+                    result, f._call_output = f._call_output, None
+                    yield result
+                    del result
+        finally:
+            job_monitor.stop()
+            pool.shutdown(wait=False)
+
     def _load_object(self, data):
         """
         Loads the object in case of object processing
@@ -130,15 +209,34 @@ class JobRunner:
         extra_get_args = {}
         obj = data['obj']
 
-        if hasattr(obj, 'bucket') and not hasattr(obj, 'path'):
+        prefetched = getattr(self.job, 'prefetched_input', None)
+
+        if prefetched and prefetched['call_id'] == self.job.call_id \
+           and prefetched['body'] is not None:
+            logger.info(f'Getting dataset from prefetched {obj.backend}://{obj.bucket}/{obj.key}')
+            stream = PrefetchedStream(prefetched['body'])
+            stream_body = stream
+
+        elif hasattr(obj, 'bucket') and not hasattr(obj, 'path'):
             logger.info(f'Getting dataset from {obj.backend}://{obj.bucket}/{obj.key}')
             if obj.backend == self.internal_storage.backend:
                 storage = self.internal_storage.storage
             else:
                 storage = Storage(config=self.lithops_config, backend=obj.backend)
-            if obj.data_byte_range is not None:
-                extra_get_args['Range'] = 'bytes={}-{}'.format(*obj.data_byte_range)
-            stream = storage.get_object(obj.bucket, obj.key, stream=True, extra_get_args=extra_get_args)
+            first_byte, last_byte = obj.data_byte_range or (0, obj.chunk_size - 1)
+            max_concurrency = self.lithops_config['lithops'].get(
+                'data_read_ahead_concurrency', DATA_READ_AHEAD_CONCURRENCY_DEFAULT)
+            buffer_size = self.lithops_config['lithops'].get(
+                'data_read_ahead_buffer', DATA_READ_AHEAD_BUFFER_DEFAULT) * 1024 ** 2
+            part_size = max(buffer_size // max(max_concurrency, 1), READ_AHEAD_MIN_PART_SIZE)
+            if max_concurrency > 1 and last_byte - first_byte + 1 > part_size:
+                # Concurrent sub-range requests, ahead of the function
+                stream = ReadAheadStream(storage, obj.bucket, obj.key, first_byte, last_byte,
+                                         max_concurrency, part_size)
+            else:
+                if obj.data_byte_range is not None:
+                    extra_get_args['Range'] = 'bytes={}-{}'.format(*obj.data_byte_range)
+                stream = storage.get_object(obj.bucket, obj.key, stream=True, extra_get_args=extra_get_args)
             stream_body = stream
 
         elif hasattr(obj, 'url'):
@@ -205,12 +303,25 @@ class JobRunner:
         exception = False
         fn_name = None
 
+        cache = self.internal_storage.storage.cache
+        cache_stats = dict(cache.stats) if cache else None
+        storage_ops = self.internal_storage.storage.metrics.snapshot()
+
         try:
             func = pickle.loads(self.job.func)
-            data = pickle.loads(self.job.data)
+            call_data = load_call_data(self.job.data)
+            prefetched = getattr(self.job, 'prefetched_input', None)
+            if prefetched and prefetched['call_id'] == self.job.call_id:
+                # Already decoded by the handler
+                data = prefetched['data']
+            else:
+                data = pickle.loads(call_data)
 
             if eval(os.environ.get('__LITHOPS_REDUCE_JOB', 'False')):
-                self._wait_futures(data)
+                if eval(os.environ.get('__LITHOPS_REDUCE_STREAMING', 'False')):
+                    self._stream_futures(data)
+                else:
+                    self._wait_futures(data)
             elif is_object_processing_function(func):
                 self._load_object(data)
 
@@ -242,12 +353,15 @@ class JobRunner:
             self.stats.write('worker_func_end_tstamp', function_end_tstamp)
             self.stats.write('worker_func_exec_time', round(function_end_tstamp - function_start_tstamp, 8))
             self.stats.write('func_result_size', 0)
+            new_futures = False
+            pickled_output = b''  # The function returned None
 
             if result is not None:
                 # Check for new futures
                 if isinstance(result, ResponseFuture) or isinstance(result, FuturesList) \
                    or (type(result) is list and len(result) > 0 and isinstance(result[0], ResponseFuture)):
                     self.stats.write('new_futures', pickle.dumps(result))
+                    new_futures = True
                     result = None
                 else:
                     logger.debug("Pickling result")
@@ -259,6 +373,9 @@ class JobRunner:
                         self.stats.write("worker_result_upload_time", 0)
                         result = None
 
+            if self.job.cache_hash and not new_futures:
+                self._put_cached_output(call_data, pickled_output)
+
         except Exception:
             exception = True
             self.stats.write("exception", True)
@@ -290,6 +407,9 @@ class JobRunner:
         finally:
             # self.stats.write('worker_jobrunner_end_tstamp', time.time())
             self.stats.write('worker_peak_memory_end', peak_memory())
+            if cache:
+                for stat, value in cache.stats.items():
+                    self.stats.write(f'worker_storage_cache_{stat}', value - cache_stats[stat])
             self.prometheus.send_metric(
                 name='function_end',
                 value=time.time(),
@@ -301,11 +421,21 @@ class JobRunner:
                 )
             )
 
-            if result is not None and not exception:
+            if result is not None and not exception and not self.internal_storage.claim_call_completion(
+                    self.job.executor_id, self.job.job_id, self.job.call_id, self.job.claim_token,
+                    self.lithops_config['lithops'].get('speculation', False)):
+                logger.info("Call already finished in another activation, skipping the result upload")
+            elif result is not None and not exception:
                 output_upload_start_tstamp = time.time()
                 logger.info(f"Storing function result - Size: {sizeof_fmt(len(pickled_output))}")
                 self.internal_storage.put_data(self.output_key, pickled_output)
                 output_upload_end_tstamp = time.time()
                 self.stats.write("worker_result_upload_time", round(output_upload_end_tstamp - output_upload_start_tstamp, 8))
+
+            ops = diff_ops(self.internal_storage.storage.metrics.snapshot(), storage_ops)
+            storage_stats = summarize_ops(ops)
+            for counter in COUNTERS:
+                self.stats.write(f'worker_storage_{counter}', storage_stats[counter])
+            self.stats.write('worker_storage_ops', json.dumps(ops, separators=(',', ':')))
             self.jobrunner_conn.send("Finished")
             logger.info("Process finished")
@@ -81,6 +81,11 @@ class StorageCallStatus(CallStatus):
             self.internal_storage.put_data(init_key, '')
 
         elif self.status['type'] == '__end__':
+            if not self.internal_storage.claim_call_completion(
+                    executor_id, job_id, call_id, self.job.claim_token,
+                    self.config['lithops'].get('speculation', False)):
+                logger.info("Call already finished in another activation, skipping the execution stats")
+                return
             status_key = create_status_key(executor_id, job_id, call_id)
             dmpd_response_status = json.dumps(self.status)
             drs = sizeof_fmt(len(dmpd_response_status))
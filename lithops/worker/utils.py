@@ -14,18 +14,32 @@
 # limitations under the License.
 #
 
+import io
 import os
+import mmap
+import uuid
 import sys
+import zlib
+import json
+import time
+import base64
+import shutil
+import hashlib
 import pkgutil
 import logging
 import pickle
+import socket
 import platform
+import threading
 import subprocess
+from collections import deque
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 from lithops.version import __version__ as lithops_ver
 from lithops.utils import sizeof_fmt, is_unix_system, b64str_to_bytes
-from lithops.constants import MODULES_DIR, SA_INSTALL_DIR, LITHOPS_TEMP_DIR
+from lithops.constants import MODULES_DIR, SA_INSTALL_DIR, \
+    WORKER_CACHE_DIR, WORKER_CACHE_SIZE_DEFAULT, WORKER_DATA_DIR
 
 try:
     import psutil
@@ -36,8 +50,22 @@ except ModuleNotFoundError:
 
 logger = logging.getLogger(__name__)
 
+MODULES_UNPACK_THREADS = 8
+INPUT_PREFETCH_MAX_SIZE = 64 * 1024 ** 2  # 64MiB
+DATA_MMAP_THRESHOLD = 16 * 1024 ** 2  # 16MiB
+READ_AHEAD_MIN_PART_SIZE = 1024 ** 2  # 1MiB
+CACHE_LEASES_DIR = os.path.join(WORKER_CACHE_DIR, '.leases')
+CACHE_LEASE_HEARTBEAT = 60  # Seconds between refreshes of the held leases
+CACHE_LEASE_MAX_AGE = 10 * CACHE_LEASE_HEARTBEAT
+CACHE_LEDGER = os.path.join(WORKER_CACHE_DIR, '.ledger')
+
+_held_leases = set()
+_held_leases_lock = threading.Lock()
+_lease_heartbeat = None
+
 
 if is_unix_system():
+    import fcntl
     from resource import RUSAGE_SELF, getrusage
     # Windows hosts can't use ps_mem module
     import ps_mem
@@ -49,7 +77,10 @@ def get_function_and_modules(job, internal_storage):
     """
     logger.info("Getting function and modules")
     backend = job.config['lithops']['backend']
-    func_path = '/'.join([LITHOPS_TEMP_DIR, job.func_key])
+    func_path = os.path.join(WORKER_CACHE_DIR, 'funcs', os.path.basename(job.func_key))
+    cache_updated = False
+    cached_entries = []
+    job.cache_lease = None
 
     if job.config[backend].get('runtime_include_function'):
         logger.info("Runtime include function feature activated. Loading "
@@ -57,50 +88,373 @@ def get_function_and_modules(job, internal_storage):
         func_path = '/'.join([SA_INSTALL_DIR, job.func_key])
         with open(func_path, "rb") as f:
             func_obj = f.read()
-    elif os.path.exists(func_path):
-        logger.info(f"Loading {job.func_key} from local cache")
-        with open(func_path, 'rb') as f:
-            func_obj = f.read()
     else:
-        logger.info(f"Loading {job.func_key} from storage")
-        func_obj = internal_storage.get_func(job.func_key)
-        os.makedirs(os.path.dirname(func_path), exist_ok=True)
-        with open(func_path, 'wb') as f:
-            f.write(func_obj)
+        cached_entries.append(func_path)
+        with worker_cache_lock():
+            job.cache_lease = lease_cache_entries(cached_entries)
+            func_cached = os.path.exists(func_path)
+            if func_cached:
+                touch_cache_entry(func_path)
+
+        if func_cached:
+            logger.info(f"Loading {job.func_key} from local cache")
+            with open(func_path, 'rb') as f:
+                func_obj = f.read()
+        else:
+            logger.info(f"Loading {job.func_key} from storage")
+            func_obj = internal_storage.get_func(job.func_key)
+            write_cache_entry(func_path, lambda tmp_path: _write_file(tmp_path, func_obj))
+            cache_updated = True
 
     loaded_func_all = pickle.loads(func_obj)
 
     if loaded_func_all.get('module_data'):
+        module_data = loaded_func_all['module_data']
         module_path = os.path.join(MODULES_DIR, job.job_key)
-        logger.info(f"Writing function dependencies to {module_path}")
-        os.makedirs(module_path, exist_ok=True)
+        modules_hash = hashlib.sha1(repr(sorted(module_data.items())).encode()).hexdigest()
+        cached_path = os.path.join(WORKER_CACHE_DIR, 'modules', modules_hash)
+
+        cached_entries.append(cached_path)
+        with worker_cache_lock():
+            job.cache_lease = lease_cache_entries(cached_entries, job.cache_lease)
+            modules_cached = os.path.isdir(cached_path)
+            if modules_cached:
+                touch_cache_entry(cached_path)
+
+        if modules_cached:
+            logger.info(f"Function dependencies found in local cache {cached_path}")
+        else:
+            logger.info(f"Writing function dependencies to {cached_path}")
+            write_cache_entry(cached_path, lambda tmp_path: unpack_modules(module_data, tmp_path))
+            cache_updated = True
+
+        try:
+            link_job_modules(cached_path, module_path)
+        except OSError as e:
+            logger.debug(f"Unable to link {module_path} to the modules cache: {e}")
+            os.makedirs(module_path, exist_ok=True)
+            unpack_modules(module_data, module_path)
         sys.path.append(module_path)
 
-        for m_filename, m_data in loaded_func_all['module_data'].items():
-            m_path = os.path.dirname(m_filename)
+    if cache_updated:
+        max_size = job.config['lithops'].get('worker_cache_size', WORKER_CACHE_SIZE_DEFAULT)
+        try:
+            evict_worker_cache(max_size * 1024 ** 2)
+        except Exception as e:
+            logger.debug(f"Unable to evict the worker cache: {e}")
+
+    return loaded_func_all['func']
+
+
+def _write_file(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def touch_cache_entry(path):
+    """
+    Updates the last use time of a cache entry
+    """
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+@contextmanager
+def worker_cache_lock():
+    """
+    Serializes the lease of cache entries and the cache eviction among all
+    the worker processes of the host
+    """
+    if not is_unix_system():
+        yield
+        return
+    os.makedirs(WORKER_CACHE_DIR, exist_ok=True)
+    with open(os.path.join(WORKER_CACHE_DIR, '.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _refresh_held_leases():
+    """
+    Periodically updates the modification time of the leases held by this
+    process. A lease that is not refreshed, for example because its process
+    was killed and its PID reused by a new activation, expires after
+    CACHE_LEASE_MAX_AGE seconds
+    """
+    while True:
+        time.sleep(CACHE_LEASE_HEARTBEAT)
+        with _held_leases_lock:
+            for lease in list(_held_leases):
+                try:
+                    os.utime(lease)
+                except FileNotFoundError:
+                    _held_leases.discard(lease)
+
+
+def _reset_held_leases_lock():
+    global _held_leases_lock
+    _held_leases_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_held_leases_lock)
+
+
+def lease_cache_entries(paths, lease=None):
+    """
+    Marks the given cache entries as in use by a job, so that they are not
+    evicted until the lease is released. Updates the entries of an existing
+    lease if provided. Returns the lease path
+    """
+    global _lease_heartbeat
+
+    if lease is None:
+        os.makedirs(CACHE_LEASES_DIR, exist_ok=True)
+        lease = os.path.join(CACHE_LEASES_DIR, f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}')
+    with open(lease, 'w') as f:
+        json.dump(paths, f)
+
+    with _held_leases_lock:
+        _held_leases.add(lease)
+        if _lease_heartbeat is None or _lease_heartbeat[0] != os.getpid():
+            # Threads are not inherited by forked worker processes
+            thread = threading.Thread(target=_refresh_held_leases, daemon=True)
+            thread.start()
+            _lease_heartbeat = (os.getpid(), thread)
 
-            if len(m_path) > 0 and m_path[0] == "/":
-                m_path = m_path[1:]
-            to_make = os.path.join(module_path, m_path)
+    return lease
+
+
+def release_cache_lease(lease):
+    """
+    Releases the cache entries of a lease
+    """
+    with _held_leases_lock:
+        _held_leases.discard(lease)
+    try:
+        os.remove(lease)
+    except FileNotFoundError:
+        pass
+
+
+def _pid_alive(pid):
+    if psutil_found:
+        return psutil.pid_exists(pid)
+    if not is_unix_system():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def get_leased_entries():
+    """
+    Returns the cache entries in use by the running jobs of the host.
+    The leases of finished processes and the leases that were not refreshed
+    within CACHE_LEASE_MAX_AGE seconds are removed
+    """
+    leased = set()
+    if not os.path.isdir(CACHE_LEASES_DIR):
+        return leased
+
+    hostname = socket.gethostname()
+    for entry in os.scandir(CACHE_LEASES_DIR):
+        try:
+            lease_host, pid, _ = entry.name.rsplit('-', 2)
+            stale = time.time() - entry.stat().st_mtime > CACHE_LEASE_MAX_AGE
+            if not stale and lease_host == hostname:
+                stale = not _pid_alive(int(pid))
+            if stale:
+                release_cache_lease(entry.path)
+                continue
+            with open(entry.path, 'r') as f:
+                leased.update(json.load(f))
+        except (FileNotFoundError, ValueError):
+            # The lease was released meanwhile or is being written
+            continue
+
+    return leased
+
+
+def write_cache_entry(path, writer):
+    """
+    Atomically creates a cache entry. The writer callable receives a temporary
+    path to populate, which is then renamed to its final location, so that
+    concurrent workers never observe partially written entries.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}'
+    try:
+        writer(tmp_path)
+    except Exception:
+        if os.path.isdir(tmp_path):
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    size = _entry_size(tmp_path)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Another worker created a non-empty directory entry first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        return
+
+    with worker_cache_lock():
+        ledger = _load_cache_ledger()
+        if ledger is not None:
+            ledger[path] = size
+            _save_cache_ledger(ledger)
+
+
+def link_job_modules(cached_path, module_path):
+    """
+    Makes the job modules path a symbolic link to the cached modules tree
+    """
+    if os.path.islink(module_path) and os.readlink(module_path) == cached_path:
+        return
+    os.makedirs(os.path.dirname(module_path), exist_ok=True)
+    tmp_link = f'{module_path}.tmp-{os.getpid()}-{threading.get_ident()}'
+    os.symlink(cached_path, tmp_link, target_is_directory=True)
+    try:
+        os.replace(tmp_link, module_path)
+    except OSError:
+        os.unlink(tmp_link)
+        raise
+
+
+def _entry_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
             try:
-                os.makedirs(to_make)
-            except OSError as e:
-                if e.errno == 17:
-                    pass
+                size += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return size
+
+
+def _load_cache_ledger():
+    """
+    Returns the size of each worker cache entry, as recorded when it was
+    written, or None if the ledger does not exist yet
+    """
+    try:
+        with open(CACHE_LEDGER, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _save_cache_ledger(ledger):
+    tmp_path = f'{CACHE_LEDGER}.tmp-{os.getpid()}-{threading.get_ident()}'
+    with open(tmp_path, 'w') as f:
+        json.dump(ledger, f)
+    os.replace(tmp_path, CACHE_LEDGER)
+
+
+def evict_worker_cache(max_size):
+    """
+    Removes the least recently used function blobs and modules trees from
+    the worker cache until its size is below max_size bytes, and the job
+    modules links whose target was evicted. Entries leased by running jobs
+    are never evicted. The size of the entries is kept in a ledger, so the
+    cache is only scanned once it exceeds max_size or the ledger is missing
+    """
+    with worker_cache_lock():
+        ledger = _load_cache_ledger()
+        if ledger is not None and sum(ledger.values()) <= max_size:
+            return
+
+        keep = get_leased_entries()
+        entries = []
+        for sub_dir in ('funcs', 'modules'):
+            cache_dir = os.path.join(WORKER_CACHE_DIR, sub_dir)
+            if not os.path.isdir(cache_dir):
+                continue
+            for entry in os.scandir(cache_dir):
+                if '.tmp-' in entry.name:
+                    continue
+                try:
+                    size = ledger.get(entry.path) if ledger else None
+                    if size is None:
+                        size = _entry_size(entry.path)
+                    entries.append((entry.stat().st_mtime, entry.path, size))
+                except FileNotFoundError:
+                    continue
+
+        ledger = {path: size for _, path, size in entries}
+        total_size = sum(ledger.values())
+        if total_size > max_size:
+            for _, path, size in sorted(entries):
+                if total_size <= max_size:
+                    break
+                if path in keep:
+                    continue
+                logger.debug(f"Evicting {path} from the worker cache")
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
                 else:
-                    raise e
-            full_filename = os.path.join(to_make, os.path.basename(m_filename))
-            # logger.debug('Writing {}'.format(full_filename))
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                del ledger[path]
+                total_size -= size
+
+        _save_cache_ledger(ledger)
+
+    if os.path.isdir(MODULES_DIR):
+        for entry in os.scandir(MODULES_DIR):
+            if entry.is_symlink() and not os.path.exists(entry.path):
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
 
-            with open(full_filename, 'wb') as fid:
-                fid.write(b64str_to_bytes(m_data))
 
-    return loaded_func_all['func']
+def unpack_modules(module_data, module_path):
+    """
+    Writes the serialized modules into module_path using a pool of threads
+    """
+    def write_module(m_filename, m_data):
+        m_path = os.path.dirname(m_filename)
+        if len(m_path) > 0 and m_path[0] == "/":
+            m_path = m_path[1:]
+        to_make = os.path.join(module_path, m_path)
+        os.makedirs(to_make, exist_ok=True)
+        full_filename = os.path.join(to_make, os.path.basename(m_filename))
+        with open(full_filename, 'wb') as fid:
+            fid.write(b64str_to_bytes(m_data))
+
+    if len(module_data) == 1:
+        write_module(*next(iter(module_data.items())))
+        return
+
+    max_workers = min(MODULES_UNPACK_THREADS, len(module_data))
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        fs = [ex.submit(write_module, m_filename, m_data)
+              for m_filename, m_data in module_data.items()]
+        for f in fs:
+            f.result()
 
 
 def get_function_data(job, internal_storage):
     """
-    Get function data (iteradata) from storage
+    Get function data (iteradata) from storage. The data blob is held once,
+    in memory or in an mmap'd file when large, and each call gets a
+    zero-copy slice of it
     """
     if job.data_key:
         extra_get_args = {}
@@ -109,16 +463,31 @@ def get_function_data(job, internal_storage):
             last_byte = job.data_byte_ranges[-1][1]
             range_str = f'bytes={init_byte}-{last_byte}'
             extra_get_args['Range'] = range_str
+            data_size = last_byte - init_byte + 1
+        else:
+            data_size = None
 
         logger.info("Loading function data parameters from storage")
-        data_obj = internal_storage.get_data(job.data_key, extra_get_args=extra_get_args)
+        if data_size is not None and data_size > DATA_MMAP_THRESHOLD:
+            data_path = os.path.join(WORKER_DATA_DIR, f'{job.job_key}-{uuid.uuid4().hex[:8]}.data')
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+            stream = internal_storage.get_data(job.data_key, stream=True, extra_get_args=extra_get_args)
+            with open(data_path, 'wb') as f:
+                shutil.copyfileobj(stream, f, 1024 * 1024)
+            job.data_file = data_path
+        else:
+            data_path = None
+            data_obj = memoryview(internal_storage.get_data(job.data_key, extra_get_args=extra_get_args))
 
         loaded_data = []
         offset = 0
         if job.data_byte_ranges is not None:
             for dbr in job.data_byte_ranges:
                 length = dbr[1] - dbr[0] + 1
-                loaded_data.append(data_obj[offset:offset + length])
+                if data_path:
+                    loaded_data.append(MappedDataSlice(data_path, offset, length))
+                else:
+                    loaded_data.append(data_obj[offset:offset + length])
                 offset += length
         else:
             loaded_data.append(data_obj)
@@ -128,6 +497,223 @@ def get_function_data(job, internal_storage):
     return loaded_data
 
 
+class MappedDataSlice:
+    """
+    Picklable reference to the data of a call stored in an mmap'd file.
+    Every process that loads it maps the same file instead of receiving
+    a copy of the data
+    """
+    def __init__(self, path, offset, length):
+        self.path = path
+        self.offset = offset
+        self.length = length
+
+    def load(self):
+        with open(self.path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mm)[self.offset:self.offset + self.length]
+
+
+def release_job_files(job):
+    """
+    Removes the data file of a job and releases its lease on the worker
+    cache entries. Called once all its calls have finished
+    """
+    cache_lease = getattr(job, 'cache_lease', None)
+    if cache_lease:
+        release_cache_lease(cache_lease)
+
+    data_file = getattr(job, 'data_file', None)
+    if data_file:
+        try:
+            os.remove(data_file)
+        except FileNotFoundError:
+            pass
+
+
+def load_call_data(data):
+    """
+    Returns a bytes-like object with the serialized data of a call
+    """
+    return data.load() if isinstance(data, MappedDataSlice) else data
+
+
+def share_call_data(data):
+    """
+    Returns the serialized data of a call in a form that can be
+    sent to another process
+    """
+    return data.tobytes() if isinstance(data, memoryview) else data
+
+
+def prefetch_input_chunk(job, data, internal_storage, wait_modules=None):
+    """
+    Decodes the data of the first call of the job, so that the JobRunner
+    does not unpickle it again, and downloads its input object partition
+    if it processes an object from the internal storage, so that its GET
+    overlaps with the function download. The partition is not downloaded
+    if it is too large to keep in memory.
+    """
+    try:
+        call_data = pickle.loads(load_call_data(data[0]))
+    except Exception:
+        # The data may reference user modules that are not yet written
+        if wait_modules is None:
+            return None
+        wait_modules()
+        call_data = pickle.loads(load_call_data(data[0]))
+
+    prefetched = {'call_id': job.call_ids[0], 'data': call_data, 'body': None}
+
+    obj = call_data.get('obj') if isinstance(call_data, dict) else None
+    if obj is None or not hasattr(obj, 'bucket') or hasattr(obj, 'path') \
+       or obj.backend != internal_storage.backend:
+        return prefetched
+
+    extra_get_args = {}
+    if obj.data_byte_range is not None:
+        first_byte, last_byte = obj.data_byte_range
+        size = last_byte - first_byte + 1
+        extra_get_args['Range'] = 'bytes={}-{}'.format(*obj.data_byte_range)
+    else:
+        size = obj.chunk_size
+
+    if not size or size > INPUT_PREFETCH_MAX_SIZE:
+        return prefetched
+
+    logger.info(f'Prefetching input chunk from {obj.backend}://{obj.bucket}/{obj.key}')
+    prefetched['body'] = internal_storage.storage.get_object(obj.bucket, obj.key, extra_get_args=extra_get_args)
+
+    return prefetched
+
+
+class PrefetchedStream(io.BytesIO):
+    """
+    In-memory stream of a prefetched input chunk. It exposes the same
+    read/readline interface as the storage streaming bodies
+    """
+    @property
+    def _raw_stream(self):
+        return self
+
+
+class ReadAheadStream(io.RawIOBase):
+    """
+    Stream of a byte range of an object, read with concurrent sub-range
+    GET requests issued ahead of the consumer. At most max_concurrency parts
+    of part_size bytes are requested or buffered at a time. It exposes the
+    same read/readline interface as the storage streaming bodies. The parts
+    are read once, so they are requested to the backend bypassing the read
+    cache of the storage
+    """
+
+    def __init__(self, storage, bucket, key, first_byte, last_byte, max_concurrency, part_size):
+        self._storage = storage
+        self._bucket = bucket
+        self._key = key
+        self._next_byte = first_byte
+        self._last_byte = last_byte
+        self._max_concurrency = max_concurrency
+        self._part_size = part_size
+        self._parts = deque()
+        self._buffer = b''
+        self._offset = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._request_parts()
+
+    @property
+    def _raw_stream(self):
+        return self
+
+    def _get_part(self, first_byte, last_byte):
+        extra_get_args = {'Range': f'bytes={first_byte}-{last_byte}'}
+        return self._storage.storage_handler.get_object(self._bucket, self._key, False, extra_get_args)
+
+    def _request_parts(self):
+        while len(self._parts) < self._max_concurrency and self._next_byte <= self._last_byte:
+            last_byte = min(self._next_byte + self._part_size, self._last_byte + 1) - 1
+            part = self._pool.submit(self._get_part, self._next_byte, last_byte)
+            self._parts.append((self._next_byte, last_byte, part))
+            self._next_byte = last_byte + 1
+        if not self._parts:
+            self._pool.shutdown(wait=False)
+
+    def _fill_buffer(self):
+        """
+        Moves to the next part once the current one is consumed. Returns
+        False at the end of the range.
+        """
+        while self._offset >= len(self._buffer):
+            if not self._parts:
+                return False
+            first_byte, last_byte, part = self._parts.popleft()
+            try:
+                self._buffer = part.result()
+            except Exception:
+                # The range of a partition can end past the end of the object
+                size = int(self._storage.head_object(self._bucket, self._key)['content-length'])
+                if first_byte < size:
+                    raise
+                self._buffer = b''
+            self._offset = 0
+            if len(self._buffer) < last_byte - first_byte + 1:
+                # End of the object, the parts after it are empty
+                for _, _, part in self._parts:
+                    part.cancel()
+                self._parts.clear()
+                self._next_byte = self._last_byte + 1
+            self._request_parts()
+        return True
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        if n is None or n < 0:
+            return self.readall()
+        chunks = []
+        while n > 0 and self._fill_buffer():
+            chunk = self._buffer[self._offset:self._offset + n]
+            self._offset += len(chunk)
+            n -= len(chunk)
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def readall(self):
+        chunks = []
+        while self._fill_buffer():
+            chunks.append(self._buffer[self._offset:])
+            self._offset = len(self._buffer)
+        return b''.join(chunks)
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def readline(self, size=-1):
+        limit = size if size is not None and size >= 0 else float('inf')
+        chunks = []
+        while limit > 0 and self._fill_buffer():
+            end = self._buffer.find(b'\n', self._offset) + 1 or len(self._buffer)
+            end = min(end, self._offset + limit)
+            chunk = self._buffer[self._offset:end]
+            self._offset = end
+            limit -= len(chunk)
+            chunks.append(chunk)
+            if chunk.endswith(b'\n'):
+                break
+        return b''.join(chunks)
+
+    def close(self):
+        for _, _, part in self._parts:
+            part.cancel()
+        self._parts.clear()
+        self._buffer = b''
+        self._pool.shutdown(wait=False)
+        super().close()
+
+
 def get_memory_usage(formatted=True):
     """
     Gets the current memory usage of the runtime.
@@ -283,17 +869,26 @@ class LogStream:
 
 class SystemMonitor:
 
-    def __init__(self, process_id=None):
+    SAMPLE_FIELDS = ('tstamp', 'cpu_percent', 'rss', 'net_sent', 'net_recv', 'disk_read', 'disk_write')
+
+    def __init__(self, process_id=None, sampling_interval=None):
         """
         Initialize the SystemMonitor.
         If process_id is None, monitor the current process.
+        If sampling_interval is set, a background thread records the resource
+        usage of the process tree every sampling_interval seconds.
         """
         self.process_id = process_id
+        self.sampling_interval = sampling_interval
         self.cpu_usage = []
         self.process = None
         self.cpu_times = None
         self.current_net_io = None
         self.mem_info = None
+        self.samples = None
+
+        self._sampler = None
+        self._sampler_stop = threading.Event()
 
     def start(self):
         """
@@ -311,6 +906,11 @@ class SystemMonitor:
         psutil.net_io_counters.cache_clear()
         self.start_net_io = psutil.net_io_counters()
 
+        if self.sampling_interval:
+            self.samples = {field: [] for field in self.SAMPLE_FIELDS}
+            self._sampler = threading.Thread(target=self._sampler_loop, daemon=True)
+            self._sampler.start()
+
     def stop(self):
         """
         Stop monitoring.
@@ -318,12 +918,85 @@ class SystemMonitor:
         if not psutil_found:
             return
 
+        if self._sampler:
+            self._sampler_stop.set()
+            self._sampler.join()
+            self._sampler = None
+
         # Record the CPU usage since the last call (start).
         self.cpu_usage = psutil.cpu_percent(interval=None, percpu=True)
         self.cpu_times = psutil.cpu_times()
         self.current_net_io = psutil.net_io_counters()
         self.mem_info = self.process.memory_full_info()
 
+    def _get_tree_usage(self):
+        """
+        Returns the accumulated CPU time and the RSS of the monitored process
+        and all its children
+        """
+        cpu_time = 0
+        rss = 0
+
+        parent_cpu = self.process.cpu_times()
+        cpu_time += parent_cpu.user + parent_cpu.system
+        cpu_time += parent_cpu.children_user + parent_cpu.children_system
+        rss += self.process.memory_info().rss
+
+        for child in self.process.children(recursive=True):
+            try:
+                child_cpu = child.cpu_times()
+                cpu_time += child_cpu.user + child_cpu.system
+                rss += child.memory_info().rss
+            except psutil.Error:
+                # the child finished between listing and reading it
+                pass
+
+        return cpu_time, rss
+
+    def _sampler_loop(self):
+        """
+        Records a resource usage sample every sampling_interval seconds
+        until the monitor is stopped
+        """
+        start_disk_io = psutil.disk_io_counters()
+        prev_tstamp = time.time()
+        prev_cpu_time, _ = self._get_tree_usage()
+
+        def take_sample():
+            nonlocal prev_tstamp, prev_cpu_time
+            tstamp = time.time()
+            cpu_time, rss = self._get_tree_usage()
+            net_io = psutil.net_io_counters()
+            disk_io = psutil.disk_io_counters()
+            elapsed = tstamp - prev_tstamp
+
+            self.samples['tstamp'].append(round(tstamp, 3))
+            self.samples['cpu_percent'].append(
+                round(max(cpu_time - prev_cpu_time, 0) * 100 / elapsed, 1) if elapsed > 0 else 0.0
+            )
+            self.samples['rss'].append(rss)
+            self.samples['net_sent'].append(net_io.bytes_sent - self.start_net_io.bytes_sent)
+            self.samples['net_recv'].append(net_io.bytes_recv - self.start_net_io.bytes_recv)
+            if disk_io and start_disk_io:
+                self.samples['disk_read'].append(disk_io.read_bytes - start_disk_io.read_bytes)
+                self.samples['disk_write'].append(disk_io.write_bytes - start_disk_io.write_bytes)
+            else:
+                self.samples['disk_read'].append(0)
+                self.samples['disk_write'].append(0)
+
+            prev_tstamp, prev_cpu_time = tstamp, cpu_time
+
+        while not self._sampler_stop.wait(self.sampling_interval):
+            try:
+                take_sample()
+            except psutil.Error:
+                break
+
+        try:
+            take_sample()
+        except psutil.Error:
+            pass
+
     def get_cpu_info(self):
         """
         Return CPU usage, system time, and user time for each CPU core.
@@ -352,3 +1025,13 @@ class SystemMonitor:
             return {"rss": 0, "vms": 0, "uss": 0}
 
         return {"rss": self.mem_info.rss, "vms": self.mem_info.vms, "uss": self.mem_info.uss}
+
+    def get_samples(self):
+        """
+        Get the recorded resource usage samples, compressed and b64-encoded
+        to be shipped within the call status. None if sampling is disabled.
+        """
+        if not self.samples or not self.samples['tstamp']:
+            return None
+
+        return base64.b64encode(zlib.compress(json.dumps(self.samples).encode())).decode()